@@ -0,0 +1,31 @@
+import hashlib
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from inmaticpart2.app.cache.result_cache_backends import get_result_cache_backend
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+
+VERSION_KEY_PREFIX = "invoice-data-version"
+
+
+class InvoiceDataVersions:
+    def __init__(self, backend=None, tenant: str = DEFAULT_TENANT):
+        self.backend = backend or get_result_cache_backend()
+        self.tenant = tenant
+
+    def version_key(self, month: str, supplier: Optional[str] = None) -> str:
+        if supplier is None:
+            return f"{VERSION_KEY_PREFIX}:{self.tenant}:{month}"
+        return f"{VERSION_KEY_PREFIX}:{self.tenant}:{month}:{hashlib.sha1(supplier.encode()).hexdigest()[:16]}"
+
+    def versions(self, months: Iterable[str], supplier: Optional[str] = None) -> Dict[str, int]:
+        keys = {month: self.version_key(month, supplier) for month in months}
+        versions = self.backend.get_versions(keys.values())
+        return {month: versions[key] for month, key in keys.items()}
+
+    def bump(self, buckets: Iterable[Tuple[str, date]]) -> None:
+        keys = set()
+        for supplier, invoice_date in buckets:
+            month = str(invoice_date)[:7]
+            keys.add(self.version_key(month))
+            keys.add(self.version_key(month, supplier))
+        self.backend.bump_versions(sorted(keys))
@@ -0,0 +1,134 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_RESULT_CACHE_TTL = 300
+DEFAULT_RESULT_CACHE_MAX_ENTRIES = 4096
+DEFAULT_VERSION_TTL = 24 * 60 * 60
+
+
+class DjangoVersionStore:
+    def __init__(self, alias: str = "default", ttl: int = DEFAULT_VERSION_TTL):
+        self.alias = alias
+        self.ttl = ttl
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_versions(self, keys: Iterable[str]) -> Dict[str, int]:
+        keys = list(keys)
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                self.cache.add(key, time.time_ns(), timeout=self.ttl)
+                versions[key] = self.cache.get(key)
+        return versions
+
+    def bump_versions(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, time.time_ns(), timeout=self.ttl)
+
+
+class LocalResultCacheBackend:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_RESULT_CACHE_MAX_ENTRIES,
+        ttl: int = DEFAULT_RESULT_CACHE_TTL,
+        version_store: DjangoVersionStore = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.version_store = version_store or DjangoVersionStore(ttl=max(ttl, DEFAULT_VERSION_TTL))
+        self.lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self.entries[key]
+                    continue
+                self.entries.move_to_end(key)
+                found[key] = value
+        return copy.deepcopy(found)
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        values = copy.deepcopy(values)
+        with self.lock:
+            for key, value in values.items():
+                self.entries[key] = (expires_at, value)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_versions(self, keys: Iterable[str]) -> Dict[str, int]:
+        return self.version_store.get_versions(keys)
+
+    def bump_versions(self, keys: Iterable[str]) -> None:
+        self.version_store.bump_versions(keys)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class DjangoResultCacheBackend:
+    def __init__(self, alias: str = "default", ttl: int = DEFAULT_RESULT_CACHE_TTL, version_store: DjangoVersionStore = None):
+        self.alias = alias
+        self.ttl = ttl
+        self.version_store = version_store or DjangoVersionStore(alias, max(ttl, DEFAULT_VERSION_TTL))
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return self.cache.get_many(list(keys))
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        self.cache.set_many(values, timeout=self.ttl)
+
+    def get_versions(self, keys: Iterable[str]) -> Dict[str, int]:
+        return self.version_store.get_versions(keys)
+
+    def bump_versions(self, keys: Iterable[str]) -> None:
+        self.version_store.bump_versions(keys)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+result_cache_backend = None
+result_cache_backend_lock = threading.Lock()
+
+
+def get_result_cache_backend():
+    global result_cache_backend
+    with result_cache_backend_lock:
+        if result_cache_backend is None:
+            alias = getattr(settings, "ACCOUNTING_RESULT_CACHE", "local")
+            ttl = getattr(settings, "ACCOUNTING_RESULT_CACHE_TTL", DEFAULT_RESULT_CACHE_TTL)
+            version_store = DjangoVersionStore(
+                getattr(settings, "ACCOUNTING_VERSION_CACHE", "default"),
+                max(ttl, getattr(settings, "ACCOUNTING_VERSION_TTL", DEFAULT_VERSION_TTL))
+            )
+            if alias == "local":
+                result_cache_backend = LocalResultCacheBackend(ttl=ttl, version_store=version_store)
+            else:
+                result_cache_backend = DjangoResultCacheBackend(alias, ttl, version_store)
+        return result_cache_backend
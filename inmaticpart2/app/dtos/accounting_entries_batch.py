@@ -0,0 +1,118 @@
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Iterator, List, Sequence, Tuple
+from inmaticpart2.app.dtos.accounting_entry import AccountingEntry
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike
+from inmaticpart2.app.enums.accounting_codes import AccountingCodes
+from inmaticpart2.app.enums.payment_type import PaymentType
+
+ENTRY_FIELDS = ("account_code", "debit_credit", "amount", "description", "invoice_number")
+
+
+class LazyAccountingEntry:
+    __slots__ = ("account_code", "debit_credit", "invoice", "month", "supplier")
+
+    def __init__(self, account_code: AccountingCodes, debit_credit: PaymentType, invoice: InvoiceLike, month: str, supplier: str):
+        self.account_code = account_code
+        self.debit_credit = debit_credit
+        self.invoice = invoice
+        self.month = month
+        self.supplier = supplier
+
+    @property
+    def amount(self) -> Decimal:
+        return self.invoice.total_value
+
+    @property
+    def invoice_number(self) -> str:
+        return self.invoice.number
+
+    @property
+    def description(self) -> str:
+        return f"Invoice {self.invoice.number} for {self.month} from {self.supplier}"
+
+    def to_accounting_entry(self) -> AccountingEntry:
+        return AccountingEntry(
+            account_code=self.account_code,
+            debit_credit=self.debit_credit,
+            amount=self.amount,
+            description=self.description,
+            invoice_number=self.invoice_number
+        )
+
+    def __eq__(self, other):
+        if not all(hasattr(other, field) for field in ENTRY_FIELDS):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in ENTRY_FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"LazyAccountingEntry(invoice_number={self.invoice_number!r}, amount={self.amount!r})"
+
+    def __str__(self):
+        return f"{self.debit_credit.value} {self.account_code.value}: {self.amount} - {self.description} ({self.invoice_number})"
+
+
+class AccountingEntriesBatch(Sequence):
+    def __init__(self, account_code: AccountingCodes, debit_credit: PaymentType):
+        if not isinstance(debit_credit, PaymentType):
+            raise ValueError(f"Invalid debit/credit value: {debit_credit}")
+
+        if not isinstance(account_code, AccountingCodes):
+            raise ValueError(f"Invalid account code: {account_code}")
+
+        self.account_code = account_code
+        self.debit_credit = debit_credit
+        self.groups: List[Tuple[str, str, Sequence[InvoiceLike]]] = []
+        self.group_ends: List[int] = []
+        self.length = 0
+
+    def add_group(self, supplier: str, month: str, invoices: Sequence[InvoiceLike]) -> None:
+        if not isinstance(invoices, (list, tuple)):
+            invoices = list(invoices)
+        if not invoices:
+            return
+        self.groups.append((supplier, month, invoices))
+        self.length += len(invoices)
+        self.group_ends.append(self.length)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.length))]
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("Accounting entry index out of range.")
+
+        group = bisect_right(self.group_ends, index)
+        supplier, month, invoices = self.groups[group]
+        group_start = self.group_ends[group - 1] if group else 0
+        return LazyAccountingEntry(self.account_code, self.debit_credit, invoices[index - group_start], month, supplier)
+
+    def __iter__(self) -> Iterator[LazyAccountingEntry]:
+        account_code = self.account_code
+        debit_credit = self.debit_credit
+        for supplier, month, invoices in self.groups:
+            for invoice in invoices:
+                yield LazyAccountingEntry(account_code, debit_credit, invoice, month, supplier)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(entry == other_entry for entry, other_entry in zip(self, other))
+
+    __hash__ = None
+
+    def amounts(self) -> List[Decimal]:
+        return [invoice.total_value for _, _, invoices in self.groups for invoice in invoices]
+
+    def invoice_numbers(self) -> List[str]:
+        return [invoice.number for _, _, invoices in self.groups for invoice in invoices]
+
+    def to_accounting_entries(self) -> List[AccountingEntry]:
+        return [entry.to_accounting_entry() for entry in self]
@@ -0,0 +1,60 @@
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from django.utils import timezone
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+
+
+@dataclass
+class AccountingJob:
+    kind: str
+    parameters: Dict[str, Any]
+    key: str
+    tenant: str = DEFAULT_TENANT
+    user_id: Optional[int] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    joined_requests: int = 0
+    version: int = 0
+    created_at: datetime = field(default_factory=timezone.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, **changes) -> None:
+        with self.lock:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.version += 1
+
+    def add_stage(self, stage: Dict[str, Any]) -> None:
+        with self.lock:
+            self.stages.append(stage)
+            self.version += 1
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        with self.lock:
+            data = {
+                "id": self.id,
+                "kind": self.kind,
+                "parameters": self.parameters,
+                "status": self.status,
+                "stages": list(self.stages),
+                "error": self.error,
+                "joined_requests": self.joined_requests,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+            if include_result:
+                data["result"] = self.result
+            return data
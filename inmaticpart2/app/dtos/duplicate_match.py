@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+
+NUMBER_MATCH = "number"
+FUZZY_MATCH = "fuzzy"
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    row: int
+    invoice_number: str
+    kind: str
+    invoice_id: Optional[int] = None
+    duplicate_of_row: Optional[int] = None
+
+    @property
+    def message(self) -> str:
+        target = f"invoice {self.invoice_id}" if self.invoice_id is not None else f"row {self.duplicate_of_row}"
+        if self.kind == NUMBER_MATCH:
+            return f"Duplicate of {target}: same supplier and invoice number."
+        return f"Possible duplicate of {target}: same supplier, total value and date."
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import List
+
+DEFAULT_MAX_SAMPLES = 1000
+
+
+@dataclass
+class RejectedRow:
+    row: int
+    invoice_number: str
+    errors: List[str]
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    rows_flagged: int = 0
+    rejected_rows: List[RejectedRow] = field(default_factory=list)
+    possible_duplicates: List[RejectedRow] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    max_samples: int = DEFAULT_MAX_SAMPLES
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.rows_read / self.elapsed_seconds
+
+    def reject(self, rejected_row: RejectedRow) -> None:
+        self.rows_rejected += 1
+        if len(self.rejected_rows) < self.max_samples:
+            self.rejected_rows.append(rejected_row)
+
+    def flag(self, flagged_row: RejectedRow) -> None:
+        self.rows_flagged += 1
+        if len(self.possible_duplicates) < self.max_samples:
+            self.possible_duplicates.append(flagged_row)
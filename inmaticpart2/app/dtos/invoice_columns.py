@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from operator import attrgetter
+from typing import Iterable, Sequence
+import numpy as np
+from django.db.models import BigIntegerField, ExpressionWrapper, F, QuerySet
+from django.db.models.functions import Round
+from inmaticpart2.app.utils.fixed_point import to_exact_cents
+from inmaticpart2.models import InvoiceModel
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MAX_FLOAT_EXACT_CENTS = 2 ** 52
+SUB_CENT_TOLERANCE = 1e-6
+
+
+@dataclass
+class InvoiceColumns:
+    dates: np.ndarray
+    base_cents: np.ndarray
+    total_cents: np.ndarray
+
+    def __post_init__(self):
+        if not len(self.dates) == len(self.base_cents) == len(self.total_cents):
+            raise ValueError("Invoice columns must have the same length.")
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def from_columns(cls, dates: Sequence[date], base_values: Sequence[Decimal], total_values: Sequence[Decimal]) -> "InvoiceColumns":
+        return cls(
+            dates=(np.fromiter(map(date.toordinal, dates), np.int64, len(dates)) - UNIX_EPOCH_ORDINAL).astype("datetime64[D]"),
+            base_cents=cls.to_cents_array(base_values),
+            total_cents=cls.to_cents_array(total_values),
+        )
+
+    @classmethod
+    def from_cents_rows(cls, rows: Iterable[tuple]) -> "InvoiceColumns":
+        columns = list(zip(*rows)) or [[], [], []]
+        dates, base_cents, total_cents = columns
+        return cls(
+            dates=(np.fromiter(map(date.toordinal, dates), np.int64, len(dates)) - UNIX_EPOCH_ORDINAL).astype("datetime64[D]"),
+            base_cents=np.array(base_cents, dtype=np.int64),
+            total_cents=np.array(total_cents, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "InvoiceColumns":
+        columns = list(zip(*rows))
+        if not columns:
+            return cls.from_columns([], [], [])
+        return cls.from_columns(*columns)
+
+    @classmethod
+    def from_invoices(cls, invoices: Iterable[InvoiceModel]) -> "InvoiceColumns":
+        if isinstance(invoices, QuerySet):
+            rows = invoices.values_list("date", cls.cents_expression("base_value"), cls.cents_expression("total_value"))
+            return cls.from_cents_rows(rows.iterator(chunk_size=10000))
+
+        invoices = invoices if isinstance(invoices, list) else list(invoices)
+        return cls.from_columns(
+            list(map(attrgetter("date"), invoices)),
+            list(map(attrgetter("base_value"), invoices)),
+            list(map(attrgetter("total_value"), invoices)),
+        )
+
+    @staticmethod
+    def cents_expression(field: str) -> Round:
+        return Round(ExpressionWrapper(F(field) * 100, output_field=BigIntegerField()), output_field=BigIntegerField())
+
+    @staticmethod
+    def to_cents_array(amounts: Sequence[Decimal]) -> np.ndarray:
+        scaled = np.fromiter(map(float, amounts), np.float64, len(amounts)) * 100
+        cents = np.rint(scaled)
+        if len(cents) and np.abs(cents).max() >= MAX_FLOAT_EXACT_CENTS:
+            return np.fromiter(map(to_exact_cents, amounts), np.int64, len(amounts))
+        if len(cents) and np.abs(scaled - cents).max() > SUB_CENT_TOLERANCE:
+            raise ValueError("Amounts must not have more than 2 decimal places.")
+        return cents.astype(np.int64)
@@ -0,0 +1,30 @@
+from datetime import date
+from decimal import Decimal
+from typing import Iterator, List, NamedTuple, Optional, Union
+from django.db.models import QuerySet
+from inmaticpart2.models import InvoiceModel
+
+
+class InvoiceRecord(NamedTuple):
+    number: str
+    supplier: str
+    date: date
+    base_value: Decimal
+    total_value: Decimal
+    pk: Optional[int] = None
+    vat: Optional[Decimal] = None
+
+    @classmethod
+    def from_model(cls, invoice: InvoiceModel) -> "InvoiceRecord":
+        return cls(invoice.number, invoice.supplier, invoice.date, invoice.base_value, invoice.total_value, invoice.pk, invoice.vat)
+
+    @classmethod
+    def iterate_queryset(cls, queryset: QuerySet, chunk_size: int = 2000) -> Iterator["InvoiceRecord"]:
+        return map(cls._make, queryset.values_list(*cls._fields).iterator(chunk_size=chunk_size))
+
+    @classmethod
+    def load_queryset(cls, queryset: QuerySet) -> List["InvoiceRecord"]:
+        return list(map(cls._make, queryset.values_list(*cls._fields)))
+
+
+InvoiceLike = Union[InvoiceModel, InvoiceRecord]
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from inmaticpart2.app.dtos.accounting_entry import AccountingEntry
+from inmaticpart2.app.enums.accounting_codes import AccountingCodes
+from inmaticpart2.app.enums.payment_type import PaymentType
+from inmaticpart2.app.utils.fixed_point import from_cents
+
+JOURNAL_ACCOUNTS = (AccountingCodes.PURCHASES, AccountingCodes.VAT_SUPPORTED, AccountingCodes.SUPPLIERS)
+DEBIT = 1
+CREDIT = -1
+
+
+@dataclass
+class JournalBatch:
+    entry_ids: np.ndarray
+    accounts: np.ndarray
+    sides: np.ndarray
+    amount_cents: np.ndarray
+    references: List[str]
+    suppliers: List[str]
+    months: List[str]
+    aggregated: bool = False
+
+    def __post_init__(self):
+        if not len(self.entry_ids) == len(self.accounts) == len(self.sides) == len(self.amount_cents):
+            raise ValueError("Journal line columns must have the same length.")
+        if not len(self.references) == len(self.suppliers) == len(self.months):
+            raise ValueError("Journal entry columns must have the same length.")
+
+    def __len__(self):
+        return len(self.entry_ids)
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.references)
+
+    def signed_cents(self) -> np.ndarray:
+        return self.amount_cents * self.sides
+
+    def entry_balances(self) -> np.ndarray:
+        balances = np.zeros(self.entry_count, dtype=np.int64)
+        np.add.at(balances, self.entry_ids, self.signed_cents())
+        return balances
+
+    def verify_balanced(self) -> None:
+        unbalanced = np.flatnonzero(self.entry_balances())
+        if len(unbalanced):
+            examples = ", ".join(self.references[entry] for entry in unbalanced[:5].tolist())
+            raise ValueError(f"Journal has {len(unbalanced)} unbalanced entries: {examples}")
+
+    def totals_by_account(self) -> Dict[str, Dict[str, Decimal]]:
+        totals = {}
+        for position, account in enumerate(JOURNAL_ACCOUNTS):
+            account_lines = self.accounts == position
+            debit_cents = int(self.amount_cents[account_lines & (self.sides == DEBIT)].sum())
+            credit_cents = int(self.amount_cents[account_lines & (self.sides == CREDIT)].sum())
+            totals[account.value] = {"debit": from_cents(debit_cents), "credit": from_cents(credit_cents)}
+        return totals
+
+    def description(self, entry: int) -> str:
+        if self.aggregated:
+            return f"Invoices for {self.months[entry]} from {self.suppliers[entry]}"
+        return f"Invoice {self.references[entry]} for {self.months[entry]} from {self.suppliers[entry]}"
+
+    def iterate_lines(self) -> Iterator[Tuple[str, AccountingCodes, PaymentType, Decimal, str]]:
+        descriptions = {}
+        for entry, account, side, cents in zip(
+            self.entry_ids.tolist(), self.accounts.tolist(), self.sides.tolist(), self.amount_cents.tolist()
+        ):
+            description = descriptions.get(entry)
+            if description is None:
+                descriptions.clear()
+                description = descriptions[entry] = self.description(entry)
+            yield (
+                self.references[entry],
+                JOURNAL_ACCOUNTS[account],
+                PaymentType.DEBIT if side == DEBIT else PaymentType.CREDIT,
+                from_cents(cents),
+                description,
+            )
+
+    def to_accounting_entries(self) -> List[AccountingEntry]:
+        return [
+            AccountingEntry(
+                account_code=account_code,
+                debit_credit=debit_credit,
+                amount=amount,
+                description=description,
+                invoice_number=reference
+            )
+            for reference, account_code, debit_credit, amount, description in self.iterate_lines()
+        ]
@@ -0,0 +1,27 @@
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    queries: int = 0
+    allocated_bytes: Optional[int] = None
+
+
+@dataclass
+class RunMetrics:
+    name: str
+    seconds: float = 0.0
+    stages: List[StageMetrics] = field(default_factory=list)
+    profile_path: Optional[str] = None
+    allocations_path: Optional[str] = None
+
+    def stage(self, name: str) -> Optional[StageMetrics]:
+        return next((stage for stage in self.stages if stage.stage == name), None)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    row: int
+    invoice_number: str
+    field: str
+    code: str
+    message: str
+
+
+@dataclass
+class ValidationReport:
+    rows: int = 0
+    issues: List[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.issues
+
+    def rejected_rows(self, ignored_codes: Iterable[str] = ()) -> Set[int]:
+        ignored_codes = set(ignored_codes)
+        return {issue.row for issue in self.issues if issue.code not in ignored_codes}
+
+    def issues_by_row(self) -> Dict[int, List[ValidationIssue]]:
+        issues_by_row = {}
+        for issue in self.issues:
+            issues_by_row.setdefault(issue.row, []).append(issue)
+        return issues_by_row
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "valid": self.is_valid,
+            "issues": [
+                {"row": issue.row, "invoice_number": issue.invoice_number, "field": issue.field, "code": issue.code, "message": issue.message}
+                for issue in self.issues
+            ],
+        }
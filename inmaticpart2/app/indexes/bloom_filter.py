@@ -0,0 +1,41 @@
+import math
+from typing import Iterable
+import numpy as np
+
+DEFAULT_ERROR_RATE = 0.01
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter capacity must be positive and error_rate between 0 and 1.")
+
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def positions(self, keys: Iterable[int]) -> np.ndarray:
+        keys = np.fromiter(keys, dtype=np.int64).view(np.uint64)
+        first_hash = keys
+        second_hash = (keys * HASH_MULTIPLIER) | np.uint64(1)
+        rounds = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return ((first_hash + rounds * second_hash) % np.uint64(self.size)).astype(np.int64)
+
+    def add_many(self, keys: Iterable[int]) -> None:
+        positions = self.positions(keys)
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += positions.shape[1]
+
+    def contains_many(self, keys: Iterable[int]) -> np.ndarray:
+        positions = self.positions(keys)
+        if not positions.shape[1]:
+            return np.zeros(0, dtype=bool)
+        return ((self.bits[positions >> 3] >> (positions & 7)) & 1).astype(bool).all(axis=0)
+
+    def __contains__(self, key: int) -> bool:
+        return bool(self.contains_many([key])[0])
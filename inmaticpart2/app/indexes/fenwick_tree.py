@@ -0,0 +1,44 @@
+from typing import List
+
+
+class FenwickTree:
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    @classmethod
+    def from_values(cls, values: List[int]) -> "FenwickTree":
+        fenwick_tree = cls(len(values))
+        tree = fenwick_tree.tree
+        for position, value in enumerate(values, start=1):
+            tree[position] += value
+            parent = position + (position & -position)
+            if parent <= fenwick_tree.size:
+                tree[parent] += tree[position]
+        return fenwick_tree
+
+    def add(self, index: int, delta: int) -> None:
+        if not 0 <= index < self.size:
+            raise ValueError(f"Index {index} is outside the tree of size {self.size}.")
+
+        position = index + 1
+        tree = self.tree
+        while position <= self.size:
+            tree[position] += delta
+            position += position & -position
+
+    def prefix_sum(self, index: int) -> int:
+        position = min(index, self.size - 1) + 1
+        total = 0
+        tree = self.tree
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    def range_sum(self, first: int, last: int) -> int:
+        first = max(first, 0)
+        last = min(last, self.size - 1)
+        if first > last:
+            return 0
+        return self.prefix_sum(last) - (self.prefix_sum(first - 1) if first else 0)
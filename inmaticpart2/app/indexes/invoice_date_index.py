@@ -0,0 +1,137 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from django.db.models import QuerySet
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike, InvoiceRecord
+from inmaticpart2.app.utils.fixed_point import from_cents, to_exact_cents
+
+DateWindow = Tuple[date, date, Optional[str]]
+InvoiceValidator = Callable[[InvoiceLike], None]
+
+
+class IndexedRows(NamedTuple):
+    invoices: List[InvoiceLike]
+    ordinals: List[int]
+    base_prefix: List[int]
+    total_prefix: List[int]
+
+
+class InvoiceDateIndex:
+    def __init__(self, invoices: Iterable[InvoiceLike], validator: Optional[InvoiceValidator] = None):
+        self.invoices = sorted(invoices, key=lambda invoice: invoice.date)
+        self.validated = False
+        if validator is not None:
+            self.validate(validator)
+
+        invoices_by_supplier: Dict[str, List[InvoiceLike]] = {}
+        for invoice in self.invoices:
+            invoices_by_supplier.setdefault(invoice.supplier, []).append(invoice)
+
+        self.rows = self.index_rows(self.invoices)
+        self.rows_by_supplier = {supplier: self.index_rows(invoices) for supplier, invoices in invoices_by_supplier.items()}
+
+    @classmethod
+    def from_invoices(
+        cls,
+        invoices: Iterable[InvoiceLike],
+        as_records: bool = False,
+        validator: Optional[InvoiceValidator] = None
+    ) -> "InvoiceDateIndex":
+        if isinstance(invoices, QuerySet):
+            invoices = invoices.order_by("date", "pk")
+            invoices = InvoiceRecord.iterate_queryset(invoices) if as_records else invoices.iterator(chunk_size=5000)
+        return cls(invoices, validator)
+
+    def __len__(self):
+        return len(self.invoices)
+
+    def validate(self, validator: InvoiceValidator) -> None:
+        if self.validated:
+            return
+
+        for invoice in self.invoices:
+            validator(invoice)
+        self.validated = True
+
+    def index_rows(self, invoices: List[InvoiceLike]) -> IndexedRows:
+        base_prefix = [0]
+        total_prefix = [0]
+        for invoice in invoices:
+            base_prefix.append(base_prefix[-1] + to_exact_cents(invoice.base_value))
+            total_prefix.append(total_prefix[-1] + to_exact_cents(invoice.total_value))
+        return IndexedRows(invoices, [invoice.date.toordinal() for invoice in invoices], base_prefix, total_prefix)
+
+    def rows_for(self, supplier: Optional[str]) -> IndexedRows:
+        if not supplier:
+            return self.rows
+        return self.rows_by_supplier.get(supplier) or IndexedRows([], [], [0], [0])
+
+    def bounds(self, rows: IndexedRows, start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+        first = bisect_left(rows.ordinals, start_date.toordinal()) if start_date else 0
+        last = bisect_right(rows.ordinals, end_date.toordinal()) if end_date else len(rows.ordinals)
+        return first, max(first, last)
+
+    def between(self, start_date: Optional[date] = None, end_date: Optional[date] = None, supplier: Optional[str] = None) -> List[InvoiceLike]:
+        rows = self.rows_for(supplier)
+        first, last = self.bounds(rows, start_date, end_date)
+        return rows.invoices[first:last]
+
+    def totals(self, start_date: Optional[date] = None, end_date: Optional[date] = None, supplier: Optional[str] = None) -> dict:
+        rows = self.rows_for(supplier)
+        first, last = self.bounds(rows, start_date, end_date)
+        return {
+            "total_base": from_cents(rows.base_prefix[last] - rows.base_prefix[first]),
+            "total_value": from_cents(rows.total_prefix[last] - rows.total_prefix[first]),
+            "count": last - first,
+        }
+
+    def groups(self, start_date: Optional[date] = None, end_date: Optional[date] = None, supplier: Optional[str] = None) -> dict:
+        grouped_invoices = {}
+        for supplier_name in dict.fromkeys(invoice.supplier for invoice in self.between(start_date, end_date, supplier)):
+            rows = self.rows_by_supplier[supplier_name]
+            first, last = self.bounds(rows, start_date, end_date)
+            months = grouped_invoices[supplier_name] = {}
+            while first < last:
+                month_start = rows.invoices[first].date.replace(day=1)
+                next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+                month_last = bisect_left(rows.ordinals, next_month_start.toordinal(), first, last)
+                months[month_start.strftime("%Y-%m")] = {
+                    "total_base": from_cents(rows.base_prefix[month_last] - rows.base_prefix[first]),
+                    "total_value": from_cents(rows.total_prefix[month_last] - rows.total_prefix[first]),
+                    "invoices": rows.invoices[first:month_last],
+                }
+                first = month_last
+        return grouped_invoices
+
+    def cashflow(self, start_date: date, end_date: date, supplier: Optional[str] = None) -> dict:
+        start_date = start_date.date() if isinstance(start_date, datetime) else start_date
+        end_date = end_date.date() if isinstance(end_date, datetime) else end_date
+        if end_date < start_date:
+            raise ValueError("end_date cannot be before start_date.")
+
+        rows = self.rows_for(supplier)
+        first, last = self.bounds(rows, start_date, end_date)
+
+        weekly_cashflow = {}
+        week_start = start_date - timedelta(days=start_date.weekday())
+        while week_start <= end_date:
+            self.add_bucket(weekly_cashflow, week_start.strftime("%Y-%m-%d"), rows, max(week_start, start_date), min(week_start + timedelta(days=6), end_date))
+            week_start += timedelta(days=7)
+
+        monthly_cashflow = {}
+        month_start = start_date.replace(day=1)
+        while month_start <= end_date:
+            next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+            self.add_bucket(monthly_cashflow, month_start.strftime("%Y-%m"), rows, max(month_start, start_date), min(next_month_start - timedelta(days=1), end_date))
+            month_start = next_month_start
+
+        return {
+            "total_balance": from_cents(rows.total_prefix[last] - rows.total_prefix[first]) if last > first else 0,
+            "weekly_cashflow": weekly_cashflow,
+            "monthly_cashflow": monthly_cashflow,
+        }
+
+    def add_bucket(self, buckets: Dict[str, object], label: str, rows: IndexedRows, bucket_start: date, bucket_end: date) -> None:
+        first, last = self.bounds(rows, bucket_start, bucket_end)
+        if last > first:
+            buckets[label] = from_cents(rows.total_prefix[last] - rows.total_prefix[first])
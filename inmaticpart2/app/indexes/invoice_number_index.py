@@ -0,0 +1,199 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+INVOICE_NUMBER_PATTERN = re.compile(r"^(?P<series>.*?)(?P<sequence>\d+)$")
+DENSE_MIN_SPAN = 65_536
+DENSE_SPAN_PER_NUMBER = 64
+
+
+class InvoiceNumberIndex:
+    def __init__(self, dense_min_span: int = DENSE_MIN_SPAN, dense_span_per_number: int = DENSE_SPAN_PER_NUMBER):
+        self.dense_min_span = dense_min_span
+        self.dense_span_per_number = dense_span_per_number
+        self.series_bitmaps: Dict[str, bytearray] = {}
+        self.series_offsets: Dict[str, int] = {}
+        self.series_counts: Dict[str, int] = {}
+        self.series_sparse: Dict[str, Set[int]] = {}
+        self.series_last_sequence: Dict[str, int] = {}
+        self.series_widths: Dict[str, int] = {}
+
+    @classmethod
+    def from_numbers(cls, invoice_numbers: Iterable[str]) -> "InvoiceNumberIndex":
+        index = cls()
+        index.add_many(invoice_numbers)
+        return index
+
+    @staticmethod
+    def parse_invoice_number(invoice_number: str) -> Optional[Tuple[str, int, int]]:
+        match = INVOICE_NUMBER_PATTERN.match(invoice_number or "")
+        if not match:
+            return None
+
+        sequence = match.group("sequence")
+        return match.group("series"), int(sequence), len(sequence)
+
+    def add(self, invoice_number: str) -> bool:
+        parsed = self.parse_invoice_number(invoice_number)
+        if parsed is None:
+            return False
+
+        series, sequence, width = parsed
+        bitmap = self.series_bitmaps.get(series)
+        if bitmap is not None:
+            position = sequence - self.series_offsets[series]
+            if 0 <= position < len(bitmap):
+                if bitmap[position] == 0:
+                    bitmap[position] = 1
+                    self.series_counts[series] += 1
+            else:
+                self.add_dense(series, sequence)
+        elif series in self.series_sparse:
+            self.series_sparse[series].add(sequence)
+        else:
+            self.series_bitmaps[series] = bytearray(b"\x01")
+            self.series_offsets[series] = sequence
+            self.series_counts[series] = 1
+
+        if sequence > self.series_last_sequence.get(series, 0):
+            self.series_last_sequence[series] = sequence
+        if width > self.series_widths.get(series, 0):
+            self.series_widths[series] = width
+        return True
+
+    def add_dense(self, series: str, sequence: int) -> None:
+        bitmap = self.series_bitmaps[series]
+        offset = self.series_offsets[series]
+        first = min(offset, sequence)
+        span = max(offset + len(bitmap), sequence + 1) - first
+        if span > max(self.dense_min_span, self.dense_span_per_number * (self.series_counts[series] + 1)):
+            self.series_sparse[series] = {
+                offset + position for position, present in enumerate(bitmap) if present
+            } | {sequence}
+            del self.series_bitmaps[series], self.series_offsets[series], self.series_counts[series]
+            return
+
+        if sequence < offset:
+            grow = max(offset - sequence, min(len(bitmap), offset))
+            bitmap[:0] = bytes(grow)
+            offset = self.series_offsets[series] = offset - grow
+        elif sequence - offset >= len(bitmap):
+            bitmap.extend(bytes(max(sequence - offset + 1, 2 * len(bitmap)) - len(bitmap)))
+
+        if bitmap[sequence - offset] == 0:
+            bitmap[sequence - offset] = 1
+            self.series_counts[series] += 1
+
+    def add_many(self, invoice_numbers: Iterable[str]) -> None:
+        for invoice_number in invoice_numbers:
+            self.add(invoice_number)
+
+    def discard(self, invoice_number: str) -> bool:
+        parsed = self.parse_invoice_number(invoice_number)
+        if parsed is None or not self.contains(invoice_number):
+            return False
+
+        series, sequence, _ = parsed
+        if series in self.series_sparse:
+            sequences = self.series_sparse[series]
+            sequences.discard(sequence)
+            last_sequence = max(sequences) if sequences and sequence == self.series_last_sequence[series] else None
+            empty = not sequences
+        else:
+            bitmap = self.series_bitmaps[series]
+            offset = self.series_offsets[series]
+            bitmap[sequence - offset] = 0
+            self.series_counts[series] -= 1
+            empty = self.series_counts[series] == 0
+            last_sequence = offset + bitmap.rfind(1) if not empty and sequence == self.series_last_sequence[series] else None
+
+        if empty:
+            for series_map in (self.series_sparse, self.series_bitmaps, self.series_offsets, self.series_counts, self.series_last_sequence, self.series_widths):
+                series_map.pop(series, None)
+        elif last_sequence is not None:
+            self.series_last_sequence[series] = last_sequence
+        return True
+
+    def contains(self, invoice_number: str) -> bool:
+        parsed = self.parse_invoice_number(invoice_number)
+        if parsed is None:
+            return False
+
+        series, sequence, _ = parsed
+        if series in self.series_sparse:
+            return sequence in self.series_sparse[series]
+
+        bitmap = self.series_bitmaps.get(series)
+        if bitmap is None:
+            return False
+        position = sequence - self.series_offsets[series]
+        return 0 <= position < len(bitmap) and bitmap[position] == 1
+
+    def is_sparse(self, series: str) -> bool:
+        return series in self.series_sparse
+
+    def series(self) -> List[str]:
+        return sorted(self.series_last_sequence)
+
+    def missing_ranges(self, series: str, first: int = 1, last: Optional[int] = None) -> List[Tuple[int, int]]:
+        if last is None:
+            last = self.series_last_sequence.get(series, 0)
+        if last < first:
+            return []
+
+        if series in self.series_sparse:
+            present = sorted(sequence for sequence in self.series_sparse[series] if first <= sequence <= last)
+            bounds = [first - 1] + present + [last + 1]
+            return [(low + 1, high - 1) for low, high in zip(bounds, bounds[1:]) if high - low > 1]
+
+        bitmap = self.series_bitmaps.get(series, bytearray())
+        offset = self.series_offsets.get(series, last + 1)
+        start = max(first, offset) - offset
+        limit = min(last + 1, offset + len(bitmap)) - offset
+
+        ranges = []
+        if first < offset:
+            ranges.append((first, min(last, offset - 1)))
+
+        position = start
+        while position < limit:
+            gap_start = bitmap.find(0, position, limit)
+            if gap_start == -1:
+                position = limit
+                break
+
+            gap_end = bitmap.find(1, gap_start, limit)
+            if gap_end == -1:
+                gap_end = limit
+
+            ranges.append((offset + gap_start, offset + gap_end - 1))
+            position = gap_end
+
+        tail_start = max(offset + max(position, start), first)
+        if tail_start <= last:
+            ranges.append((tail_start, last))
+
+        merged = []
+        for gap_start, gap_end in ranges:
+            if merged and merged[-1][1] == gap_start - 1:
+                merged[-1] = (merged[-1][0], gap_end)
+            else:
+                merged.append((gap_start, gap_end))
+        return merged
+
+    def missing_ranges_by_series(self) -> Dict[str, List[Tuple[int, int]]]:
+        return {series: self.missing_ranges(series) for series in self.series()}
+
+    def missing_numbers(
+        self,
+        series: str,
+        first: int = 1,
+        last: Optional[int] = None,
+        width: Optional[int] = None
+    ) -> List[str]:
+        width = width or self.series_widths.get(series, 1)
+
+        return [
+            f"{series}{str(sequence).zfill(width)}"
+            for gap_start, gap_end in self.missing_ranges(series, first, last)
+            for sequence in range(gap_start, gap_end + 1)
+        ]
@@ -0,0 +1,89 @@
+import threading
+from datetime import date
+from typing import Dict, Optional, Tuple
+from inmaticpart2.app.indexes.fenwick_tree import FenwickTree
+
+DEFAULT_CAPACITY_DAYS = 4096
+MIN_CAPACITY_MARGIN_DAYS = 366
+
+
+class PayablesIndex:
+    def __init__(self, origin: Optional[date] = None, capacity: int = DEFAULT_CAPACITY_DAYS):
+        self.origin = origin.toordinal() if origin else None
+        self.capacity = capacity
+        self.cents_tree = FenwickTree(capacity)
+        self.count_tree = FenwickTree(capacity)
+        self.open_invoices: Dict[object, Tuple[int, int]] = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.open_invoices)
+
+    def __contains__(self, invoice_key) -> bool:
+        return invoice_key in self.open_invoices
+
+    def add(self, invoice_key, due_date: date, cents: int) -> None:
+        self.remove(invoice_key)
+
+        due_day = due_date.toordinal()
+        self.ensure_capacity(due_day)
+        self.cents_tree.add(due_day - self.origin, cents)
+        self.count_tree.add(due_day - self.origin, 1)
+        self.open_invoices[invoice_key] = (due_day, cents)
+
+    def remove(self, invoice_key) -> bool:
+        open_invoice = self.open_invoices.pop(invoice_key, None)
+        if open_invoice is None:
+            return False
+
+        due_day, cents = open_invoice
+        self.cents_tree.add(due_day - self.origin, -cents)
+        self.count_tree.add(due_day - self.origin, -1)
+        return True
+
+    def due_between(self, first_day: date, last_day: date) -> Tuple[int, int]:
+        if self.origin is None:
+            return 0, 0
+
+        first = first_day.toordinal() - self.origin
+        last = last_day.toordinal() - self.origin
+        return self.cents_tree.range_sum(first, last), self.count_tree.range_sum(first, last)
+
+    def due_until(self, last_day: date) -> Tuple[int, int]:
+        if self.origin is None:
+            return 0, 0
+
+        last = last_day.toordinal() - self.origin
+        if last < 0:
+            return 0, 0
+        return self.cents_tree.prefix_sum(last), self.count_tree.prefix_sum(last)
+
+    def due_after(self, first_day: date) -> Tuple[int, int]:
+        total_cents, total_count = self.due_until(date.max)
+        cents, count = self.due_until(date.fromordinal(first_day.toordinal() - 1))
+        return total_cents - cents, total_count - count
+
+    def ensure_capacity(self, due_day: int) -> None:
+        if self.origin is None:
+            self.origin = due_day - MIN_CAPACITY_MARGIN_DAYS
+        if self.origin <= due_day < self.origin + self.capacity:
+            return
+
+        days = [day for day, _ in self.open_invoices.values()] + [due_day]
+        origin = min(days) - MIN_CAPACITY_MARGIN_DAYS
+        capacity = self.capacity
+        while origin + capacity <= max(days) + MIN_CAPACITY_MARGIN_DAYS:
+            capacity *= 2
+        self.rebuild(origin, capacity)
+
+    def rebuild(self, origin: int, capacity: int) -> None:
+        cents_by_day = [0] * capacity
+        count_by_day = [0] * capacity
+        for due_day, cents in self.open_invoices.values():
+            cents_by_day[due_day - origin] += cents
+            count_by_day[due_day - origin] += 1
+
+        self.origin = origin
+        self.capacity = capacity
+        self.cents_tree = FenwickTree.from_values(cents_by_day)
+        self.count_tree = FenwickTree.from_values(count_by_day)
@@ -0,0 +1,66 @@
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+MONTH_KEY_BITS = 20
+MONTH_KEY_MASK = (1 << MONTH_KEY_BITS) - 1
+
+
+class SupplierDictionary:
+    def __init__(self, normalize: bool = False):
+        self.normalize = normalize
+        self.names: List[str] = []
+        self.ids_by_name: Dict[str, int] = {}
+        self.ids_by_normalized_name: Dict[str, int] = {}
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], normalize: bool = False) -> "SupplierDictionary":
+        supplier_dictionary = cls(normalize)
+        for name in names:
+            supplier_dictionary.encode(name)
+        return supplier_dictionary
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def encode(self, name: str) -> int:
+        supplier_id = self.ids_by_name.get(name)
+        if supplier_id is not None:
+            return supplier_id
+
+        if self.normalize:
+            normalized_name = self.normalize_name(name)
+            supplier_id = self.ids_by_normalized_name.get(normalized_name)
+            if supplier_id is None:
+                supplier_id = self.ids_by_normalized_name[normalized_name] = len(self.names)
+                self.names.append(name)
+        else:
+            supplier_id = len(self.names)
+            self.names.append(name)
+
+        self.ids_by_name[name] = supplier_id
+        return supplier_id
+
+    def get(self, name: str) -> Optional[int]:
+        supplier_id = self.ids_by_name.get(name)
+        if supplier_id is None and self.normalize:
+            supplier_id = self.ids_by_normalized_name.get(self.normalize_name(name))
+        return supplier_id
+
+    def decode(self, supplier_id: int) -> str:
+        if not 0 <= supplier_id < len(self.names):
+            raise ValueError(f"Unknown supplier id: {supplier_id}")
+        return self.names[supplier_id]
+
+    def normalize_name(self, name: str) -> str:
+        decomposed = unicodedata.normalize("NFKD", name.casefold())
+        return " ".join("".join(character for character in decomposed if not unicodedata.combining(character)).split())
+
+    def group_key(self, name: str, year: int, month: int) -> int:
+        return self.encode(name) << MONTH_KEY_BITS | (year * 12 + month - 1)
+
+    def split_group_key(self, group_key: int) -> tuple:
+        year, month = divmod(group_key & MONTH_KEY_MASK, 12)
+        return self.names[group_key >> MONTH_KEY_BITS], f"{year:04d}-{month + 1:02d}"
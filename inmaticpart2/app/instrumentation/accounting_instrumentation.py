@@ -0,0 +1,122 @@
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional
+from django.conf import settings
+from django.db import connections
+from inmaticpart2.app.dtos.stage_metrics import RunMetrics, StageMetrics
+from inmaticpart2.app.instrumentation.metrics_collectors import LoggingMetricsCollector, PrometheusTextfileCollector
+
+
+class AccountingInstrumentation:
+    def __init__(
+        self,
+        collectors: Optional[List] = None,
+        trace_allocations: bool = False,
+        profile_dir: Optional[str] = None,
+        stage_listeners: Optional[List[Callable[[StageMetrics], None]]] = None
+    ):
+        self.collectors = list(collectors or [])
+        self.stage_listeners = list(stage_listeners or [])
+        self.trace_allocations = trace_allocations
+        self.profile_dir = profile_dir
+        self.active_run: ContextVar[Optional[RunMetrics]] = ContextVar("accounting_run", default=None)
+
+    @classmethod
+    def from_settings(cls) -> "AccountingInstrumentation":
+        collectors = []
+        if getattr(settings, "ACCOUNTING_METRICS_LOG", False):
+            collectors.append(LoggingMetricsCollector())
+        metrics_file = getattr(settings, "ACCOUNTING_METRICS_FILE", "")
+        if metrics_file:
+            collectors.append(PrometheusTextfileCollector.for_path(metrics_file))
+
+        return cls(
+            collectors=collectors,
+            trace_allocations=getattr(settings, "ACCOUNTING_TRACE_ALLOCATIONS", False),
+            profile_dir=getattr(settings, "ACCOUNTING_PROFILE_DIR", "") or None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.collectors or self.profile_dir)
+
+    @contextmanager
+    def run(self, name: str) -> Iterator[Optional[RunMetrics]]:
+        current_run = self.active_run.get()
+        if not self.enabled or current_run is not None:
+            yield current_run
+            return
+
+        run = RunMetrics(name=name)
+        run_token = self.active_run.set(run)
+        profiler = cProfile.Profile() if self.profile_dir else None
+        started_tracing = (self.trace_allocations or self.profile_dir) and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        started_at = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield run
+        finally:
+            if profiler:
+                profiler.disable()
+            run.seconds = time.perf_counter() - started_at
+            self.active_run.reset(run_token)
+
+            if self.profile_dir:
+                self.dump_profiles(run, profiler)
+            if started_tracing:
+                tracemalloc.stop()
+
+            for collector in self.collectors:
+                collector.collect(run)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageMetrics]:
+        stage = StageMetrics(stage=name, rows_in=rows_in)
+        run = self.active_run.get()
+        if run is None:
+            yield stage
+            return
+
+        def count_query(execute, sql, params, many, context):
+            stage.queries += 1
+            return execute(sql, params, many, context)
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            allocated_before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+        started_at = time.perf_counter()
+        try:
+            with ExitStack() as wrappers:
+                for connection in connections.all():
+                    wrappers.enter_context(connection.execute_wrapper(count_query))
+                yield stage
+        finally:
+            stage.seconds = time.perf_counter() - started_at
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                stage.allocated_bytes = max(peak - allocated_before, 0)
+            run.stages.append(stage)
+            for listener in self.stage_listeners:
+                listener(stage)
+
+    def dump_profiles(self, run: RunMetrics, profiler: cProfile.Profile) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base_path = os.path.join(self.profile_dir, f"{run.name}-{datetime.now():%Y%m%dT%H%M%S%f}-{os.getpid()}")
+
+        run.profile_path = f"{base_path}.prof"
+        profiler.dump_stats(run.profile_path)
+
+        if tracemalloc.is_tracing():
+            run.allocations_path = f"{base_path}.tracemalloc"
+            tracemalloc.take_snapshot().dump(run.allocations_path)
@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import List
+from inmaticpart2.app.dtos.stage_metrics import RunMetrics
+
+
+class InMemoryMetricsCollector:
+    def __init__(self, max_runs: int = 100):
+        self.max_runs = max_runs
+        self.runs: List[RunMetrics] = []
+
+    def collect(self, run: RunMetrics) -> None:
+        self.runs.append(run)
+        if len(self.runs) > self.max_runs:
+            del self.runs[:len(self.runs) - self.max_runs]
+
+    def last_run(self) -> RunMetrics:
+        return self.runs[-1] if self.runs else None
+
+
+class LoggingMetricsCollector:
+    def __init__(self, logger_name: str = "inmaticpart2.accounting", level: int = logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def collect(self, run: RunMetrics) -> None:
+        for stage in run.stages:
+            self.logger.log(
+                self.level,
+                "%s.%s seconds=%.6f rows_in=%s rows_out=%s queries=%d allocated_bytes=%s",
+                run.name, stage.stage, stage.seconds, stage.rows_in, stage.rows_out, stage.queries, stage.allocated_bytes
+            )
+        self.logger.log(self.level, "%s seconds=%.6f", run.name, run.seconds)
+
+
+class PrometheusTextfileCollector:
+    instances = {}
+    instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path: str) -> "PrometheusTextfileCollector":
+        with cls.instances_lock:
+            if path not in cls.instances:
+                cls.instances[path] = cls(path)
+            return cls.instances[path]
+
+    def __init__(self, path: str, prefix: str = "inmaticpart2_accounting"):
+        self.base_path = path
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.pid = os.getpid()
+        root, extension = os.path.splitext(self.base_path)
+        self.path = f"{root}.{self.pid}{extension}"
+        self.runs = defaultdict(int)
+        self.run_seconds = defaultdict(float)
+        self.stage_totals = defaultdict(lambda: defaultdict(float))
+
+    def collect(self, run: RunMetrics) -> None:
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            self.runs[run.name] += 1
+            self.run_seconds[run.name] += run.seconds
+            for stage in run.stages:
+                totals = self.stage_totals[(run.name, stage.stage)]
+                totals["seconds"] += stage.seconds
+                totals["rows_in"] += stage.rows_in or 0
+                totals["rows_out"] += stage.rows_out or 0
+                totals["queries"] += stage.queries
+                totals["allocated_bytes"] += stage.allocated_bytes or 0
+            self.write()
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.prefix}_runs_total Completed accounting runs.",
+            f"# TYPE {self.prefix}_runs_total counter",
+        ]
+        lines.extend(f'{self.prefix}_runs_total{{run="{name}",pid="{self.pid}"}} {count}' for name, count in sorted(self.runs.items()))
+        lines.extend([
+            f"# HELP {self.prefix}_run_seconds_total Wall time spent in accounting runs.",
+            f"# TYPE {self.prefix}_run_seconds_total counter",
+        ])
+        lines.extend(f'{self.prefix}_run_seconds_total{{run="{name}",pid="{self.pid}"}} {seconds:.6f}' for name, seconds in sorted(self.run_seconds.items()))
+
+        for metric, help_text in (
+            ("seconds", "Wall time spent in each stage."),
+            ("rows_in", "Rows received by each stage."),
+            ("rows_out", "Rows produced by each stage."),
+            ("queries", "Database queries issued by each stage."),
+            ("allocated_bytes", "Peak bytes allocated by each stage while tracing allocations."),
+        ):
+            lines.extend([
+                f"# HELP {self.prefix}_stage_{metric}_total {help_text}",
+                f"# TYPE {self.prefix}_stage_{metric}_total counter",
+            ])
+            lines.extend(
+                f'{self.prefix}_stage_{metric}_total{{run="{name}",stage="{stage}",pid="{self.pid}"}} {totals[metric]:g}'
+                for (name, stage), totals in sorted(self.stage_totals.items())
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(temporary_path, self.path)
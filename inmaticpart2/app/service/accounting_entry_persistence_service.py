@@ -0,0 +1,84 @@
+from typing import Iterable
+from django.db import transaction
+from inmaticpart2.app.dtos.accounting_entry import AccountingEntry
+from inmaticpart2.app.dtos.journal_batch import JournalBatch
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.tenancy.tenant_router import TenantDatabaseRouter
+from inmaticpart2.app.utils.batching import batched
+from inmaticpart2.models import AccountingEntryModel, InvoiceModel
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class AccountingEntryPersistenceService:
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, tenant: str = DEFAULT_TENANT):
+        self.batch_size = batch_size
+        self.tenant = tenant
+        self.database = TenantDatabaseRouter().db_for_tenant(tenant)
+
+    def persist(
+        self,
+        accounting_entries: Iterable[AccountingEntry],
+        invoice_ids: Iterable[int] = (),
+        batch_size: int = None
+    ) -> dict:
+        return self.persist_models((self.to_model(entry) for entry in accounting_entries), invoice_ids, batch_size)
+
+    def persist_models(
+        self,
+        entry_models: Iterable[AccountingEntryModel],
+        invoice_ids: Iterable[int] = (),
+        batch_size: int = None
+    ) -> dict:
+        batch_size = batch_size or self.batch_size
+        persisted_entries = 0
+        accounted_invoices = 0
+
+        with transaction.atomic(using=self.database):
+            for entries_batch in batched(entry_models, batch_size):
+                AccountingEntryModel.objects.using(self.database).bulk_create(entries_batch, batch_size=batch_size)
+                persisted_entries += len(entries_batch)
+
+            for invoice_ids_batch in batched(invoice_ids, batch_size):
+                accounted_invoices += InvoiceModel.objects.for_tenant(self.tenant).filter(
+                    pk__in=invoice_ids_batch,
+                    state=InvoiceStates.PENDING
+                ).update(state=InvoiceStates.ACCOUNTED)
+
+        return {
+            "persisted_entries": persisted_entries,
+            "accounted_invoices": accounted_invoices,
+        }
+
+    def persist_accounting_result(self, accounting_result: dict, batch_size: int = None) -> dict:
+        invoice_ids = []
+        for months in accounting_result["grouped_invoices"].values():
+            for details in months.values():
+                for invoice in details["invoices"]:
+                    if invoice.pk is None:
+                        raise ValueError(f"Invoice {invoice.number} has no primary key, so it cannot be marked as accounted.")
+                    invoice_ids.append(invoice.pk)
+        return self.persist(accounting_result["accounting_entries"], invoice_ids, batch_size)
+
+    def persist_journal(self, journal_batch: JournalBatch, invoice_ids: Iterable[int] = (), batch_size: int = None) -> dict:
+        journal_entries = (
+            AccountingEntryModel(
+                invoice_number=reference,
+                account_code=account_code,
+                debit_credit=debit_credit,
+                amount=amount,
+                description=description,
+            )
+            for reference, account_code, debit_credit, amount, description in journal_batch.iterate_lines()
+        )
+        return self.persist_models(journal_entries, invoice_ids, batch_size)
+
+    def to_model(self, accounting_entry: AccountingEntry) -> AccountingEntryModel:
+        return AccountingEntryModel(
+            invoice_number=accounting_entry.invoice_number,
+            account_code=accounting_entry.account_code,
+            debit_credit=accounting_entry.debit_credit,
+            amount=accounting_entry.amount,
+            description=accounting_entry.description,
+        )
@@ -1,108 +1,516 @@
 from collections import defaultdict
 from decimal import Decimal
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from inmaticpart2.app.dtos.accounting_entries_batch import AccountingEntriesBatch
 from inmaticpart2.app.dtos.accounting_entry import AccountingEntry
+from inmaticpart2.app.dtos.invoice_columns import InvoiceColumns
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike, InvoiceRecord
+from inmaticpart2.app.dtos.journal_batch import JournalBatch
+from inmaticpart2.app.dtos.validation_report import ValidationReport
 from inmaticpart2.app.enums.accounting_codes import AccountingCodes
 from inmaticpart2.app.enums.payment_type import PaymentType
+from inmaticpart2.app.instrumentation.accounting_instrumentation import AccountingInstrumentation
+from inmaticpart2.app.indexes.invoice_date_index import DateWindow, InvoiceDateIndex
+from inmaticpart2.app.indexes.invoice_number_index import InvoiceNumberIndex
+from inmaticpart2.app.indexes.supplier_dictionary import MONTH_KEY_BITS, SupplierDictionary
+from inmaticpart2.app.service.cashflow_projection_engine import ColumnarCashflowEngine
+from inmaticpart2.app.service.invoice_validation_service import InvoiceValidationService
+from inmaticpart2.app.service.journal_engine import JournalEngine
+from inmaticpart2.app.snapshots.invoice_snapshot import InvoiceSnapshot
+from inmaticpart2.app.utils.fixed_point import from_cents, to_exact_cents
 from inmaticpart2.database.builder.invoice_builder import InvoiceBuilder
-from inmaticpart2.models import InvoiceModel
-from typing import List
+from django.db.models import Count, QuerySet, Sum
+from django.db.models.functions import TruncMonth
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 
 class AccountingInvoiceService:
-    def __init__(self):
+    def __init__(
+        self,
+        instrumentation: AccountingInstrumentation = None,
+        fixed_point: bool = False,
+        lazy_entries: bool = False,
+        normalize_suppliers: bool = False
+    ):
         self.invoice_builder = InvoiceBuilder()
+        self.cashflow_engine = ColumnarCashflowEngine()
+        self.journal_engine = JournalEngine()
+        self.validation_service = InvoiceValidationService(model_rules=False)
+        self.instrumentation = instrumentation or AccountingInstrumentation.from_settings()
+        self.fixed_point = fixed_point
+        self.lazy_entries = lazy_entries
+        self.normalize_suppliers = normalize_suppliers
 
     def create_accounting_entries(
         self,
-        invoices: List[InvoiceModel],
+        invoices: List[InvoiceLike],
         start_date: datetime = None,
         end_date: datetime = None,
-        supplier_id: int = None
+        supplier_id: str = None,
+        as_records: bool = False,
+        collect_errors: bool = False
     ) -> dict:
-        for invoice in invoices:
-            if invoice.total_value < Decimal("0.00"):
-                raise ValueError(f"Invoice {invoice.number} with amount {invoice.total_value} is not valid.")
+        with self.instrumentation.run("create_accounting_entries"):
+            return self.run_accounting(invoices, start_date, end_date, supplier_id, as_records, collect_errors)
+
+    def create_accounting_entries_for_windows(
+        self,
+        invoices: List[InvoiceLike],
+        windows: Iterable[DateWindow],
+        as_records: bool = False
+    ) -> List[dict]:
+        if isinstance(invoices, InvoiceDateIndex):
+            date_index = invoices
+            date_index.validate(self.validate_accounting_invoice)
+        else:
+            date_index = InvoiceDateIndex.from_invoices(invoices, as_records, self.validate_accounting_invoice)
+
+        with self.instrumentation.run("create_accounting_entries_for_windows"):
+            return [
+                self.create_window_accounting_entries(date_index, start_date, end_date, supplier)
+                for start_date, end_date, supplier in windows
+            ]
+
+    def create_window_accounting_entries(
+        self,
+        date_index: InvoiceDateIndex,
+        start_date: datetime,
+        end_date: datetime,
+        supplier_id: str
+    ) -> dict:
+        sorted_invoices = date_index.between(start_date, end_date, supplier_id)
+
+        with self.instrumentation.stage("group", rows_in=len(sorted_invoices)) as stage:
+            if self.normalize_suppliers:
+                grouped_invoices = self.group_invoices_by_supplier_and_month(sorted_invoices)
+            else:
+                grouped_invoices = date_index.groups(start_date, end_date, supplier_id)
+            stage.rows_out = sum(len(months) for months in grouped_invoices.values())
+
+        with self.instrumentation.stage("entries", rows_in=stage.rows_out) as stage:
+            accounting_entries = self.process_grouped_invoices(grouped_invoices)
+            stage.rows_out = len(accounting_entries)
+
+        return self.build_accounting_result(sorted_invoices, grouped_invoices, accounting_entries)
+
+    def run_accounting(
+        self,
+        invoices: List[InvoiceLike],
+        start_date: datetime,
+        end_date: datetime,
+        supplier_id: str,
+        as_records: bool,
+        collect_errors: bool
+    ) -> dict:
+        instrumentation = self.instrumentation
+        validation_report = None
+        is_queryset = isinstance(invoices, QuerySet)
 
+        if not is_queryset:
+            with instrumentation.stage("validate", rows_in=len(invoices)) as stage:
+                if collect_errors:
+                    invoices, validation_report = self.collect_valid_invoices(invoices)
+                else:
+                    for invoice in invoices:
+                        self.validate_invoice_amount(invoice)
+                stage.rows_out = len(invoices)
+
+        self.invoice_builder.reset()
         if start_date and end_date:
             self.invoice_builder.filter_by_date_range(start_date, end_date)
         if supplier_id:
             self.invoice_builder.filter_by_supplier(supplier_id)
 
-        filtered_invoices = self.invoice_builder.apply_filters(invoices)
-        sorted_invoices = self.invoice_builder.sort_invoices_by_date(filtered_invoices)
+        with instrumentation.stage("filter", rows_in=None if is_queryset else len(invoices)) as stage:
+            filtered_invoices = self.invoice_builder.apply_filters(invoices)
+            stage.rows_out = None if is_queryset else len(filtered_invoices)
+
+        with instrumentation.stage("sort", rows_in=stage.rows_out) as stage:
+            sorted_invoices = self.invoice_builder.sort_invoices_by_date(filtered_invoices)
+            if isinstance(sorted_invoices, QuerySet):
+                sorted_invoices = InvoiceRecord.load_queryset(sorted_invoices) if as_records else list(sorted_invoices)
+            stage.rows_out = len(sorted_invoices) if isinstance(sorted_invoices, list) else None
+
+        if is_queryset:
+            with instrumentation.stage("validate", rows_in=len(sorted_invoices)) as stage:
+                if collect_errors:
+                    sorted_invoices, validation_report = self.collect_valid_invoices(sorted_invoices)
+                else:
+                    for invoice in sorted_invoices:
+                        self.validate_invoice_amount(invoice)
+                stage.rows_out = len(sorted_invoices)
 
         if not isinstance(sorted_invoices, list):
             raise ValueError("Expected sorted_invoices to be a list of InvoiceModel objects.")
 
-        self.validate_invoice_format([invoice.number for invoice in sorted_invoices])
+        if not collect_errors:
+            with instrumentation.stage("validate_format", rows_in=len(sorted_invoices)) as stage:
+                self.validate_invoice_format([invoice.number for invoice in sorted_invoices])
+                stage.rows_out = len(sorted_invoices)
 
-        grouped_invoices = self.group_invoices_by_supplier_and_month(sorted_invoices)
-        accounting_entries = self.process_grouped_invoices(grouped_invoices)
+        with instrumentation.stage("group", rows_in=len(sorted_invoices)) as stage:
+            grouped_invoices = self.group_invoices_by_supplier_and_month(sorted_invoices)
+            stage.rows_out = sum(len(months) for months in grouped_invoices.values())
 
-        missing_invoice_numbers = self.find_missing_invoice_numbers(sorted_invoices)
-        duplicate_invoice_numbers = self.invoice_builder.detect_duplicate_invoice_numbers(sorted_invoices)
+        with instrumentation.stage("entries", rows_in=stage.rows_out) as stage:
+            accounting_entries = self.process_grouped_invoices(grouped_invoices)
+            stage.rows_out = len(accounting_entries)
 
-        return {
+        return self.build_accounting_result(sorted_invoices, grouped_invoices, accounting_entries, validation_report)
+
+    def build_accounting_result(
+        self,
+        sorted_invoices: List[InvoiceLike],
+        grouped_invoices: dict,
+        accounting_entries: list,
+        validation_report: ValidationReport = None
+    ) -> dict:
+        instrumentation = self.instrumentation
+
+        with instrumentation.stage("gaps", rows_in=len(sorted_invoices)) as stage:
+            missing_invoice_numbers = self.find_missing_invoice_numbers(sorted_invoices)
+            stage.rows_out = len(missing_invoice_numbers)
+
+        with instrumentation.stage("duplicates", rows_in=len(sorted_invoices)) as stage:
+            duplicate_invoice_numbers = self.invoice_builder.detect_duplicate_invoice_numbers(sorted_invoices)
+            stage.rows_out = len(duplicate_invoice_numbers)
+
+        result = {
             "grouped_invoices": grouped_invoices,
             "missing_invoice_numbers": missing_invoice_numbers,
             "duplicate_invoice_numbers": duplicate_invoice_numbers,
             "accounting_entries": accounting_entries,
         }
+        if validation_report is not None:
+            result["validation_report"] = validation_report
+        return result
 
-    def group_invoices_by_supplier_and_month(self, invoices: List[InvoiceModel]) -> dict:
-        grouped_invoices = defaultdict(lambda: defaultdict(lambda: {"total_base": Decimal("0.00"), "total_value": Decimal("0.00"), "invoices": []}))
+    def create_journal(
+        self,
+        invoices: List[InvoiceLike],
+        start_date: datetime = None,
+        end_date: datetime = None,
+        supplier_id: str = None,
+        aggregate: bool = False
+    ) -> JournalBatch:
+        self.invoice_builder.reset()
+        if start_date and end_date:
+            self.invoice_builder.filter_by_date_range(start_date, end_date)
+        if supplier_id:
+            self.invoice_builder.filter_by_supplier(supplier_id)
+
+        sorted_invoices = self.invoice_builder.sort_invoices_by_date(self.invoice_builder.apply_filters(invoices))
+        if isinstance(sorted_invoices, QuerySet):
+            sorted_invoices = InvoiceRecord.iterate_queryset(sorted_invoices)
+
+        return self.journal_engine.build(self.iterate_valid_amounts(sorted_invoices), aggregate=aggregate)
+
+    def iterate_valid_amounts(self, invoices: Iterable[InvoiceLike]) -> Iterator[InvoiceLike]:
+        for invoice in invoices:
+            self.validate_invoice_amount(invoice)
+            yield invoice
+
+    def collect_valid_invoices(self, invoices: Iterable[InvoiceLike]) -> Tuple[List[InvoiceLike], ValidationReport]:
+        invoices = list(invoices)
+        validation_report = self.validation_service.validate(invoices)
+        rejected_rows = validation_report.rejected_rows(ignored_codes={"duplicate"})
+        valid_invoices = [invoice for row, invoice in enumerate(invoices) if row not in rejected_rows]
+        return valid_invoices, validation_report
+
+    def validate_invoices(self, invoices: Iterable[InvoiceLike], today: date = None) -> ValidationReport:
+        return InvoiceValidationService().validate(invoices, today)
+
+    def group_invoices_by_supplier_and_month(
+        self,
+        invoices: List[InvoiceLike],
+        aggregate_only: bool = False,
+        with_invoices: bool = False,
+        fixed_point: bool = None
+    ) -> dict:
+        fixed_point = self.fixed_point if fixed_point is None else fixed_point
+
+        if isinstance(invoices, InvoiceSnapshot):
+            if with_invoices or not aggregate_only:
+                raise ValueError("Invoice snapshots only hold grouped totals, not invoices.")
+            return invoices.group_totals(self.normalize_suppliers)
+
+        if aggregate_only:
+            return self.aggregate_invoices_by_supplier_and_month(invoices, with_invoices, fixed_point)
+
+        return self.group_invoices_by_key(invoices, fixed_point, with_count=False, with_invoices=True)
+
+    def group_invoices_in_cents(self, invoices: Iterable[InvoiceLike], with_count: bool, with_invoices: bool) -> dict:
+        return self.group_invoices_by_key(invoices, True, with_count, with_invoices)
+
+    def group_invoices_by_key(self, invoices: Iterable[InvoiceLike], fixed_point: bool, with_count: bool, with_invoices: bool) -> dict:
+        supplier_dictionary = SupplierDictionary(self.normalize_suppliers)
+        supplier_keys = {}
+        month_keys = {}
+        zero = 0 if fixed_point else Decimal("0.00")
+        groups = {}
 
         for invoice in invoices:
-            supplier = invoice.supplier
-            month = invoice.date.strftime("%Y-%m")
+            supplier_key = supplier_keys.get(invoice.supplier)
+            if supplier_key is None:
+                supplier_key = supplier_keys[invoice.supplier] = supplier_dictionary.encode(invoice.supplier) << MONTH_KEY_BITS
+            month_key = month_keys.get(invoice.date)
+            if month_key is None:
+                month_key = month_keys[invoice.date] = invoice.date.year * 12 + invoice.date.month - 1
+
+            group_key = supplier_key | month_key
+            group = groups.get(group_key)
+            if group is None:
+                group = groups[group_key] = [zero, zero, []]
 
-            grouped_invoices[supplier][month]["invoices"].append(invoice)
-            grouped_invoices[supplier][month]["total_base"] += invoice.base_value
-            grouped_invoices[supplier][month]["total_value"] += invoice.total_value
+            if fixed_point:
+                group[0] += to_exact_cents(invoice.base_value)
+                group[1] += to_exact_cents(invoice.total_value)
+            else:
+                group[0] += invoice.base_value
+                group[1] += invoice.total_value
+            group[2].append(invoice)
+
+        return self.decode_invoice_groups(supplier_dictionary, groups, fixed_point, with_count, with_invoices)
+
+    def decode_invoice_groups(
+        self,
+        supplier_dictionary: SupplierDictionary,
+        groups: Dict[int, list],
+        fixed_point: bool,
+        with_count: bool,
+        with_invoices: bool
+    ) -> dict:
+        if with_count:
+            grouped_invoices = defaultdict(lambda: defaultdict(lambda: {"total_base": Decimal("0.00"), "total_value": Decimal("0.00"), "count": 0}))
+        else:
+            grouped_invoices = defaultdict(lambda: defaultdict(lambda: {"total_base": Decimal("0.00"), "total_value": Decimal("0.00"), "invoices": []}))
+
+        for group_key, (total_base, total_value, month_invoices) in groups.items():
+            supplier, month = supplier_dictionary.split_group_key(group_key)
+            if fixed_point:
+                group = {"total_base": from_cents(total_base), "total_value": from_cents(total_value)}
+            else:
+                group = {"total_base": total_base, "total_value": total_value}
+            if with_count:
+                group["count"] = len(month_invoices)
+            if with_invoices:
+                group["invoices"] = month_invoices
+            grouped_invoices[supplier][month] = group
 
         return grouped_invoices
 
-    def process_grouped_invoices(self, grouped_invoices: dict, account_code=None, debit_credit=None) -> list:
-        accounting_entries = []
+    def aggregate_invoices_by_supplier_and_month(
+        self,
+        invoices: List[InvoiceLike],
+        with_invoices: bool = False,
+        fixed_point: bool = False
+    ) -> dict:
+        if not isinstance(invoices, QuerySet):
+            return self.group_invoices_by_key(invoices, fixed_point, with_count=True, with_invoices=with_invoices)
+
+        rows = (
+            invoices.order_by()
+            .values("supplier", month=TruncMonth("date"))
+            .annotate(total_base=Sum("base_value"), total_value=Sum("total_value"), count=Count("id"))
+            .order_by("supplier", "month")
+        )
+
+        grouped_invoices = defaultdict(dict)
+        for row in rows:
+            group = {"total_base": row["total_base"], "total_value": row["total_value"], "count": row["count"]}
+            if with_invoices:
+                month_start = row["month"]
+                next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+                group["invoices"] = invoices.filter(
+                    supplier=row["supplier"],
+                    date__gte=month_start,
+                    date__lt=next_month_start
+                ).order_by("date", "pk")
+
+            grouped_invoices[row["supplier"]][row["month"].strftime("%Y-%m")] = group
+
+        return grouped_invoices
 
+    def process_grouped_invoices(self, grouped_invoices: dict, account_code=None, debit_credit=None, lazy: bool = None) -> list:
         account_code = account_code or AccountingCodes.PURCHASES
         debit_credit = debit_credit or PaymentType.DEBIT
+        lazy = self.lazy_entries if lazy is None else lazy
 
+        if lazy:
+            accounting_entries = AccountingEntriesBatch(account_code, debit_credit)
+            for supplier, months in grouped_invoices.items():
+                for month, details in months.items():
+                    accounting_entries.add_group(supplier, month, details["invoices"])
+            return accounting_entries
+
+        accounting_entries = []
         for supplier, months in grouped_invoices.items():
             for month, details in months.items():
-                for invoice in details["invoices"]:
-                    accounting_entries.append(AccountingEntry(
-                        account_code=account_code,  
-                        debit_credit=debit_credit,  
-                        amount=invoice.total_value,
-                        description=f"Invoice {invoice.number} for {month} from {supplier}",
-                        invoice_number=invoice.number
-                    ))
+                accounting_entries.extend(
+                    self.create_group_entries(supplier, month, details["invoices"], account_code, debit_credit)
+                )
 
         return accounting_entries
 
+    def create_group_entries(
+        self,
+        supplier: str,
+        month: str,
+        invoices: List[InvoiceLike],
+        account_code: AccountingCodes,
+        debit_credit: PaymentType
+    ) -> List[AccountingEntry]:
+        return [
+            AccountingEntry(
+                account_code=account_code,
+                debit_credit=debit_credit,
+                amount=invoice.total_value,
+                description=f"Invoice {invoice.number} for {month} from {supplier}",
+                invoice_number=invoice.number
+            )
+            for invoice in invoices
+        ]
+
+    def stream_accounting_entries(
+        self,
+        invoices: Iterable[InvoiceLike],
+        start_date: datetime = None,
+        end_date: datetime = None,
+        supplier_id: str = None,
+        account_code=None,
+        debit_credit=None,
+        chunk_size: int = 2000,
+        as_records: bool = False
+    ) -> Iterator[AccountingEntry]:
+        account_code = account_code or AccountingCodes.PURCHASES
+        debit_credit = debit_credit or PaymentType.DEBIT
+
+        invoice_builder = InvoiceBuilder()
+        if start_date and end_date:
+            invoice_builder.filter_by_date_range(start_date, end_date)
+        if supplier_id:
+            invoice_builder.filter_by_supplier(supplier_id)
+
+        check_order = False
+        if isinstance(invoices, QuerySet):
+            invoices = invoice_builder.build_queryset(invoices).order_by("supplier", "date", "pk")
+            if as_records:
+                invoices = InvoiceRecord.iterate_queryset(invoices, chunk_size)
+            else:
+                invoices = invoices.iterator(chunk_size=chunk_size)
+        elif isinstance(invoices, list):
+            invoices = sorted(invoices, key=lambda invoice: (invoice.supplier, invoice.date))
+        else:
+            check_order = True
+
+        open_group = None
+        open_invoices = []
+        last_key = None
+
+        for invoice in invoices:
+            self.validate_invoice_amount(invoice)
+
+            if not invoice_builder.matches(invoice):
+                continue
+
+            self.validate_invoice_format([invoice.number])
+
+            if check_order:
+                key = (invoice.supplier, invoice.date)
+                if last_key is not None and key < last_key:
+                    raise ValueError(
+                        f"Invoice stream must be ordered by supplier and date: {invoice.number} "
+                        f"from {invoice.supplier} dated {invoice.date} after {last_key[0]} dated {last_key[1]}."
+                    )
+                last_key = key
+
+            group = (invoice.supplier, invoice.date.year, invoice.date.month)
+            if group != open_group:
+                if open_invoices:
+                    yield from self.create_group_entries(open_group[0], f"{open_group[1]:04d}-{open_group[2]:02d}", open_invoices, account_code, debit_credit)
+                open_group = group
+                open_invoices = []
+
+            open_invoices.append(invoice)
+
+        if open_invoices:
+            yield from self.create_group_entries(open_group[0], f"{open_group[1]:04d}-{open_group[2]:02d}", open_invoices, account_code, debit_credit)
+
+    def validate_invoice_amount(self, invoice: InvoiceLike) -> None:
+        if invoice.total_value < Decimal("0.00"):
+            raise ValueError(f"Invoice {invoice.number} with amount {invoice.total_value} is not valid.")
+
+    def validate_accounting_invoice(self, invoice: InvoiceLike) -> None:
+        self.validate_invoice_amount(invoice)
+        self.validate_invoice_format([invoice.number])
+
     def validate_invoice_format(self, invoice_numbers: List[str]) -> None:
         for invoice_number in invoice_numbers:
             if not invoice_number.startswith("F"):
                 raise ValueError(f"Invalid invoice number format: {invoice_number}")
 
-    def find_missing_invoice_numbers(self, invoices: List[InvoiceModel]) -> list:
-        all_invoice_numbers = [invoice.number for invoice in invoices]
-        expected_invoice_numbers = self.generate_expected_invoice_numbers()
-        return [number for number in expected_invoice_numbers if number not in all_invoice_numbers]
+    def find_missing_invoice_numbers(
+        self,
+        invoices: List[InvoiceLike],
+        series: str = "F2023/",
+        first: int = 1,
+        last: int = 40,
+        width: int = 2
+    ) -> list:
+        if isinstance(invoices, InvoiceSnapshot):
+            return invoices.missing_numbers(series, first, last, width)
 
-    def generate_expected_invoice_numbers(self) -> list:
-        return [f"F2023/{str(i).zfill(2)}" for i in range(1, 41)]
+        invoice_number_index = InvoiceNumberIndex.from_numbers(invoice.number for invoice in invoices)
+        return invoice_number_index.missing_numbers(series, first, last, width)
 
-    def cashflow_projection(self, start_date: datetime, end_date: datetime, invoices: List[InvoiceModel]) -> dict:
-        filtered_invoices = [
-            invoice for invoice in invoices
-            if start_date <= invoice.date <= end_date
-        ]
+    def find_missing_invoice_ranges(self, invoices: List[InvoiceLike]) -> Dict[str, List[Tuple[int, int]]]:
+        if isinstance(invoices, InvoiceSnapshot):
+            return invoices.missing_ranges_by_series()
+
+        invoice_number_index = InvoiceNumberIndex.from_numbers(invoice.number for invoice in invoices)
+        return invoice_number_index.missing_ranges_by_series()
+
+    def generate_expected_invoice_numbers(
+        self,
+        series: str = "F2023/",
+        first: int = 1,
+        last: int = 40,
+        width: int = 2
+    ) -> list:
+        return [f"{series}{str(i).zfill(width)}" for i in range(first, last + 1)]
+
+    def cashflow_projection(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        invoices: List[InvoiceLike],
+        vectorized: bool = False,
+        fixed_point: bool = None
+    ) -> dict:
+        fixed_point = self.fixed_point if fixed_point is None else fixed_point
+
+        if isinstance(invoices, InvoiceSnapshot):
+            return self.cashflow_engine.project(invoices.between(start_date, end_date).invoice_columns(), start_date, end_date)
+
+        if isinstance(invoices, QuerySet):
+            filtered_invoices = invoices.filter(date__range=(start_date, end_date))
+        elif vectorized:
+            filtered_invoices = invoices
+        else:
+            filtered_invoices = [
+                invoice for invoice in invoices
+                if start_date <= invoice.date <= end_date
+            ]
 
         filtered_invoices = self.invoice_builder.apply_filters(filtered_invoices)
 
+        if vectorized:
+            invoice_columns = InvoiceColumns.from_invoices(filtered_invoices)
+            return self.cashflow_engine.project(invoice_columns, start_date, end_date)
+
+        if fixed_point:
+            return self.cashflow_in_cents(filtered_invoices)
+
         sorted_invoices = self.invoice_builder.sort_invoices_by_date(filtered_invoices)
 
         total_balance = sum(invoice.total_value for invoice in sorted_invoices)
@@ -122,3 +530,28 @@ class AccountingInvoiceService:
             "weekly_cashflow": dict(weekly_cashflow),
             "monthly_cashflow": dict(monthly_cashflow),
         }
+
+    def cashflow_projection_for_windows(self, invoices: List[InvoiceLike], windows: Iterable[DateWindow]) -> List[dict]:
+        date_index = invoices if isinstance(invoices, InvoiceDateIndex) else InvoiceDateIndex.from_invoices(invoices)
+        return [date_index.cashflow(start_date, end_date, supplier) for start_date, end_date, supplier in windows]
+
+    def cashflow_in_cents(self, invoices: Iterable[InvoiceLike]) -> dict:
+        cents_by_date = {}
+        for invoice in invoices:
+            invoice_date = invoice.date
+            cents_by_date[invoice_date] = cents_by_date.get(invoice_date, 0) + to_exact_cents(invoice.total_value)
+
+        weekly_cents = {}
+        monthly_cents = {}
+        for invoice_date in sorted(cents_by_date):
+            cents = cents_by_date[invoice_date]
+            week = (invoice_date - timedelta(days=invoice_date.weekday())).strftime("%Y-%m-%d")
+            weekly_cents[week] = weekly_cents.get(week, 0) + cents
+            month = invoice_date.strftime("%Y-%m")
+            monthly_cents[month] = monthly_cents.get(month, 0) + cents
+
+        return {
+            "total_balance": from_cents(sum(cents_by_date.values())) if cents_by_date else 0,
+            "weekly_cashflow": {week: from_cents(cents) for week, cents in weekly_cents.items()},
+            "monthly_cashflow": {month: from_cents(cents) for month, cents in monthly_cents.items()},
+        }
@@ -0,0 +1,167 @@
+import json
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import date, timedelta
+from typing import Dict, Optional
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from inmaticpart2.app.dtos.accounting_job import AccountingJob
+from inmaticpart2.app.dtos.stage_metrics import StageMetrics
+from inmaticpart2.app.instrumentation.accounting_instrumentation import AccountingInstrumentation
+from inmaticpart2.app.instrumentation.metrics_collectors import InMemoryMetricsCollector
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.tenancy.tenant_fair_scheduler import TenantFairScheduler
+from inmaticpart2.models import InvoiceModel
+
+JOB_KINDS = ("accounting", "cashflow")
+DEFAULT_JOB_RETENTION = timedelta(hours=1)
+
+
+class AccountingJobService:
+    def __init__(
+        self,
+        max_workers: int = 2,
+        executor: Optional[Executor] = None,
+        retention: timedelta = DEFAULT_JOB_RETENTION,
+        max_per_tenant: Optional[int] = None
+    ):
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="accounting-job")
+        self.scheduler = TenantFairScheduler(max_workers, max_per_tenant, self.executor)
+        self.retention = retention
+        self.jobs: Dict[str, AccountingJob] = {}
+        self.active_jobs: Dict[str, AccountingJob] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "AccountingJobService":
+        return cls(
+            max_workers=getattr(settings, "ACCOUNTING_JOB_WORKERS", 2),
+            max_per_tenant=getattr(settings, "ACCOUNTING_TENANT_MAX_JOBS", None)
+        )
+
+    def submit(self, kind: str, parameters: dict, tenant: str = DEFAULT_TENANT, user_id: Optional[int] = None) -> AccountingJob:
+        parameters = self.normalize_parameters(kind, parameters, tenant)
+        key = json.dumps([kind, user_id, parameters], sort_keys=True)
+
+        with self.lock:
+            self.prune_finished_jobs()
+            active_job = self.active_jobs.get(key)
+            if active_job is not None:
+                active_job.update(joined_requests=active_job.joined_requests + 1)
+                return active_job
+
+            job = AccountingJob(kind=kind, parameters=parameters, key=key, tenant=tenant, user_id=user_id)
+            self.jobs[job.id] = job
+            self.active_jobs[key] = job
+
+        self.scheduler.submit(parameters["tenant"], self.run_job, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AccountingJob]:
+        return self.jobs.get(job_id)
+
+    def get_for_requester(self, job_id: str, user_id: Optional[int], tenant: str) -> Optional[AccountingJob]:
+        job = self.jobs.get(job_id)
+        if job is None or job.user_id != user_id or job.tenant != tenant:
+            return None
+        return job
+
+    def normalize_parameters(self, kind: str, parameters: dict, tenant: str = DEFAULT_TENANT) -> dict:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Invalid job kind: {kind}")
+
+        try:
+            start_date = date.fromisoformat(str(parameters["start_date"]))
+            end_date = date.fromisoformat(str(parameters["end_date"]))
+        except KeyError as error:
+            raise ValueError(f"{error.args[0]} is required.") from error
+
+        if end_date < start_date:
+            raise ValueError("end_date cannot be before start_date.")
+
+        normalized = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "supplier": parameters.get("supplier") or None,
+            "tenant": tenant,
+        }
+        if kind == "accounting":
+            normalized["include_entries"] = bool(parameters.get("include_entries", False))
+        return normalized
+
+    def run_job(self, job: AccountingJob) -> None:
+        job.update(status="running", started_at=timezone.now())
+        try:
+            result = self.execute(job)
+        except Exception as error:
+            job.update(status="failed", error=str(error), finished_at=timezone.now())
+        else:
+            job.update(status="succeeded", result=result, finished_at=timezone.now())
+        finally:
+            with self.lock:
+                if self.active_jobs.get(job.key) is job:
+                    del self.active_jobs[job.key]
+            close_old_connections()
+
+    def execute(self, job: AccountingJob) -> dict:
+        instrumentation = AccountingInstrumentation(
+            collectors=[InMemoryMetricsCollector(max_runs=1)],
+            stage_listeners=[lambda stage: job.add_stage(self.describe_stage(stage))],
+        )
+        service = AccountingInvoiceService(instrumentation)
+        parameters = job.parameters
+        start_date = date.fromisoformat(parameters["start_date"])
+        end_date = date.fromisoformat(parameters["end_date"])
+
+        invoices = InvoiceModel.objects.for_tenant(parameters["tenant"])
+        if job.kind == "cashflow":
+            if parameters["supplier"]:
+                invoices = invoices.filter(supplier=parameters["supplier"])
+            return service.cashflow_projection(start_date, end_date, invoices, vectorized=True)
+
+        result = service.create_accounting_entries(
+            invoices,
+            start_date,
+            end_date,
+            parameters["supplier"],
+            as_records=True,
+        )
+        return self.describe_accounting_result(result, parameters["include_entries"])
+
+    def describe_accounting_result(self, result: dict, include_entries: bool) -> dict:
+        description = {
+            "grouped_invoices": {
+                supplier: {
+                    month: {"total_base": details["total_base"], "total_value": details["total_value"], "count": len(details["invoices"])}
+                    for month, details in months.items()
+                }
+                for supplier, months in result["grouped_invoices"].items()
+            },
+            "missing_invoice_numbers": result["missing_invoice_numbers"],
+            "duplicate_invoice_numbers": result["duplicate_invoice_numbers"],
+            "accounting_entry_count": len(result["accounting_entries"]),
+        }
+        if include_entries:
+            description["accounting_entries"] = [
+                {
+                    "account_code": entry.account_code.value,
+                    "debit_credit": entry.debit_credit.value,
+                    "amount": entry.amount,
+                    "description": entry.description,
+                    "invoice_number": entry.invoice_number,
+                }
+                for entry in result["accounting_entries"]
+            ]
+        return description
+
+    def describe_stage(self, stage: StageMetrics) -> dict:
+        return asdict(stage)
+
+    def prune_finished_jobs(self) -> None:
+        expired_before = timezone.now() - self.retention
+        for job_id, job in list(self.jobs.items()):
+            if job.is_finished and job.finished_at < expired_before:
+                del self.jobs[job_id]
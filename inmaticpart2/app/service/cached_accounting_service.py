@@ -0,0 +1,150 @@
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+from django.db.models import Q, QuerySet
+from inmaticpart2.app.cache.invoice_data_versions import InvoiceDataVersions
+from inmaticpart2.app.cache.result_cache_backends import get_result_cache_backend
+from inmaticpart2.app.dtos.invoice_columns import InvoiceColumns
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.models import InvoiceModel
+
+RESULT_KEY_PREFIX = "accounting-result"
+
+MonthBucket = Tuple[str, date, date]
+
+
+class CachedAccountingService:
+    def __init__(self, accounting_service: AccountingInvoiceService = None, backend=None, tenant: str = DEFAULT_TENANT):
+        self.accounting_service = accounting_service or AccountingInvoiceService()
+        self.backend = backend or get_result_cache_backend()
+        self.tenant = tenant
+        self.data_versions = InvoiceDataVersions(self.backend, tenant)
+        self.hits = 0
+        self.misses = 0
+
+    def cashflow_projection(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        invoices: Optional[QuerySet] = None,
+        supplier: Optional[str] = None
+    ) -> dict:
+        partials = self.cached_month_buckets("cashflow", start_date, end_date, invoices, supplier, self.compute_cashflow_buckets)
+
+        weekly_cashflow = defaultdict(Decimal)
+        monthly_cashflow = {}
+        for partial in partials:
+            for week, total in partial["weekly_cashflow"].items():
+                weekly_cashflow[week] += total
+            monthly_cashflow.update(partial["monthly_cashflow"])
+
+        return {
+            "total_balance": sum(partial["total_balance"] for partial in partials),
+            "weekly_cashflow": dict(weekly_cashflow),
+            "monthly_cashflow": monthly_cashflow,
+        }
+
+    def group_invoices_by_supplier_and_month(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        invoices: Optional[QuerySet] = None,
+        supplier: Optional[str] = None
+    ) -> dict:
+        buckets = self.month_buckets(start_date, end_date)
+        partials = self.cached_month_buckets("grouping", start_date, end_date, invoices, supplier, self.compute_group_buckets)
+
+        grouped_invoices = defaultdict(dict)
+        for (month, _, _), partial in zip(buckets, partials):
+            for supplier_name, group in partial.items():
+                grouped_invoices[supplier_name][month] = group
+
+        return {supplier_name: grouped_invoices[supplier_name] for supplier_name in sorted(grouped_invoices)}
+
+    def cached_month_buckets(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        invoices: Optional[QuerySet],
+        supplier: Optional[str],
+        compute: Callable[[QuerySet, List[MonthBucket]], Dict[str, dict]]
+    ) -> List[dict]:
+        invoices = InvoiceModel.objects.for_tenant(self.tenant) if invoices is None else invoices
+        if supplier:
+            invoices = invoices.filter(supplier=supplier)
+
+        buckets = self.month_buckets(start_date, end_date)
+        versions = self.data_versions.versions([month for month, _, _ in buckets], supplier or None)
+        scope = self.scope_key(invoices)
+        keys = {
+            month: f"{RESULT_KEY_PREFIX}:{kind}:{scope}:{bucket_start}:{bucket_end}:{versions[month]}"
+            for month, bucket_start, bucket_end in buckets
+        }
+
+        cached = self.backend.get_many(keys.values())
+        missing_buckets = [bucket for bucket in buckets if keys[bucket[0]] not in cached]
+        self.hits += len(buckets) - len(missing_buckets)
+        self.misses += len(missing_buckets)
+
+        if missing_buckets:
+            computed = compute(invoices.filter(self.bucket_filter(missing_buckets)), missing_buckets)
+            fresh = {keys[month]: computed[month] for month, _, _ in missing_buckets}
+            self.backend.set_many(fresh)
+            cached.update(fresh)
+
+        return [cached[keys[month]] for month, _, _ in buckets]
+
+    def compute_cashflow_buckets(self, invoices: QuerySet, buckets: List[MonthBucket]) -> Dict[str, dict]:
+        invoice_columns = InvoiceColumns.from_invoices(invoices)
+        cashflow_engine = self.accounting_service.cashflow_engine
+        return {
+            month: cashflow_engine.project(invoice_columns, bucket_start, bucket_end)
+            for month, bucket_start, bucket_end in buckets
+        }
+
+    def compute_group_buckets(self, invoices: QuerySet, buckets: List[MonthBucket]) -> Dict[str, dict]:
+        partials = {month: {} for month, _, _ in buckets}
+        grouped_invoices = self.accounting_service.group_invoices_by_supplier_and_month(invoices, aggregate_only=True)
+        for supplier, months in grouped_invoices.items():
+            for month, group in months.items():
+                partials[month][supplier] = group
+        return partials
+
+    def month_buckets(self, start_date: datetime, end_date: datetime) -> List[MonthBucket]:
+        start_date = start_date.date() if isinstance(start_date, datetime) else start_date
+        end_date = end_date.date() if isinstance(end_date, datetime) else end_date
+        if end_date < start_date:
+            raise ValueError("end_date cannot be before start_date.")
+
+        buckets = []
+        month_start = start_date.replace(day=1)
+        while month_start <= end_date:
+            next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+            buckets.append((
+                month_start.strftime("%Y-%m"),
+                max(month_start, start_date),
+                min(next_month_start - timedelta(days=1), end_date),
+            ))
+            month_start = next_month_start
+        return buckets
+
+    def bucket_filter(self, buckets: List[MonthBucket]) -> Q:
+        spans = []
+        for _, bucket_start, bucket_end in buckets:
+            if spans and spans[-1][1] + timedelta(days=1) == bucket_start:
+                spans[-1][1] = bucket_end
+            else:
+                spans.append([bucket_start, bucket_end])
+
+        date_filter = Q()
+        for span_start, span_end in spans:
+            date_filter |= Q(date__range=(span_start, span_end))
+        return date_filter
+
+    def scope_key(self, invoices: QuerySet) -> str:
+        query = invoices.order_by().query
+        return hashlib.sha1(f"{invoices.db}:{query}".encode()).hexdigest()[:16]
@@ -0,0 +1,40 @@
+from datetime import datetime
+import numpy as np
+from inmaticpart2.app.dtos.invoice_columns import InvoiceColumns
+from inmaticpart2.app.utils.fixed_point import from_cents
+
+EPOCH_WEEKDAY_OFFSET = 3
+
+
+class ColumnarCashflowEngine:
+    def project(self, columns: InvoiceColumns, start_date: datetime, end_date: datetime) -> dict:
+        in_range = (columns.dates >= np.datetime64(start_date, "D")) & (columns.dates <= np.datetime64(end_date, "D"))
+        dates = columns.dates[in_range]
+        total_cents = columns.total_cents[in_range]
+
+        order = np.argsort(dates, kind="stable")
+        dates = dates[order]
+        total_cents = total_cents[order]
+
+        days = dates.astype(np.int64)
+        week_starts = (days - (days + EPOCH_WEEKDAY_OFFSET) % 7).astype("datetime64[D]")
+        months = dates.astype("datetime64[M]")
+
+        return {
+            "total_balance": from_cents(int(total_cents.sum())) if len(total_cents) else 0,
+            "weekly_cashflow": self.bucket_totals(week_starts, total_cents),
+            "monthly_cashflow": self.bucket_totals(months, total_cents),
+        }
+
+    def bucket_totals(self, sorted_keys: np.ndarray, cents: np.ndarray) -> dict:
+        if len(sorted_keys) == 0:
+            return {}
+
+        bucket_starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        bucket_totals = np.add.reduceat(cents, bucket_starts)
+        bucket_labels = np.datetime_as_string(sorted_keys[bucket_starts])
+
+        return {
+            label: from_cents(total)
+            for label, total in zip(bucket_labels.tolist(), bucket_totals.tolist())
+        }
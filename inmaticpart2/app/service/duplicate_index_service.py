@@ -0,0 +1,177 @@
+import hashlib
+import weakref
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db.models import QuerySet
+from inmaticpart2.app.dtos.duplicate_match import FUZZY_MATCH, NUMBER_MATCH, DuplicateMatch
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike
+from inmaticpart2.app.indexes.bloom_filter import DEFAULT_ERROR_RATE, BloomFilter
+from inmaticpart2.app.indexes.invoice_number_index import InvoiceNumberIndex
+from inmaticpart2.app.indexes.supplier_dictionary import SupplierDictionary
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.utils.batching import batched
+from inmaticpart2.app.utils.fixed_point import to_cents
+from inmaticpart2.models import InvoiceFingerprintModel, InvoiceModel
+
+DEFAULT_LOOKUP_BATCH_SIZE = 1000
+MIN_BLOOM_CAPACITY = 100_000
+KEY_BYTES = 8
+
+
+class DuplicateIndexService:
+    live_services = weakref.WeakSet()
+
+    def __init__(
+        self,
+        use_bloom_filter: bool = False,
+        bloom_error_rate: float = DEFAULT_ERROR_RATE,
+        lookup_batch_size: int = DEFAULT_LOOKUP_BATCH_SIZE,
+        using: str = "default"
+    ):
+        self.supplier_dictionary = SupplierDictionary(normalize=True)
+        self.bloom_error_rate = bloom_error_rate
+        self.lookup_batch_size = lookup_batch_size
+        self.using = using
+        self.bloom_filter: Optional[BloomFilter] = None
+        self.lookups = 0
+
+        if use_bloom_filter:
+            self.load_bloom_filter()
+            DuplicateIndexService.live_services.add(self)
+
+    def hash_key(self, text: str) -> int:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_BYTES).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def normalize_number(self, number: str) -> str:
+        number = "".join(number.split()).upper()
+        parsed = InvoiceNumberIndex.parse_invoice_number(number)
+        if parsed is None:
+            return number
+
+        series, sequence, _ = parsed
+        return f"{series}{sequence}"
+
+    def tenant_prefix(self, tenant: str) -> str:
+        return "" if tenant == DEFAULT_TENANT else f"{tenant}\x1e"
+
+    def number_key(self, supplier: str, number: str, tenant: str = DEFAULT_TENANT) -> int:
+        return self.hash_key(f"{self.tenant_prefix(tenant)}{self.supplier_dictionary.normalize_name(supplier)}\x1f{self.normalize_number(number)}")
+
+    def fuzzy_key(self, supplier: str, total_value: Decimal, invoice_date: date, tenant: str = DEFAULT_TENANT) -> int:
+        return self.hash_key(
+            f"{self.tenant_prefix(tenant)}{self.supplier_dictionary.normalize_name(supplier)}\x1f{to_cents(total_value)}\x1f{invoice_date.toordinal()}"
+        )
+
+    def fingerprint(self, invoice: InvoiceLike) -> Tuple[int, int]:
+        tenant = getattr(invoice, "tenant", DEFAULT_TENANT)
+        return (
+            self.number_key(invoice.supplier, invoice.number, tenant),
+            self.fuzzy_key(invoice.supplier, invoice.total_value, invoice.date, tenant),
+        )
+
+    def load_bloom_filter(self) -> None:
+        fingerprints = InvoiceFingerprintModel.objects.using(self.using)
+        capacity = max(MIN_BLOOM_CAPACITY, 4 * fingerprints.count())
+        bloom_filter = BloomFilter(capacity, self.bloom_error_rate)
+
+        rows = fingerprints.values_list("number_key", "fuzzy_key").iterator(chunk_size=50_000)
+        for rows_batch in batched(rows, 50_000):
+            bloom_filter.add_many(key for keys in rows_batch for key in keys)
+        self.bloom_filter = bloom_filter
+
+    def index_invoices(self, invoices: Iterable[InvoiceModel], batch_size: int = None) -> int:
+        batch_size = batch_size or self.lookup_batch_size
+        if isinstance(invoices, QuerySet):
+            rows = self.iterate_unindexed(invoices, batch_size)
+        else:
+            rows = ((invoice.pk, invoice.supplier, invoice.number, invoice.total_value, invoice.date, invoice.tenant) for invoice in invoices)
+
+        indexed = 0
+        for rows_batch in batched(rows, batch_size):
+            fingerprints = [
+                InvoiceFingerprintModel(
+                    invoice_id=invoice_id,
+                    number_key=self.number_key(supplier, number, tenant),
+                    fuzzy_key=self.fuzzy_key(supplier, total_value, invoice_date, tenant),
+                )
+                for invoice_id, supplier, number, total_value, invoice_date, tenant in rows_batch
+            ]
+            InvoiceFingerprintModel.objects.using(self.using).bulk_create(fingerprints, batch_size=batch_size)
+            DuplicateIndexService.notify_indexed(fingerprint.number_key for fingerprint in fingerprints)
+            DuplicateIndexService.notify_indexed(fingerprint.fuzzy_key for fingerprint in fingerprints)
+            indexed += len(fingerprints)
+
+        return indexed
+
+    def iterate_unindexed(self, invoices: QuerySet, batch_size: int) -> Iterable[tuple]:
+        invoices = invoices.using(self.using).filter(fingerprint__isnull=True).order_by("pk")
+        last_pk = None
+        while True:
+            page = invoices if last_pk is None else invoices.filter(pk__gt=last_pk)
+            rows = list(page.values_list("pk", "supplier", "number", "total_value", "date", "tenant")[:batch_size])
+            if not rows:
+                return
+            yield from rows
+            last_pk = rows[-1][0]
+
+    def index_invoice(self, invoice: InvoiceModel) -> None:
+        number_key, fuzzy_key = self.fingerprint(invoice)
+        InvoiceFingerprintModel.objects.using(self.using).update_or_create(
+            invoice_id=invoice.pk,
+            defaults={"number_key": number_key, "fuzzy_key": fuzzy_key}
+        )
+        DuplicateIndexService.notify_indexed([number_key, fuzzy_key])
+
+    @classmethod
+    def notify_indexed(cls, keys: Iterable[int]) -> None:
+        services = [service for service in list(cls.live_services) if service.bloom_filter is not None]
+        if not services:
+            return
+
+        keys = list(keys)
+        for service in services:
+            service.bloom_filter.add_many(keys)
+
+    def find_duplicates(self, invoices: Iterable[InvoiceLike], first_row: int = 0) -> List[DuplicateMatch]:
+        invoices = list(invoices)
+        fingerprints = [self.fingerprint(invoice) for invoice in invoices]
+        number_matches = self.lookup("number_key", [number_key for number_key, _ in fingerprints])
+        fuzzy_matches = self.lookup("fuzzy_key", [fuzzy_key for _, fuzzy_key in fingerprints])
+
+        duplicate_matches = []
+        number_rows = {}
+        fuzzy_rows = {}
+        for row, (invoice, (number_key, fuzzy_key)) in enumerate(zip(invoices, fingerprints), start=first_row):
+            if number_key in number_matches:
+                duplicate_matches.append(DuplicateMatch(row, invoice.number, NUMBER_MATCH, invoice_id=number_matches[number_key]))
+            elif number_key in number_rows:
+                duplicate_matches.append(DuplicateMatch(row, invoice.number, NUMBER_MATCH, duplicate_of_row=number_rows[number_key]))
+            elif fuzzy_key in fuzzy_matches:
+                duplicate_matches.append(DuplicateMatch(row, invoice.number, FUZZY_MATCH, invoice_id=fuzzy_matches[fuzzy_key]))
+            elif fuzzy_key in fuzzy_rows:
+                duplicate_matches.append(DuplicateMatch(row, invoice.number, FUZZY_MATCH, duplicate_of_row=fuzzy_rows[fuzzy_key]))
+
+            number_rows.setdefault(number_key, row)
+            fuzzy_rows.setdefault(fuzzy_key, row)
+
+        return duplicate_matches
+
+    def lookup(self, key_field: str, keys: List[int]) -> Dict[int, int]:
+        keys = list(dict.fromkeys(keys))
+        if self.bloom_filter is not None and keys:
+            keys = [key for key, maybe_present in zip(keys, self.bloom_filter.contains_many(keys).tolist()) if maybe_present]
+
+        matches = {}
+        for keys_batch in batched(keys, self.lookup_batch_size):
+            self.lookups += 1
+            rows = (
+                InvoiceFingerprintModel.objects.using(self.using)
+                .filter(**{f"{key_field}__in": keys_batch})
+                .order_by("invoice_id")
+                .values_list(key_field, "invoice_id")
+            )
+            for key, invoice_id in rows:
+                matches.setdefault(key, invoice_id)
+        return matches
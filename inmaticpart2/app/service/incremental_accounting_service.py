@@ -0,0 +1,274 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+from django.db import transaction
+from inmaticpart2.app.indexes.invoice_number_index import InvoiceNumberIndex
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.tenancy.tenant_router import TenantDatabaseRouter
+from inmaticpart2.app.utils.batching import batched
+from inmaticpart2.app.utils.fixed_point import from_cents, to_exact_cents
+from inmaticpart2.models import (
+    AccountingRunContributionModel,
+    AccountingRunDuplicateModel,
+    AccountingRunGapModel,
+    AccountingRunGroupModel,
+    AccountingRunStateModel,
+    InvoiceChangeModel,
+    InvoiceModel,
+)
+
+DEFAULT_BATCH_SIZE = 1000
+CONTRIBUTION_FIELDS = ["number", "supplier", "month", "base_cents", "total_cents"]
+
+Interval = Tuple[int, int]
+
+
+class IncrementalAccountingService:
+    def __init__(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        accounting_service: AccountingInvoiceService = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        self.tenant = tenant
+        self.database = TenantDatabaseRouter().db_for_tenant(tenant)
+        self.accounting_service = accounting_service or AccountingInvoiceService()
+        self.batch_size = batch_size
+
+    def load_state(self) -> Tuple[AccountingRunStateModel, bool]:
+        return AccountingRunStateModel.objects.using(self.database).select_for_update().get_or_create(name=self.tenant)
+
+    def pending_changes(self) -> Tuple[List[int], List[int]]:
+        change_ids, invoice_ids = [], {}
+        for change_id, invoice_id in InvoiceChangeModel.objects.using(self.database).filter(tenant=self.tenant).order_by("pk").values_list("pk", "invoice_id"):
+            change_ids.append(change_id)
+            invoice_ids[invoice_id] = None
+        return change_ids, list(invoice_ids)
+
+    def changed_invoices(self, invoice_ids: List[int]) -> List[InvoiceModel]:
+        invoices = []
+        for invoice_ids_batch in batched(invoice_ids, self.batch_size):
+            invoices.extend(InvoiceModel.objects.for_tenant(self.tenant).filter(pk__in=invoice_ids_batch).order_by("pk"))
+        return invoices
+
+    def consume_changes(self, change_ids: List[int]) -> None:
+        for change_ids_batch in batched(change_ids, self.batch_size):
+            InvoiceChangeModel.objects.using(self.database).filter(pk__in=change_ids_batch).delete()
+
+    def run(self, persist: bool = True) -> dict:
+        with transaction.atomic(using=self.database):
+            run_state, first_run = self.load_state()
+            change_ids, invoice_ids = self.pending_changes()
+            if first_run:
+                changed_invoices = list(InvoiceModel.objects.for_tenant(self.tenant).order_by("pk"))
+                removed_ids = []
+            else:
+                changed_invoices = self.changed_invoices(invoice_ids)
+                loaded_ids = {invoice.pk for invoice in changed_invoices}
+                removed_ids = [invoice_id for invoice_id in invoice_ids if invoice_id not in loaded_ids]
+            for invoice in changed_invoices:
+                self.accounting_service.validate_invoice_amount(invoice)
+            self.accounting_service.validate_invoice_format([invoice.number for invoice in changed_invoices])
+
+            removed_invoices = self.apply_changes(run_state, changed_invoices, removed_ids)
+            self.consume_changes(change_ids)
+            run_state.save()
+
+            changed_groups = self.accounting_service.group_invoices_by_supplier_and_month(
+                self.accounting_service.invoice_builder.sort_invoices_by_date(changed_invoices)
+            )
+            accounting_entries = self.accounting_service.process_grouped_invoices(changed_groups)
+            result = self.result(run_state, accounting_entries, len(changed_invoices), removed_invoices)
+
+            if not persist:
+                transaction.set_rollback(True, using=self.database)
+        return result
+
+    def apply_changes(self, run_state: AccountingRunStateModel, invoices: List[InvoiceModel], removed_ids: Iterable[int]) -> int:
+        previous = {}
+        for invoice_ids in batched([invoice.pk for invoice in invoices] + list(removed_ids), self.batch_size):
+            for contribution in run_state.contributions.filter(invoice_id__in=invoice_ids):
+                previous[contribution.invoice_id] = contribution
+
+        group_deltas = defaultdict(lambda: [0, 0, 0])
+        number_deltas = defaultdict(int)
+        for contribution in previous.values():
+            delta = group_deltas[(contribution.supplier, contribution.month)]
+            delta[0] -= contribution.base_cents
+            delta[1] -= contribution.total_cents
+            delta[2] -= 1
+            number_deltas[contribution.number] -= 1
+
+        created, updated = [], []
+        for invoice in invoices:
+            values = (
+                invoice.number,
+                invoice.supplier,
+                invoice.date.strftime("%Y-%m"),
+                to_exact_cents(invoice.base_value),
+                to_exact_cents(invoice.total_value),
+            )
+            contribution = previous.pop(invoice.pk, None)
+            if contribution is None:
+                created.append(AccountingRunContributionModel(run=run_state, invoice_id=invoice.pk, **dict(zip(CONTRIBUTION_FIELDS, values))))
+            else:
+                contribution.number, contribution.supplier, contribution.month, contribution.base_cents, contribution.total_cents = values
+                updated.append(contribution)
+
+            delta = group_deltas[(values[1], values[2])]
+            delta[0] += values[3]
+            delta[1] += values[4]
+            delta[2] += 1
+            number_deltas[values[0]] += 1
+
+        AccountingRunContributionModel.objects.using(self.database).bulk_create(created, batch_size=self.batch_size)
+        AccountingRunContributionModel.objects.using(self.database).bulk_update(updated, CONTRIBUTION_FIELDS, batch_size=self.batch_size)
+        for removed_batch in batched([contribution.pk for contribution in previous.values()], self.batch_size):
+            AccountingRunContributionModel.objects.using(self.database).filter(pk__in=removed_batch).delete()
+
+        self.apply_group_deltas(run_state, group_deltas)
+        added_numbers, removed_numbers = self.apply_number_deltas(run_state, number_deltas)
+        self.apply_gap_changes(run_state, added_numbers, removed_numbers)
+        return len(previous)
+
+    def apply_group_deltas(self, run_state: AccountingRunStateModel, group_deltas: Dict[Tuple[str, str], list]) -> None:
+        keys = [key for key, delta in group_deltas.items() if any(delta)]
+        existing = {}
+        for keys_batch in batched(keys, self.batch_size):
+            suppliers = {supplier for supplier, _ in keys_batch}
+            months = {month for _, month in keys_batch}
+            for group in run_state.groups.filter(supplier__in=suppliers, month__in=months):
+                existing[(group.supplier, group.month)] = group
+
+        created, updated, deleted = [], [], []
+        for key in keys:
+            base_cents, total_cents, count = group_deltas[key]
+            group = existing.get(key)
+            if group is None:
+                created.append(AccountingRunGroupModel(
+                    run=run_state, supplier=key[0], month=key[1], base_cents=base_cents, total_cents=total_cents, count=count
+                ))
+                continue
+
+            group.base_cents += base_cents
+            group.total_cents += total_cents
+            group.count += count
+            (deleted if group.count == 0 else updated).append(group)
+
+        AccountingRunGroupModel.objects.using(self.database).bulk_create(created, batch_size=self.batch_size)
+        AccountingRunGroupModel.objects.using(self.database).bulk_update(updated, ["base_cents", "total_cents", "count"], batch_size=self.batch_size)
+        for deleted_batch in batched([group.pk for group in deleted], self.batch_size):
+            AccountingRunGroupModel.objects.using(self.database).filter(pk__in=deleted_batch).delete()
+
+    def apply_number_deltas(self, run_state: AccountingRunStateModel, number_deltas: Dict[str, int]) -> Tuple[List[str], List[str]]:
+        numbers = [number for number, delta in number_deltas.items() if delta]
+        counts = Counter()
+        duplicates = {}
+        for numbers_batch in batched(numbers, self.batch_size):
+            counts.update(run_state.contributions.filter(number__in=numbers_batch).values_list("number", flat=True))
+            for duplicate in run_state.duplicates.filter(number__in=numbers_batch):
+                duplicates[duplicate.number] = duplicate
+
+        created, updated, deleted = [], [], []
+        added_numbers, removed_numbers = [], []
+        for number in numbers:
+            count = counts[number]
+            previous_count = count - number_deltas[number]
+            if previous_count == 0 and count > 0:
+                added_numbers.append(number)
+            elif previous_count > 0 and count == 0:
+                removed_numbers.append(number)
+
+            duplicate = duplicates.get(number)
+            if count > 1 and duplicate is None:
+                created.append(AccountingRunDuplicateModel(run=run_state, number=number, count=count))
+            elif count > 1:
+                duplicate.count = count
+                updated.append(duplicate)
+            elif duplicate is not None:
+                deleted.append(duplicate.pk)
+
+        AccountingRunDuplicateModel.objects.using(self.database).bulk_create(created, batch_size=self.batch_size)
+        AccountingRunDuplicateModel.objects.using(self.database).bulk_update(updated, ["count"], batch_size=self.batch_size)
+        for deleted_batch in batched(deleted, self.batch_size):
+            AccountingRunDuplicateModel.objects.using(self.database).filter(pk__in=deleted_batch).delete()
+        return added_numbers, removed_numbers
+
+    def apply_gap_changes(self, run_state: AccountingRunStateModel, added_numbers: List[str], removed_numbers: List[str]) -> None:
+        changes = defaultdict(lambda: ([], []))
+        for numbers, position in ((added_numbers, 0), (removed_numbers, 1)):
+            for number in numbers:
+                parsed = InvoiceNumberIndex.parse_invoice_number(number)
+                if parsed is not None:
+                    changes[parsed[0]][position].append(parsed[1])
+
+        series_last = run_state.state.setdefault("series", {})
+        for series, (added, removed) in changes.items():
+            gap_rows = {(gap.first, gap.last): gap for gap in run_state.gaps.filter(series=series)}
+            gaps, last = self.missing_after_changes(sorted(gap_rows), series_last.get(series, 0), added, removed)
+
+            kept = set(gaps)
+            stale = [gap.pk for interval, gap in gap_rows.items() if interval not in kept]
+            AccountingRunGapModel.objects.using(self.database).filter(pk__in=stale).delete()
+            AccountingRunGapModel.objects.using(self.database).bulk_create(
+                [AccountingRunGapModel(run=run_state, series=series, first=first, last=gap_last) for first, gap_last in gaps if (first, gap_last) not in gap_rows],
+                batch_size=self.batch_size
+            )
+
+            if last > 0:
+                series_last[series] = last
+            else:
+                series_last.pop(series, None)
+
+    def missing_after_changes(self, gaps: List[Interval], last: int, added: List[int], removed: List[int]) -> Tuple[List[Interval], int]:
+        added = sorted(added)
+        new_last = max(last, added[-1]) if added else last
+        if new_last > last:
+            gaps = gaps + [(last + 1, new_last)]
+
+        remaining = []
+        position = 0
+        for first, gap_last in gaps:
+            start = first
+            position = bisect_left(added, first, position)
+            while position < len(added) and added[position] <= gap_last:
+                if added[position] > start:
+                    remaining.append((start, added[position] - 1))
+                start = added[position] + 1
+                position += 1
+            if start <= gap_last:
+                remaining.append((start, gap_last))
+
+        merged = []
+        for first, gap_last in sorted(remaining + [(sequence, sequence) for sequence in removed if sequence >= 1]):
+            if merged and merged[-1][1] >= first - 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], gap_last))
+            else:
+                merged.append((first, gap_last))
+
+        if merged and merged[-1][1] >= new_last:
+            new_last = merged.pop()[0] - 1
+        return merged, new_last
+
+    def result(self, run_state: AccountingRunStateModel, accounting_entries: list, processed_invoices: int, removed_invoices: int) -> dict:
+        grouped_invoices = {}
+        for group in run_state.groups.order_by("supplier", "month"):
+            grouped_invoices.setdefault(group.supplier, {})[group.month] = {
+                "total_base": from_cents(group.base_cents),
+                "total_value": from_cents(group.total_cents),
+                "count": group.count,
+            }
+
+        missing_invoice_ranges = {series: [] for series in sorted(run_state.state.get("series", {}))}
+        for series, first, last in run_state.gaps.order_by("series", "first").values_list("series", "first", "last"):
+            missing_invoice_ranges.setdefault(series, []).append((first, last))
+
+        return {
+            "grouped_invoices": grouped_invoices,
+            "missing_invoice_ranges": missing_invoice_ranges,
+            "duplicate_invoice_numbers": list(run_state.duplicates.order_by("number").values_list("number", flat=True)),
+            "accounting_entries": accounting_entries,
+            "processed_invoices": processed_invoices,
+            "removed_invoices": removed_invoices,
+        }
@@ -0,0 +1,308 @@
+import csv
+import json
+import time
+import uuid
+from dataclasses import replace
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+from django.db import IntegrityError, connections, models, transaction
+from inmaticpart2.app.cache.invoice_data_versions import InvoiceDataVersions
+from inmaticpart2.app.dtos.duplicate_match import NUMBER_MATCH
+from inmaticpart2.app.dtos.import_report import DEFAULT_MAX_SAMPLES, ImportReport, RejectedRow
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.app.service.duplicate_index_service import DuplicateIndexService
+from inmaticpart2.app.service.invoice_validation_service import InvoiceValidationService
+from inmaticpart2.app.service.payables_aging_service import PayablesAgingService
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.tenancy.tenant_router import TenantDatabaseRouter
+from inmaticpart2.app.utils.batching import batched
+from inmaticpart2.models import InvoiceChangeModel, InvoiceModel, invoice_number_lock
+
+DEFAULT_CHUNK_SIZE = 5000
+REQUIRED_COLUMNS = ("number", "supplier", "base_value", "vat", "total_value", "date", "due_date")
+INSERT_METHODS = ("executemany", "bulk_create")
+
+
+class ImportedInvoice(NamedTuple):
+    number: str
+    supplier: str
+    concept: str
+    base_value: Decimal
+    vat: Decimal
+    total_value: Decimal
+    date: date
+    due_date: date
+    state: str
+    tenant: str
+    number_lock: Optional[bool]
+
+
+IMPORTED_FIELDS = [InvoiceModel._meta.get_field(field) for field in ImportedInvoice._fields]
+TEXT_FIELD_LIMITS = [
+    (position, field.name, field.max_length)
+    for position, field in enumerate(IMPORTED_FIELDS) if isinstance(field, models.CharField)
+]
+DECIMAL_FIELD_LIMITS = [
+    (position, field.name, field.max_digits, field.decimal_places)
+    for position, field in enumerate(IMPORTED_FIELDS) if isinstance(field, models.DecimalField)
+]
+
+
+class InvoiceImportService:
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        validation_service: InvoiceValidationService = None,
+        insert_method: str = "executemany",
+        duplicate_index: DuplicateIndexService = None,
+        check_duplicates: bool = False,
+        tenant: str = DEFAULT_TENANT,
+        on_reject: Optional[Callable[[RejectedRow], None]] = None,
+        max_rejected_samples: int = DEFAULT_MAX_SAMPLES
+    ):
+        if insert_method not in INSERT_METHODS:
+            raise ValueError(f"Invalid insert method: {insert_method}")
+
+        self.chunk_size = chunk_size
+        self.validation_service = validation_service or InvoiceValidationService()
+        self.insert_method = insert_method
+        self.tenant = tenant
+        self.data_versions = InvoiceDataVersions(tenant=tenant)
+        self.database = TenantDatabaseRouter().db_for_tenant(tenant)
+        self.duplicate_index = duplicate_index or DuplicateIndexService(using=self.database)
+        self.check_duplicates = check_duplicates
+        self.on_reject = on_reject
+        self.max_rejected_samples = max_rejected_samples
+
+    def import_file(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        today: Optional[date] = None
+    ) -> ImportReport:
+        file_format = file_format or Path(path).suffix.lstrip(".").lower()
+
+        with open(path, newline="", encoding="utf-8") as source:
+            if file_format == "csv":
+                rows = csv.DictReader(source)
+            elif file_format in ("jsonl", "ndjson"):
+                rows = self.read_json_lines(source)
+            else:
+                raise ValueError(f"Unsupported import format: {file_format}")
+
+            return self.import_rows(rows, chunk_size, today)
+
+    def read_json_lines(self, lines: Iterable[str]) -> Iterator[Union[Dict, json.JSONDecodeError]]:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                yield error
+
+    def import_rows(self, rows: Iterable[Dict], chunk_size: Optional[int] = None, today: Optional[date] = None) -> ImportReport:
+        chunk_size = chunk_size or self.chunk_size
+        report = ImportReport(max_samples=self.max_rejected_samples)
+        started_at = time.perf_counter()
+
+        for chunk in batched(enumerate(rows, start=1), chunk_size):
+            report.rows_read += len(chunk)
+            invoices, row_numbers = self.parse_chunk(chunk, report)
+
+            validation_report = self.validation_service.validate(invoices, today)
+            for row, issues in validation_report.issues_by_row().items():
+                self.reject(report, RejectedRow(
+                    row=row_numbers[row],
+                    invoice_number=invoices[row].number,
+                    errors=[issue.message for issue in issues],
+                ))
+
+            rejected = validation_report.rejected_rows()
+            valid_rows = [row for row in range(len(invoices)) if row not in rejected]
+            valid_rows = self.reject_existing_numbers(invoices, row_numbers, valid_rows, report)
+
+            if self.check_duplicates:
+                duplicate_rows = self.reject_duplicates([invoices[row] for row in valid_rows], [row_numbers[row] for row in valid_rows], report)
+                valid_rows = [row for position, row in enumerate(valid_rows) if position not in duplicate_rows]
+
+            valid_invoices = [invoices[row] for row in valid_rows]
+            try:
+                self.store_chunk(valid_invoices)
+            except IntegrityError:
+                valid_invoices = self.store_rows(valid_invoices, [row_numbers[row] for row in valid_rows], report)
+            report.rows_imported += len(valid_invoices)
+
+        report.elapsed_seconds = time.perf_counter() - started_at
+        report.rejected_rows.sort(key=lambda rejected_row: rejected_row.row)
+        return report
+
+    def reject(self, report: ImportReport, rejected_row: RejectedRow) -> None:
+        report.reject(rejected_row)
+        if self.on_reject is not None:
+            self.on_reject(rejected_row)
+
+    def reject_existing_numbers(
+        self,
+        invoices: List[ImportedInvoice],
+        row_numbers: List[int],
+        valid_rows: List[int],
+        report: ImportReport
+    ) -> List[int]:
+        existing_numbers = set()
+        for rows_batch in batched(valid_rows, self.duplicate_index.lookup_batch_size):
+            existing_numbers.update(InvoiceModel.objects.for_tenant(self.tenant).filter(
+                number__in={invoices[row].number for row in rows_batch}
+            ).values_list("number", flat=True))
+
+        kept_rows = []
+        for row in valid_rows:
+            number = invoices[row].number
+            if number in existing_numbers:
+                self.reject(report, RejectedRow(row=row_numbers[row], invoice_number=number, errors=[f"Duplicate invoice number: {number}"]))
+            else:
+                kept_rows.append(row)
+        return kept_rows
+
+    def store_chunk(self, invoices: List[ImportedInvoice]) -> List[int]:
+        if not invoices:
+            return []
+
+        import_batch = uuid.uuid4().hex
+        with transaction.atomic(using=self.database):
+            self.insert_chunk(invoices, import_batch)
+            invoice_ids = list(InvoiceModel.objects.using(self.database).filter(import_batch=import_batch).values_list("pk", flat=True))
+            InvoiceChangeModel.record(invoice_ids, self.tenant, self.database)
+            if self.check_duplicates:
+                self.index_chunk(invoice_ids)
+            transaction.on_commit(lambda: self.data_versions.bump(
+                {(invoice.supplier, invoice.date) for invoice in invoices}
+            ), using=self.database)
+            if PayablesAgingService.live_services:
+                transaction.on_commit(lambda: PayablesAgingService.notify_loaded(
+                    InvoiceModel.objects.using(self.database).filter(pk__in=invoice_ids)
+                ), using=self.database)
+        return invoice_ids
+
+    def store_rows(self, invoices: List[ImportedInvoice], row_numbers: List[int], report: ImportReport) -> List[ImportedInvoice]:
+        stored_invoices = []
+        for invoice, row_number in zip(invoices, row_numbers):
+            try:
+                self.store_chunk([invoice])
+            except IntegrityError as error:
+                self.reject(report, RejectedRow(
+                    row=row_number,
+                    invoice_number=invoice.number,
+                    errors=[f"Invoice {invoice.number} violates a database constraint: {error}"],
+                ))
+            else:
+                stored_invoices.append(invoice)
+        return stored_invoices
+
+    def reject_duplicates(self, invoices: List[ImportedInvoice], row_numbers: List[int], report: ImportReport) -> Set[int]:
+        duplicate_rows = set()
+        for duplicate_match in self.duplicate_index.find_duplicates(invoices):
+            row = row_numbers[duplicate_match.row]
+            if duplicate_match.duplicate_of_row is not None:
+                duplicate_match = replace(duplicate_match, duplicate_of_row=row_numbers[duplicate_match.duplicate_of_row])
+
+            flagged_row = RejectedRow(row=row, invoice_number=duplicate_match.invoice_number, errors=[duplicate_match.message])
+            if duplicate_match.kind == NUMBER_MATCH:
+                self.reject(report, flagged_row)
+                duplicate_rows.add(duplicate_match.row)
+            else:
+                report.flag(flagged_row)
+
+        return duplicate_rows
+
+    def index_chunk(self, invoice_ids: List[int]) -> None:
+        for invoice_ids_batch in batched(invoice_ids, self.duplicate_index.lookup_batch_size):
+            self.duplicate_index.index_invoices(InvoiceModel.objects.using(self.database).filter(pk__in=invoice_ids_batch))
+
+    def insert_chunk(self, invoices: List[ImportedInvoice], import_batch: str) -> None:
+        if self.insert_method == "bulk_create":
+            InvoiceModel.objects.using(self.database).bulk_create(
+                [InvoiceModel(**invoice._asdict(), import_batch=import_batch) for invoice in invoices],
+                batch_size=len(invoices)
+            )
+            return
+
+        connection = connections[self.database]
+        operations = connection.ops
+        columns = [InvoiceModel._meta.get_field(field).column for field in ImportedInvoice._fields] + ["import_batch"]
+        sql = "INSERT INTO {table} ({columns}) VALUES ({placeholders})".format(
+            table=operations.quote_name(InvoiceModel._meta.db_table),
+            columns=", ".join(operations.quote_name(column) for column in columns),
+            placeholders=", ".join(["%s"] * len(columns)),
+        )
+
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [(*invoice, import_batch) for invoice in invoices])
+
+    def parse_chunk(self, chunk: List[Tuple[int, Dict]], report: ImportReport) -> Tuple[List[ImportedInvoice], List[int]]:
+        invoices = []
+        row_numbers = []
+
+        for row_number, row in chunk:
+            if isinstance(row, json.JSONDecodeError):
+                self.reject(report, RejectedRow(row=row_number, invoice_number="", errors=[f"Invalid JSON: {row.msg}."]))
+                continue
+            if not isinstance(row, dict):
+                self.reject(report, RejectedRow(row=row_number, invoice_number="", errors=["Row must be a JSON object."]))
+                continue
+
+            errors = [f"{column} is required." for column in REQUIRED_COLUMNS if row.get(column) in (None, "")]
+            if not errors:
+                try:
+                    invoice = self.to_invoice(row)
+                except (InvalidOperation, TypeError, ValueError) as error:
+                    errors.append(f"Invalid value: {error}")
+                else:
+                    errors = self.field_errors(invoice)
+                    if not errors:
+                        invoices.append(invoice)
+                        row_numbers.append(row_number)
+                        continue
+
+            self.reject(report, RejectedRow(row=row_number, invoice_number=str(row.get("number") or ""), errors=errors))
+
+        return invoices, row_numbers
+
+    def field_errors(self, invoice: ImportedInvoice) -> List[str]:
+        errors = []
+        for position, name, max_length in TEXT_FIELD_LIMITS:
+            if len(invoice[position]) > max_length:
+                errors.append(f"{name} must be at most {max_length} characters.")
+
+        for position, name, max_digits, decimal_places in DECIMAL_FIELD_LIMITS:
+            value = invoice[position]
+            if not value.is_finite():
+                errors.append(f"{name} must be a finite number.")
+                continue
+
+            _, digits, exponent = value.as_tuple()
+            decimals = max(-exponent, 0)
+            whole_digits = len(digits) + exponent if digits != (0,) else 0
+            if decimals > decimal_places:
+                errors.append(f"{name} must have at most {decimal_places} decimal places.")
+            elif whole_digits > max_digits - decimal_places:
+                errors.append(f"{name} must have at most {max_digits - decimal_places} digits before the decimal point.")
+        return errors
+
+    def to_invoice(self, row: Dict) -> ImportedInvoice:
+        return ImportedInvoice(
+            number=str(row["number"]),
+            supplier=str(row["supplier"]),
+            concept=str(row.get("concept") or ""),
+            base_value=Decimal(str(row["base_value"])),
+            vat=Decimal(str(row["vat"])),
+            total_value=Decimal(str(row["total_value"])),
+            date=date.fromisoformat(str(row["date"])),
+            due_date=date.fromisoformat(str(row["due_date"])),
+            state=str(row.get("state") or InvoiceStates.PENDING),
+            tenant=self.tenant,
+            number_lock=invoice_number_lock(),
+        )
@@ -0,0 +1,78 @@
+import re
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional, Set
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike
+from inmaticpart2.app.dtos.validation_report import ValidationIssue, ValidationReport
+
+INVOICE_NUMBER_PATTERN = re.compile(r"F")
+ZERO = Decimal("0.00")
+
+
+class InvoiceValidationService:
+    def __init__(self, model_rules: bool = True, number_pattern: re.Pattern = INVOICE_NUMBER_PATTERN):
+        self.model_rules = model_rules
+        self.number_pattern = number_pattern
+
+    def validate(
+        self,
+        invoices: Iterable[InvoiceLike],
+        today: Optional[date] = None,
+        first_row: int = 0,
+        seen_numbers: Optional[Set[str]] = None
+    ) -> ValidationReport:
+        today = today or date.today()
+        model_rules = self.model_rules
+        match_number = self.number_pattern.match
+        seen_numbers = set() if seen_numbers is None else seen_numbers
+        issues = []
+        add_issue = issues.append
+        rows = 0
+
+        for row, invoice in enumerate(invoices, start=first_row):
+            rows += 1
+            number = invoice.number
+            total_value = invoice.total_value
+
+            if not number or number == "UNKNOWN":
+                add_issue(ValidationIssue(row, number, "number", "required", "Invoice number is required."))
+            elif not match_number(number):
+                add_issue(ValidationIssue(row, number, "number", "format", f"Invalid invoice number format: {number}"))
+            elif number in seen_numbers:
+                add_issue(ValidationIssue(row, number, "number", "duplicate", f"Duplicate invoice number: {number}"))
+            else:
+                seen_numbers.add(number)
+
+            if total_value < ZERO:
+                add_issue(ValidationIssue(row, number, "total_value", "negative", f"Invoice {number} with amount {total_value} is not valid."))
+
+            if not model_rules:
+                continue
+
+            base_value = invoice.base_value
+            vat = getattr(invoice, "vat", None)
+            invoice_date = invoice.date
+            due_date = getattr(invoice, "due_date", None)
+
+            if not invoice.supplier:
+                add_issue(ValidationIssue(row, number, "supplier", "required", "Supplier is required."))
+
+            if base_value <= ZERO:
+                add_issue(ValidationIssue(row, number, "base_value", "non_positive", "Base value must be greater than zero."))
+
+            if vat is not None and vat < ZERO:
+                add_issue(ValidationIssue(row, number, "vat", "negative", "VAT cannot be negative."))
+
+            if total_value == ZERO:
+                add_issue(ValidationIssue(row, number, "total_value", "non_positive", "Total value must be greater than zero."))
+
+            if vat is not None and total_value != base_value + vat:
+                add_issue(ValidationIssue(row, number, "total_value", "total_mismatch", f"Total value must be {base_value + vat}."))
+
+            if invoice_date > today:
+                add_issue(ValidationIssue(row, number, "date", "future_date", "Invoice date cannot be in the future."))
+
+            if due_date is not None and due_date < invoice_date:
+                add_issue(ValidationIssue(row, number, "due_date", "due_before_date", "Due date cannot be before the invoice date."))
+
+        return ValidationReport(rows=rows, issues=issues)
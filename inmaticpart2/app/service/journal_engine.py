@@ -0,0 +1,126 @@
+import hashlib
+from typing import Iterable, List, NamedTuple
+import numpy as np
+from django.db.models import QuerySet
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike
+from inmaticpart2.app.dtos.journal_batch import CREDIT, DEBIT, JOURNAL_ACCOUNTS, JournalBatch
+from inmaticpart2.app.utils.fixed_point import to_exact_cents
+
+LINES_PER_ENTRY = len(JOURNAL_ACCOUNTS)
+VAT_LINE = 1
+REFERENCE_MAX_LENGTH = 50
+REFERENCE_DIGEST_LENGTH = 10
+
+
+class JournalColumns(NamedTuple):
+    numbers: List[str]
+    suppliers: List[str]
+    months: List[str]
+    base_cents: np.ndarray
+    vat_cents: np.ndarray
+    total_cents: np.ndarray
+
+
+class JournalEngine:
+    def build(self, invoices: Iterable[InvoiceLike], aggregate: bool = False, verify: bool = True) -> JournalBatch:
+        columns = self.load_columns(invoices)
+        if aggregate:
+            journal_batch = self.build_supplier_month_journal(columns)
+        else:
+            journal_batch = self.build_invoice_journal(columns)
+
+        if verify:
+            journal_batch.verify_balanced()
+        return journal_batch
+
+    def load_columns(self, invoices: Iterable[InvoiceLike]) -> JournalColumns:
+        if isinstance(invoices, QuerySet):
+            rows = invoices.values_list("number", "supplier", "date", "base_value", "vat", "total_value").iterator(chunk_size=5000)
+        else:
+            rows = ((invoice.number, invoice.supplier, invoice.date, invoice.base_value, invoice.vat, invoice.total_value) for invoice in invoices)
+
+        numbers, suppliers, months, base_cents, vat_cents, total_cents = [], [], [], [], [], []
+        months_by_date = {}
+        for number, supplier, invoice_date, base_value, vat, total_value in rows:
+            if vat is None:
+                raise ValueError(f"Invoice {number} has no VAT amount.")
+
+            month = months_by_date.get(invoice_date)
+            if month is None:
+                month = months_by_date[invoice_date] = invoice_date.strftime("%Y-%m")
+
+            numbers.append(number)
+            suppliers.append(supplier)
+            months.append(month)
+            base_cents.append(to_exact_cents(base_value))
+            vat_cents.append(to_exact_cents(vat))
+            total_cents.append(to_exact_cents(total_value))
+
+        return JournalColumns(
+            numbers,
+            suppliers,
+            months,
+            np.array(base_cents, dtype=np.int64),
+            np.array(vat_cents, dtype=np.int64),
+            np.array(total_cents, dtype=np.int64),
+        )
+
+    def build_invoice_journal(self, columns: JournalColumns) -> JournalBatch:
+        return self.build_lines(columns.base_cents, columns.vat_cents, columns.total_cents, columns.numbers, columns.suppliers, columns.months)
+
+    def build_supplier_month_journal(self, columns: JournalColumns) -> JournalBatch:
+        group_ids = {}
+        invoice_groups = np.fromiter(
+            (group_ids.setdefault(key, len(group_ids)) for key in zip(columns.suppliers, columns.months)),
+            dtype=np.int64,
+            count=len(columns.numbers)
+        )
+        group_keys = list(group_ids)
+
+        base_cents = np.zeros(len(group_keys), dtype=np.int64)
+        vat_cents = np.zeros(len(group_keys), dtype=np.int64)
+        total_cents = np.zeros(len(group_keys), dtype=np.int64)
+        np.add.at(base_cents, invoice_groups, columns.base_cents)
+        np.add.at(vat_cents, invoice_groups, columns.vat_cents)
+        np.add.at(total_cents, invoice_groups, columns.total_cents)
+
+        suppliers = [supplier for supplier, _ in group_keys]
+        months = [month for _, month in group_keys]
+        references = [self.aggregate_reference(supplier, month) for supplier, month in group_keys]
+        return self.build_lines(base_cents, vat_cents, total_cents, references, suppliers, months, aggregated=True)
+
+    def aggregate_reference(self, supplier: str, month: str) -> str:
+        reference = f"{month}/{supplier}"
+        if len(reference) <= REFERENCE_MAX_LENGTH:
+            return reference
+
+        digest = hashlib.sha1(supplier.encode("utf-8")).hexdigest()[:REFERENCE_DIGEST_LENGTH]
+        return f"{reference[:REFERENCE_MAX_LENGTH - REFERENCE_DIGEST_LENGTH - 1]}~{digest}"
+
+    def build_lines(
+        self,
+        base_cents: np.ndarray,
+        vat_cents: np.ndarray,
+        total_cents: np.ndarray,
+        references: List[str],
+        suppliers: List[str],
+        months: List[str],
+        aggregated: bool = False
+    ) -> JournalBatch:
+        entries = len(references)
+        amount_cents = np.column_stack((base_cents, vat_cents, total_cents)).ravel()
+        accounts = np.tile(np.arange(LINES_PER_ENTRY, dtype=np.int8), entries)
+        sides = np.tile(np.array([DEBIT, DEBIT, CREDIT], dtype=np.int8), entries)
+        entry_ids = np.repeat(np.arange(entries, dtype=np.int64), LINES_PER_ENTRY)
+
+        keep = (accounts != VAT_LINE) | (amount_cents != 0)
+        return JournalBatch(
+            entry_ids=entry_ids[keep],
+            accounts=accounts[keep],
+            sides=sides[keep],
+            amount_cents=amount_cents[keep],
+            references=references,
+            suppliers=suppliers,
+            months=months,
+            aggregated=aggregated,
+        )
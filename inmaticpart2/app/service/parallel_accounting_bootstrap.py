@@ -0,0 +1,11 @@
+from typing import Dict
+import django
+from django.conf import settings
+from django.db import connections
+
+
+def initialize_worker(database_names: Dict[str, str]) -> None:
+    for alias, name in database_names.items():
+        settings.DATABASES[alias]["NAME"] = name
+    django.setup()
+    connections.close_all()
@@ -0,0 +1,176 @@
+import multiprocessing
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Tuple
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, QuerySet
+from django.db.models.functions import TruncMonth
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike, InvoiceRecord
+from inmaticpart2.app.instrumentation.accounting_instrumentation import AccountingInstrumentation
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.service.parallel_accounting_bootstrap import initialize_worker
+from inmaticpart2.app.service.parallel_accounting_workers import account_invoice_range, reset_worker_connections, shard_months
+from inmaticpart2.app.utils.fixed_point import from_cents
+
+DEFAULT_MIN_PARALLEL_INVOICES = 50_000
+SHARDS_PER_WORKER = 2
+
+
+class ParallelAccountingInvoiceService(AccountingInvoiceService):
+    executors: Dict[Tuple[int, str, tuple], ProcessPoolExecutor] = {}
+    executors_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        min_parallel_invoices: int = DEFAULT_MIN_PARALLEL_INVOICES,
+        instrumentation: AccountingInstrumentation = None,
+        fixed_point: bool = False,
+        lazy_entries: bool = False,
+        normalize_suppliers: bool = False,
+        start_method: str = None
+    ):
+        super().__init__(instrumentation, fixed_point, lazy_entries, normalize_suppliers)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel_invoices = min_parallel_invoices
+        self.start_method = start_method or settings.ACCOUNTING_PARALLEL_START_METHOD
+
+    @classmethod
+    def get_executor(cls, max_workers: int, start_method: str) -> ProcessPoolExecutor:
+        database_names = {alias: connections[alias].settings_dict["NAME"] for alias in connections}
+        key = (max_workers, start_method, tuple(sorted(database_names.items())))
+        with cls.executors_lock:
+            executor = cls.executors.get(key)
+            if executor is None:
+                executor = cls.executors[key] = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context(start_method),
+                    initializer=initialize_worker,
+                    initargs=(database_names,)
+                )
+            return executor
+
+    @contextmanager
+    def executor(self) -> Iterator[ProcessPoolExecutor]:
+        if self.start_method != "fork":
+            yield self.get_executor(self.max_workers, self.start_method)
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=reset_worker_connections
+        )
+        try:
+            yield executor
+        finally:
+            executor.shutdown()
+
+    @classmethod
+    def shutdown_executors(cls) -> None:
+        with cls.executors_lock:
+            for executor in cls.executors.values():
+                executor.shutdown()
+            cls.executors.clear()
+
+    def can_run_in_parallel(self, invoices: List[InvoiceLike], as_records: bool, collect_errors: bool) -> bool:
+        return (
+            self.max_workers > 1
+            and isinstance(invoices, QuerySet)
+            and as_records
+            and not collect_errors
+            and not self.normalize_suppliers
+            and self.start_method in multiprocessing.get_all_start_methods()
+            and (self.start_method == "fork" or not self.uses_in_memory_database(invoices.db))
+        )
+
+    def uses_in_memory_database(self, database: str) -> bool:
+        connection = connections[database]
+        return connection.vendor == "sqlite" and connection.is_in_memory_db()
+
+    def run_accounting(
+        self,
+        invoices: List[InvoiceLike],
+        start_date: datetime,
+        end_date: datetime,
+        supplier_id: str,
+        as_records: bool,
+        collect_errors: bool
+    ) -> dict:
+        if not self.can_run_in_parallel(invoices, as_records, collect_errors):
+            return super().run_accounting(invoices, start_date, end_date, supplier_id, as_records, collect_errors)
+
+        instrumentation = self.instrumentation
+
+        self.invoice_builder.reset()
+        if start_date and end_date:
+            self.invoice_builder.filter_by_date_range(start_date, end_date)
+        if supplier_id:
+            self.invoice_builder.filter_by_supplier(supplier_id)
+
+        with instrumentation.stage("plan") as stage:
+            filtered_invoices = self.invoice_builder.apply_filters(invoices)
+            month_counts = list(
+                filtered_invoices.order_by()
+                .annotate(month=TruncMonth("date"))
+                .values("month")
+                .annotate(count=Count("id"))
+                .values_list("month", "count")
+                .order_by("month")
+            )
+            invoice_count = sum(count for _, count in month_counts)
+            stage.rows_out = invoice_count
+
+        if invoice_count < self.min_parallel_invoices:
+            return super().run_accounting(invoices, start_date, end_date, supplier_id, as_records, collect_errors)
+
+        with instrumentation.stage("load", rows_in=invoice_count) as stage, self.executor() as executor:
+            futures = [
+                executor.submit(account_invoice_range, filtered_invoices.query, filtered_invoices.db, first_month, stop_month)
+                for first_month, stop_month in shard_months(month_counts, self.max_workers * SHARDS_PER_WORKER)
+            ]
+
+            sorted_invoices = []
+            grouped_invoices = defaultdict(lambda: defaultdict(lambda: {"total_base": Decimal("0.00"), "total_value": Decimal("0.00"), "invoices": []}))
+            for future in futures:
+                self.merge_invoice_range(future.result(), sorted_invoices, grouped_invoices)
+            stage.rows_out = len(sorted_invoices)
+
+        with instrumentation.stage("entries", rows_in=sum(len(months) for months in grouped_invoices.values())) as stage:
+            accounting_entries = self.process_grouped_invoices(grouped_invoices)
+            stage.rows_out = len(accounting_entries)
+
+        return self.build_accounting_result(sorted_invoices, grouped_invoices, accounting_entries)
+
+    def merge_invoice_range(self, invoice_range: tuple, sorted_invoices: List[InvoiceRecord], grouped_invoices: dict) -> None:
+        numbers, suppliers, supplier_ids, ordinals, base_cents, vat_cents, total_cents, pks, groups = invoice_range
+
+        dates = {ordinal: date.fromordinal(ordinal) for ordinal in set(ordinals)}
+        offset = len(sorted_invoices)
+        sorted_invoices.extend(
+            InvoiceRecord(
+                number,
+                suppliers[supplier_id],
+                dates[ordinal],
+                from_cents(invoice_base_cents),
+                from_cents(invoice_total_cents),
+                pk,
+                from_cents(invoice_vat_cents)
+            )
+            for number, supplier_id, ordinal, invoice_base_cents, invoice_vat_cents, invoice_total_cents, pk in zip(
+                numbers, supplier_ids, ordinals, base_cents, vat_cents, total_cents, pks
+            )
+        )
+
+        for supplier_id, month, group_base_cents, group_total_cents, positions in groups:
+            grouped_invoices[suppliers[supplier_id]][month] = {
+                "total_base": from_cents(group_base_cents),
+                "total_value": from_cents(group_total_cents),
+                "invoices": [sorted_invoices[offset + position] for position in positions],
+            }
@@ -0,0 +1,91 @@
+from array import array
+from datetime import date
+from typing import List, Tuple
+from django.db import close_old_connections, connections
+from django.db.models.sql import Query
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
+from inmaticpart2.app.indexes.supplier_dictionary import MONTH_KEY_BITS, SupplierDictionary
+from inmaticpart2.app.instrumentation.accounting_instrumentation import AccountingInstrumentation
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.utils.fixed_point import to_exact_cents
+from inmaticpart2.models import InvoiceModel
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def shard_months(month_counts: List[Tuple[date, int]], shards: int) -> List[Tuple[date, date]]:
+    total = sum(count for _, count in month_counts)
+    target = max(1, -(-total // max(1, shards)))
+
+    month_ranges = []
+    first_month, shard_count = None, 0
+    for month, count in month_counts:
+        if first_month is None:
+            first_month = month
+        shard_count += count
+        if shard_count >= target:
+            month_ranges.append((first_month, next_month(month)))
+            first_month, shard_count = None, 0
+
+    if first_month is not None:
+        month_ranges.append((first_month, next_month(month_counts[-1][0])))
+    return month_ranges
+
+
+def reset_worker_connections() -> None:
+    for connection in connections.all(initialized_only=True):
+        if connection.vendor != "sqlite" or not connection.is_in_memory_db():
+            connection.connection = None
+
+
+def account_invoice_range(query: Query, database: str, first_month: date, stop_month: date) -> tuple:
+    close_old_connections()
+
+    queryset = InvoiceModel.objects.using(database).all()
+    queryset.query = query
+    invoices = InvoiceRecord.load_queryset(queryset.filter(date__gte=first_month, date__lt=stop_month).order_by("date", "pk"))
+
+    service = AccountingInvoiceService(instrumentation=AccountingInstrumentation())
+    for invoice in invoices:
+        service.validate_invoice_amount(invoice)
+    service.validate_invoice_format([invoice.number for invoice in invoices])
+
+    supplier_dictionary = SupplierDictionary()
+    supplier_ids = array("l")
+    base_cents = array("q")
+    vat_cents = array("q")
+    total_cents = array("q")
+    groups = {}
+    for position, invoice in enumerate(invoices):
+        supplier_id = supplier_dictionary.encode(invoice.supplier)
+        invoice_base_cents = to_exact_cents(invoice.base_value)
+        invoice_total_cents = to_exact_cents(invoice.total_value)
+        supplier_ids.append(supplier_id)
+        base_cents.append(invoice_base_cents)
+        vat_cents.append(to_exact_cents(invoice.vat))
+        total_cents.append(invoice_total_cents)
+
+        group_key = supplier_id << MONTH_KEY_BITS | (invoice.date.year * 12 + invoice.date.month - 1)
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = [0, 0, array("l")]
+        group[0] += invoice_base_cents
+        group[1] += invoice_total_cents
+        group[2].append(position)
+
+    return (
+        [invoice.number for invoice in invoices],
+        supplier_dictionary.names,
+        supplier_ids,
+        array("l", [invoice.date.toordinal() for invoice in invoices]),
+        base_cents,
+        vat_cents,
+        total_cents,
+        array("q", [invoice.pk for invoice in invoices]),
+        [
+            (group_key >> MONTH_KEY_BITS, supplier_dictionary.split_group_key(group_key)[1], group_base_cents, group_total_cents, positions)
+            for group_key, (group_base_cents, group_total_cents, positions) in groups.items()
+        ],
+    )
@@ -0,0 +1,218 @@
+import weakref
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Iterable, List, Optional, Tuple
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import QuerySet
+from inmaticpart2.app.cache.invoice_data_versions import InvoiceDataVersions
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.app.indexes.payables_index import PayablesIndex
+from inmaticpart2.app.utils.batching import batched
+from inmaticpart2.app.utils.fixed_point import from_cents, to_exact_cents
+from inmaticpart2.models import InvoiceChangeModel, InvoiceModel
+
+OPEN_STATES = (InvoiceStates.PENDING, InvoiceStates.ACCOUNTED)
+AGING_BUCKETS = (("1-30", 1, 30), ("31-60", 31, 60), ("61-90", 61, 90))
+OVERDUE_BUCKET = "90+"
+CURRENT_BUCKET = "current"
+MARK_PAID_BATCH_SIZE = 1000
+
+
+class PayablesAgingService:
+    live_services = weakref.WeakSet()
+
+    def __init__(
+        self,
+        index: Optional[PayablesIndex] = None,
+        track_changes: bool = True,
+        using: str = DEFAULT_DB_ALIAS,
+        tenant: Optional[str] = None,
+        supplier: Optional[str] = None
+    ):
+        self.index = index or PayablesIndex()
+        self.using = using
+        self.tenant = tenant
+        self.supplier = supplier
+        if track_changes:
+            PayablesAgingService.live_services.add(self)
+
+    @classmethod
+    def from_invoices(
+        cls,
+        invoices: Optional[Iterable[InvoiceModel]] = None,
+        track_changes: Optional[bool] = None,
+        tenant: Optional[str] = None,
+        supplier: Optional[str] = None
+    ) -> "PayablesAgingService":
+        if invoices is not None and track_changes:
+            raise ValueError("Only services loaded from their own tenant and supplier filter can track changes.")
+
+        if invoices is None:
+            invoices = InvoiceModel.objects.for_tenant(tenant) if tenant else InvoiceModel.objects.using(DEFAULT_DB_ALIAS)
+            if supplier is not None:
+                invoices = invoices.filter(supplier=supplier)
+            service = cls(track_changes=track_changes is not False, using=invoices.db, tenant=tenant, supplier=supplier)
+        else:
+            service = cls(track_changes=False)
+        service.load(invoices)
+        return service
+
+    def load(self, invoices: Iterable[InvoiceModel]) -> None:
+        if isinstance(invoices, QuerySet):
+            rows = invoices.filter(state__in=OPEN_STATES).values_list("pk", "due_date", "total_value").iterator(chunk_size=5000)
+        else:
+            rows = (
+                (self.invoice_key(invoice), invoice.due_date, invoice.total_value)
+                for invoice in invoices
+                if invoice.state in OPEN_STATES
+            )
+
+        for invoice_key, due_date, total_value in rows:
+            with self.index.lock:
+                self.index.add(invoice_key, due_date, to_exact_cents(total_value))
+
+    def covers(self, invoice: InvoiceModel) -> bool:
+        return (
+            (self.tenant is None or invoice.tenant == self.tenant)
+            and (self.supplier is None or invoice.supplier == self.supplier)
+        )
+
+    def apply(self, invoice: InvoiceModel) -> None:
+        with self.index.lock:
+            if invoice.state in OPEN_STATES and self.covers(invoice):
+                self.index.add(self.invoice_key(invoice), invoice.due_date, to_exact_cents(invoice.total_value))
+            else:
+                self.index.remove(self.invoice_key(invoice))
+
+    def discard(self, invoice_key) -> None:
+        with self.index.lock:
+            self.index.remove(invoice_key)
+
+    def mark_paid(self, invoice_ids: Iterable[int], using: Optional[str] = None) -> int:
+        using = using or self.using
+        with transaction.atomic(using=using):
+            paid_invoices = list(InvoiceModel.objects.using(using).select_for_update().filter(
+                pk__in=list(invoice_ids),
+                state__in=OPEN_STATES
+            ).values_list("pk", "tenant", "supplier", "date"))
+            paid_ids = [invoice_id for invoice_id, _, _, _ in paid_invoices]
+            for paid_ids_batch in batched(paid_ids, MARK_PAID_BATCH_SIZE):
+                InvoiceModel.objects.using(using).filter(pk__in=paid_ids_batch).update(state=InvoiceStates.PAID)
+
+            tenant_invoice_ids, tenant_buckets = defaultdict(list), defaultdict(set)
+            for invoice_id, tenant, supplier, invoice_date in paid_invoices:
+                tenant_invoice_ids[tenant].append(invoice_id)
+                tenant_buckets[tenant].add((supplier, invoice_date))
+            for tenant, tenant_ids in tenant_invoice_ids.items():
+                InvoiceChangeModel.record(tenant_ids, tenant, using)
+                transaction.on_commit(partial(InvoiceDataVersions(tenant=tenant).bump, tenant_buckets[tenant]), using=using)
+            transaction.on_commit(lambda: PayablesAgingService.notify_removed(paid_ids, using), using=using)
+        return len(paid_ids)
+
+    @classmethod
+    def notify_saved(cls, invoice: InvoiceModel, using: str = DEFAULT_DB_ALIAS) -> None:
+        for service in list(cls.live_services):
+            if service.using == using:
+                service.apply(invoice)
+
+    @classmethod
+    def notify_loaded(cls, invoices: QuerySet) -> None:
+        for service in list(cls.live_services):
+            if service.using != invoices.db:
+                continue
+            service_invoices = invoices if service.tenant is None else invoices.filter(tenant=service.tenant)
+            if service.supplier is not None:
+                service_invoices = service_invoices.filter(supplier=service.supplier)
+            service.load(service_invoices)
+
+    @classmethod
+    def notify_removed(cls, invoice_keys: Iterable, using: str = DEFAULT_DB_ALIAS) -> None:
+        invoice_keys = list(invoice_keys)
+        for service in list(cls.live_services):
+            if service.using != using:
+                continue
+            with service.index.lock:
+                for invoice_key in invoice_keys:
+                    service.index.remove(invoice_key)
+
+    def open_payables(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> dict:
+        with self.index.lock:
+            if start_date is None and end_date is None:
+                cents, count = self.index.due_until(date.max)
+            elif start_date is None:
+                cents, count = self.index.due_until(self.as_date(end_date))
+            elif end_date is None:
+                cents, count = self.index.due_after(self.as_date(start_date))
+            else:
+                cents, count = self.index.due_between(self.as_date(start_date), self.as_date(end_date))
+            return self.payables_total(cents, count)
+
+    def open_payables_by_week(self, start_date: datetime, end_date: datetime) -> dict:
+        with self.index.lock:
+            return {
+                week_start.isoformat(): self.payables_total(*self.index.due_between(max(week_start, start), min(week_end, end)))
+                for start, end in [self.date_range(start_date, end_date)]
+                for week_start, week_end in self.week_windows(start, end)
+            }
+
+    def aging_buckets(self, as_of: datetime) -> dict:
+        with self.index.lock:
+            as_of = self.as_date(as_of)
+            buckets = {CURRENT_BUCKET: self.payables_total(*self.index.due_after(as_of))}
+            for name, first_day, last_day in AGING_BUCKETS:
+                buckets[name] = self.payables_total(*self.index.due_between(as_of - timedelta(days=last_day), as_of - timedelta(days=first_day)))
+            buckets[OVERDUE_BUCKET] = self.payables_total(*self.index.due_until(as_of - timedelta(days=AGING_BUCKETS[-1][2] + 1)))
+            return buckets
+
+    def forward_projection(self, as_of: datetime, horizon_days: int = 90, step_days: int = 7) -> dict:
+        if horizon_days < 0 or step_days <= 0:
+            raise ValueError("horizon_days cannot be negative and step_days must be positive.")
+
+        as_of = self.as_date(as_of)
+        with self.index.lock:
+            overdue_cents, overdue_count = self.index.due_until(as_of - timedelta(days=1))
+            cumulative_cents = overdue_cents
+
+            periods = []
+            for offset in range(0, horizon_days, step_days):
+                period_start = as_of + timedelta(days=offset)
+                period_end = as_of + timedelta(days=min(offset + step_days, horizon_days) - 1)
+                cents, count = self.index.due_between(period_start, period_end)
+                cumulative_cents += cents
+                periods.append({
+                    "start_date": period_start,
+                    "end_date": period_end,
+                    "total_value": from_cents(cents),
+                    "count": count,
+                    "cumulative_value": from_cents(cumulative_cents),
+                })
+
+            return {
+                "overdue": self.payables_total(overdue_cents, overdue_count),
+                "periods": periods,
+            }
+
+    def payables_total(self, cents: int, count: int) -> dict:
+        return {"total_value": from_cents(cents), "count": count}
+
+    def week_windows(self, start_date: date, end_date: date) -> List[Tuple[date, date]]:
+        week_start = start_date - timedelta(days=start_date.weekday())
+        windows = []
+        while week_start <= end_date:
+            windows.append((week_start, week_start + timedelta(days=6)))
+            week_start += timedelta(days=7)
+        return windows
+
+    def date_range(self, start_date: datetime, end_date: datetime) -> Tuple[date, date]:
+        start_date, end_date = self.as_date(start_date), self.as_date(end_date)
+        if end_date < start_date:
+            raise ValueError("end_date cannot be before start_date.")
+        return start_date, end_date
+
+    def as_date(self, value: datetime) -> date:
+        return value.date() if isinstance(value, datetime) else value
+
+    def invoice_key(self, invoice: InvoiceModel):
+        invoice_key = getattr(invoice, "pk", None)
+        return invoice_key if invoice_key is not None else (invoice.supplier, invoice.number)
@@ -0,0 +1,40 @@
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+from django.conf import settings
+from django.db import close_old_connections
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.tenancy.tenant_fair_scheduler import TenantFairScheduler
+from inmaticpart2.models import InvoiceModel
+
+
+class TenantAccountingService:
+    def __init__(
+        self,
+        scheduler: Optional[TenantFairScheduler] = None,
+        accounting_service_factory: Callable[[], AccountingInvoiceService] = AccountingInvoiceService
+    ):
+        self.scheduler = scheduler or TenantFairScheduler(
+            max_workers=getattr(settings, "ACCOUNTING_JOB_WORKERS", 2),
+            max_per_tenant=getattr(settings, "ACCOUNTING_TENANT_MAX_JOBS", None)
+        )
+        self.accounting_service_factory = accounting_service_factory
+
+    def submit(self, tenant: str, start_date: datetime, end_date: datetime, supplier_id: str = None) -> Future:
+        return self.scheduler.submit(tenant, self.create_accounting_entries, tenant, start_date, end_date, supplier_id)
+
+    def create_accounting_entries(self, tenant: str, start_date: datetime, end_date: datetime, supplier_id: str = None) -> dict:
+        try:
+            return self.accounting_service_factory().create_accounting_entries(
+                InvoiceModel.objects.for_tenant(tenant),
+                start_date,
+                end_date,
+                supplier_id,
+                as_records=True,
+            )
+        finally:
+            close_old_connections()
+
+    def run_for_tenants(self, tenants: Iterable[str], start_date: datetime, end_date: datetime) -> Dict[str, dict]:
+        futures = {tenant: self.submit(tenant, start_date, end_date) for tenant in tenants}
+        return {tenant: future.result() for tenant, future in futures.items()}
@@ -0,0 +1,334 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from django.db.models import QuerySet
+from django.utils import timezone
+from inmaticpart2.app.dtos.invoice_columns import UNIX_EPOCH_ORDINAL, InvoiceColumns
+from inmaticpart2.app.dtos.invoice_record import InvoiceLike
+from inmaticpart2.app.indexes.invoice_number_index import InvoiceNumberIndex
+from inmaticpart2.app.indexes.supplier_dictionary import SupplierDictionary
+from inmaticpart2.app.utils.fixed_point import from_cents, to_exact_cents
+
+SNAPSHOT_FORMAT_VERSION = 3
+MANIFEST_FILE = "manifest.json"
+COLUMNS_DIRECTORY_PREFIX = "columns-"
+SNAPSHOT_COLUMNS = ("dates", "base_cents", "total_cents", "supplier_codes", "series_codes", "sequences", "sequence_widths")
+UNPARSED_SERIES = -1
+
+
+class InvoiceSnapshot:
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        suppliers: SupplierDictionary,
+        series: List[str],
+        series_widths: List[int],
+        unparsed_numbers: List[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        path: Optional[str] = None
+    ):
+        lengths = {len(column) for column in columns.values()}
+        if set(columns) != set(SNAPSHOT_COLUMNS) or len(lengths) > 1:
+            raise ValueError("Snapshot columns are incomplete or have different lengths.")
+
+        self.columns = columns
+        self.suppliers = suppliers
+        self.series = series
+        self.series_widths = series_widths
+        self.unparsed_numbers = unparsed_numbers
+        self.start_date = start_date
+        self.end_date = end_date
+        self.path = path
+
+    def __len__(self):
+        return len(self.columns["dates"])
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.columns["dates"]
+
+    @property
+    def base_cents(self) -> np.ndarray:
+        return self.columns["base_cents"]
+
+    @property
+    def total_cents(self) -> np.ndarray:
+        return self.columns["total_cents"]
+
+    @property
+    def supplier_codes(self) -> np.ndarray:
+        return self.columns["supplier_codes"]
+
+    @property
+    def series_codes(self) -> np.ndarray:
+        return self.columns["series_codes"]
+
+    @property
+    def sequences(self) -> np.ndarray:
+        return self.columns["sequences"]
+
+    @property
+    def sequence_widths(self) -> np.ndarray:
+        return self.columns["sequence_widths"]
+
+    @classmethod
+    def export(
+        cls,
+        invoices: Iterable[InvoiceLike],
+        path: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> "InvoiceSnapshot":
+        if isinstance(invoices, QuerySet):
+            if start_date and end_date:
+                invoices = invoices.filter(date__range=(start_date, end_date))
+            rows = invoices.order_by("date", "pk").values_list("date", "base_value", "total_value", "supplier", "number").iterator(chunk_size=5000)
+        else:
+            rows = sorted(
+                (
+                    (invoice.date, invoice.base_value, invoice.total_value, invoice.supplier, invoice.number)
+                    for invoice in invoices
+                    if not (start_date and end_date) or start_date <= invoice.date <= end_date
+                ),
+                key=lambda row: row[0]
+            )
+
+        suppliers = SupplierDictionary()
+        series_codes_by_name = {}
+        series_widths = []
+        unparsed_codes_by_number = {}
+        epoch_days, base_cents, total_cents, supplier_codes, series_codes, sequences, sequence_widths = [], [], [], [], [], [], []
+
+        for invoice_date, base_value, total_value, supplier, number in rows:
+            epoch_days.append(invoice_date.toordinal() - UNIX_EPOCH_ORDINAL)
+            base_cents.append(to_exact_cents(base_value))
+            total_cents.append(to_exact_cents(total_value))
+            supplier_codes.append(suppliers.encode(supplier))
+
+            parsed = InvoiceNumberIndex.parse_invoice_number(number)
+            if parsed is None:
+                series_codes.append(UNPARSED_SERIES)
+                sequences.append(unparsed_codes_by_number.setdefault(number, len(unparsed_codes_by_number)))
+                sequence_widths.append(0)
+                continue
+
+            series, sequence, width = parsed
+            series_code = series_codes_by_name.get(series)
+            if series_code is None:
+                series_code = series_codes_by_name[series] = len(series_widths)
+                series_widths.append(width)
+            elif width > series_widths[series_code]:
+                series_widths[series_code] = width
+            series_codes.append(series_code)
+            sequences.append(sequence)
+            sequence_widths.append(width)
+
+        columns = {
+            "dates": np.array(epoch_days, dtype=np.int64).astype("datetime64[D]"),
+            "base_cents": np.array(base_cents, dtype=np.int64),
+            "total_cents": np.array(total_cents, dtype=np.int64),
+            "supplier_codes": np.array(supplier_codes, dtype=np.int32),
+            "series_codes": np.array(series_codes, dtype=np.int32),
+            "sequences": np.array(sequences, dtype=np.int64),
+            "sequence_widths": np.array(sequence_widths, dtype=np.int16),
+        }
+        snapshot = cls(columns, suppliers, list(series_codes_by_name), series_widths, list(unparsed_codes_by_number), start_date, end_date, path)
+        snapshot.save(path)
+        return snapshot
+
+    def save(self, path: str) -> None:
+        columns_directory = f"{COLUMNS_DIRECTORY_PREFIX}{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(os.path.join(path, columns_directory))
+        for name in SNAPSHOT_COLUMNS:
+            with open(os.path.join(path, columns_directory, f"{name}.npy"), "wb") as column_file:
+                np.save(column_file, self.columns[name], allow_pickle=False)
+                column_file.flush()
+                os.fsync(column_file.fileno())
+
+        manifest = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "columns": columns_directory,
+            "rows": len(self),
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "created_at": timezone.now().isoformat(),
+            "suppliers": self.suppliers.names,
+            "series": self.series,
+            "series_widths": self.series_widths,
+            "unparsed_numbers": self.unparsed_numbers,
+        }
+        temporary_path = os.path.join(path, f"{MANIFEST_FILE}.{columns_directory}.tmp")
+        with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(temporary_path, os.path.join(path, MANIFEST_FILE))
+        self.path = path
+        self.remove_stale_columns(path, columns_directory)
+
+    def remove_stale_columns(self, path: str, columns_directory: str) -> None:
+        for entry in os.scandir(path):
+            if entry.is_dir() and entry.name.startswith(COLUMNS_DIRECTORY_PREFIX) and entry.name != columns_directory:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.is_file() and entry.name in {f"{name}.npy" for name in SNAPSHOT_COLUMNS}:
+                os.remove(entry.path)
+
+    @classmethod
+    def load(cls, path: str) -> "InvoiceSnapshot":
+        try:
+            return cls.load_manifest(path)
+        except FileNotFoundError:
+            return cls.load_manifest(path)
+
+    @classmethod
+    def load_manifest(cls, path: str) -> "InvoiceSnapshot":
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        if manifest.get("version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+
+        columns = {
+            name: np.load(os.path.join(path, manifest["columns"], f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in SNAPSHOT_COLUMNS
+        }
+        if len(columns["dates"]) != manifest["rows"]:
+            raise ValueError(f"Snapshot at {path} is truncated.")
+
+        return cls(
+            columns,
+            SupplierDictionary.from_names(manifest["suppliers"]),
+            manifest["series"],
+            manifest["series_widths"],
+            manifest["unparsed_numbers"],
+            date.fromisoformat(manifest["start_date"]) if manifest["start_date"] else None,
+            date.fromisoformat(manifest["end_date"]) if manifest["end_date"] else None,
+            path,
+        )
+
+    def between(self, start_date: datetime, end_date: datetime) -> "InvoiceSnapshot":
+        first = np.searchsorted(self.dates, np.datetime64(start_date, "D"), side="left")
+        last = np.searchsorted(self.dates, np.datetime64(end_date, "D"), side="right")
+        return InvoiceSnapshot(
+            {name: column[first:last] for name, column in self.columns.items()},
+            self.suppliers,
+            self.series,
+            self.series_widths,
+            self.unparsed_numbers,
+            start_date,
+            end_date,
+            self.path,
+        )
+
+    def for_supplier(self, supplier: str) -> "InvoiceSnapshot":
+        supplier_code = self.suppliers.get(supplier)
+        if supplier_code is None:
+            rows = np.zeros(len(self), dtype=bool)
+        else:
+            rows = self.supplier_codes == supplier_code
+        return InvoiceSnapshot(
+            {name: column[rows] for name, column in self.columns.items()},
+            self.suppliers,
+            self.series,
+            self.series_widths,
+            self.unparsed_numbers,
+            self.start_date,
+            self.end_date,
+            self.path,
+        )
+
+    def invoice_columns(self) -> InvoiceColumns:
+        return InvoiceColumns(dates=self.dates, base_cents=self.base_cents, total_cents=self.total_cents)
+
+    def group_totals(self, normalize_suppliers: bool = False) -> Dict[str, Dict[str, dict]]:
+        if not len(self):
+            return {}
+
+        supplier_codes = self.supplier_codes.astype(np.int64)
+        present_codes, first_rows = np.unique(supplier_codes, return_index=True)
+        supplier_names = self.suppliers.names
+        if normalize_suppliers:
+            dictionary = SupplierDictionary(normalize=True)
+            canonical_codes = np.arange(len(supplier_names), dtype=np.int64)
+            for supplier_code in present_codes[np.argsort(first_rows)].tolist():
+                canonical_codes[supplier_code] = dictionary.encode(supplier_names[supplier_code])
+            supplier_codes = canonical_codes[supplier_codes]
+            supplier_names = dictionary.names
+
+        months = self.dates.astype("datetime64[M]").astype(np.int64)
+        first_month = months.min()
+        month_span = months.max() - first_month + 1
+        keys = supplier_codes * month_span + (months - first_month)
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        base_totals = np.add.reduceat(self.base_cents[order], starts)
+        total_totals = np.add.reduceat(self.total_cents[order], starts)
+        counts = np.diff(np.append(starts, len(sorted_keys)))
+
+        group_first_rows = order[starts]
+        supplier_first_rows = np.full(len(supplier_names), len(self), dtype=np.int64)
+        np.minimum.at(supplier_first_rows, supplier_codes, np.arange(len(self)))
+        appearance = np.lexsort((group_first_rows, supplier_first_rows[sorted_keys[starts] // month_span]))
+
+        grouped_invoices = {}
+        for group in appearance.tolist():
+            supplier_code, month_offset = divmod(int(sorted_keys[starts[group]]), int(month_span))
+            month = np.datetime_as_string(np.datetime64(int(first_month + month_offset), "M"))
+            grouped_invoices.setdefault(supplier_names[supplier_code], {})[month] = {
+                "total_base": from_cents(int(base_totals[group])),
+                "total_value": from_cents(int(total_totals[group])),
+                "count": int(counts[group]),
+            }
+
+        return grouped_invoices
+
+    def missing_ranges(self, series: str, first: int = 1, last: Optional[int] = None) -> List[Tuple[int, int]]:
+        if series not in self.series:
+            sequences = np.empty(0, dtype=np.int64)
+        else:
+            sequences = np.unique(self.sequences[self.series_codes == self.series.index(series)])
+
+        if last is None:
+            last = int(sequences[-1]) if len(sequences) else 0
+        sequences = sequences[(sequences >= first) & (sequences <= last)]
+
+        bounds = np.concatenate(([first - 1], sequences, [last + 1]))
+        gaps = np.flatnonzero(np.diff(bounds) > 1)
+        return [(int(bounds[gap]) + 1, int(bounds[gap + 1]) - 1) for gap in gaps]
+
+    def missing_ranges_by_series(self) -> Dict[str, List[Tuple[int, int]]]:
+        return {series: self.missing_ranges(series) for series in sorted(self.series)}
+
+    def missing_numbers(self, series: str, first: int = 1, last: Optional[int] = None, width: Optional[int] = None) -> List[str]:
+        if width is None:
+            width = self.series_widths[self.series.index(series)] if series in self.series else 1
+
+        return [
+            f"{series}{str(sequence).zfill(width)}"
+            for gap_start, gap_end in self.missing_ranges(series, first, last)
+            for sequence in range(gap_start, gap_end + 1)
+        ]
+
+    def duplicate_invoice_numbers(self) -> List[str]:
+        if not len(self):
+            return []
+
+        numbers = np.stack((self.series_codes.astype(np.int64), self.sequences, self.sequence_widths.astype(np.int64)), axis=1)
+        _, first_rows = np.unique(numbers, axis=0, return_index=True)
+        repeated = np.ones(len(self), dtype=bool)
+        repeated[first_rows] = False
+
+        duplicates = []
+        for series_code, sequence, width in numbers[repeated].tolist():
+            if series_code == UNPARSED_SERIES:
+                duplicates.append(self.unparsed_numbers[sequence])
+            else:
+                duplicates.append(f"{self.series[series_code]}{str(sequence).zfill(width)}")
+        return duplicates
@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+DEFAULT_TENANT = "default"
+
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant() -> Optional[str]:
+    return current_tenant.get()
+
+
+@contextmanager
+def use_tenant(tenant: Optional[str]) -> Iterator[Optional[str]]:
+    token = current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        current_tenant.reset(token)
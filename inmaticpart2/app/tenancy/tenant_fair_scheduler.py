@@ -0,0 +1,95 @@
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional, Tuple
+from inmaticpart2.app.tenancy.tenant_context import use_tenant
+
+ScheduledTask = Tuple[str, Callable, tuple, Future]
+
+
+class TenantFairScheduler:
+    def __init__(self, max_workers: int = 2, max_per_tenant: Optional[int] = None, executor: Optional[Executor] = None):
+        if max_workers < 1 or (max_per_tenant is not None and max_per_tenant < 1):
+            raise ValueError("max_workers and max_per_tenant must be positive.")
+
+        self.max_workers = max_workers
+        self.max_per_tenant = max_per_tenant or max_workers
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tenant-worker")
+        self.queues: Dict[str, Deque[ScheduledTask]] = {}
+        self.served_at: Dict[str, int] = {}
+        self.dispatched = 0
+        self.running: Dict[str, int] = {}
+        self.running_total = 0
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+
+    def submit(self, tenant: str, function: Callable, *args) -> Future:
+        future = Future()
+        with self.lock:
+            self.queues.setdefault(tenant, deque()).append((tenant, function, args, future))
+            ready_tasks = self.take_ready_tasks()
+
+        self.start(ready_tasks)
+        return future
+
+    def pending(self, tenant: Optional[str] = None) -> int:
+        with self.lock:
+            if tenant is not None:
+                return len(self.queues.get(tenant, ()))
+            return sum(len(queue) for queue in self.queues.values())
+
+    def take_ready_tasks(self) -> list:
+        ready_tasks = []
+        while self.running_total < self.max_workers:
+            task = self.next_task()
+            if task is None:
+                break
+            ready_tasks.append(task)
+        return ready_tasks
+
+    def next_task(self) -> Optional[ScheduledTask]:
+        eligible_tenants = [
+            tenant for tenant, queue in self.queues.items()
+            if queue and self.running.get(tenant, 0) < self.max_per_tenant
+        ]
+        if not eligible_tenants:
+            return None
+
+        tenant = min(eligible_tenants, key=lambda candidate: self.served_at.get(candidate, 0))
+        self.dispatched += 1
+        self.served_at[tenant] = self.dispatched
+        self.running[tenant] = self.running.get(tenant, 0) + 1
+        self.running_total += 1
+        return self.queues[tenant].popleft()
+
+    def start(self, ready_tasks: list) -> None:
+        for task in ready_tasks:
+            self.executor.submit(self.run_task, task)
+
+    def run_task(self, task: ScheduledTask) -> None:
+        tenant, function, args, future = task
+        try:
+            if future.set_running_or_notify_cancel():
+                with use_tenant(tenant):
+                    future.set_result(function(*args))
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with self.lock:
+                self.running[tenant] -= 1
+                self.running_total -= 1
+                if not self.running[tenant]:
+                    del self.running[tenant]
+                    if not self.queues[tenant]:
+                        del self.queues[tenant]
+                        del self.served_at[tenant]
+                ready_tasks = self.take_ready_tasks()
+                if not self.running_total:
+                    self.idle.notify_all()
+            self.start(ready_tasks)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if wait:
+            with self.idle:
+                self.idle.wait_for(lambda: not self.running_total)
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,45 @@
+import zlib
+from typing import List, Optional
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT, get_current_tenant
+
+TENANT_APP_LABEL = "inmaticpart2"
+
+
+class TenantDatabaseRouter:
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if model._meta.app_label != TENANT_APP_LABEL:
+            return None
+        return self.db_for_tenant(self.tenant_for(hints))
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, first, second, **hints) -> Optional[bool]:
+        if first._state.db and second._state.db and first._state.db != second._state.db:
+            return False
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        return None
+
+    def tenant_for(self, hints: dict) -> Optional[str]:
+        tenant = getattr(hints.get("instance"), "tenant", None)
+        return tenant if tenant is not None else get_current_tenant()
+
+    def db_for_tenant(self, tenant: Optional[str]) -> Optional[str]:
+        if tenant is None:
+            return None
+
+        tenant_databases = getattr(settings, "ACCOUNTING_TENANT_DATABASES", {})
+        if tenant in tenant_databases:
+            return tenant_databases[tenant]
+        if tenant == DEFAULT_TENANT:
+            return DEFAULT_DB_ALIAS
+
+        shards = self.shards()
+        return shards[zlib.crc32(tenant.encode("utf-8")) % len(shards)]
+
+    def shards(self) -> List[str]:
+        return list(getattr(settings, "ACCOUNTING_TENANT_SHARDS", None) or ["default"])
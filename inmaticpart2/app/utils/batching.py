@@ -0,0 +1,13 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def batched(iterable: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}")
+
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
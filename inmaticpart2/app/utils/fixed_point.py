@@ -0,0 +1,19 @@
+from decimal import Decimal
+
+CENTS_EXPONENT = 2
+
+
+def to_cents(amount: Decimal) -> int:
+    return int(amount.scaleb(CENTS_EXPONENT))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-CENTS_EXPONENT)
+
+
+def to_exact_cents(amount: Decimal) -> int:
+    scaled = amount * 100
+    cents = int(scaled)
+    if cents != scaled:
+        raise ValueError(f"Amount {amount} has more than {CENTS_EXPONENT} decimal places.")
+    return cents
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class Inmaticpart2Config(AppConfig):
+    name = "inmaticpart2"
+
+    def ready(self):
+        from inmaticpart2 import signals
@@ -1,27 +1,51 @@
-from datetime import date as datetime
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from django.db.models import Q, QuerySet
 from inmaticpart2.models import InvoiceModel
 
 
-from typing import List
-from datetime import datetime
-
 class InvoiceBuilder:
     def __init__(self):
         self.filters = []
+        self.predicates = []
 
     def filter_by_date_range(self, start_date: datetime, end_date: datetime):
         self.filters.append(lambda invoice: start_date <= invoice.date <= end_date)
+        self.predicates.append(Q(date__range=(start_date, end_date)))
+
+    def filter_by_supplier(self, supplier: str):
+        self.filters.append(lambda invoice: invoice.supplier == supplier)
+        self.predicates.append(Q(supplier=supplier))
+
+    def reset(self):
+        self.filters = []
+        self.predicates = []
+
+    def to_q(self) -> Q:
+        query = Q()
+        for predicate in self.predicates:
+            query &= predicate
+        return query
+
+    def build_queryset(self, queryset: Optional[QuerySet] = None) -> QuerySet:
+        queryset = InvoiceModel.objects.all() if queryset is None else queryset
+        return queryset.filter(self.to_q()).order_by("date")
 
-    def filter_by_supplier(self, supplier_id: int):
-        self.filters.append(lambda invoice: invoice.supplier_id == supplier_id)
+    def matches(self, invoice: InvoiceModel) -> bool:
+        return all(filter_fn(invoice) for filter_fn in self.filters)
 
     def apply_filters(self, invoices: List[InvoiceModel]) -> List[InvoiceModel]:
+        if isinstance(invoices, QuerySet):
+            return invoices.filter(self.to_q())
+
         for filter_fn in self.filters:
             invoices = [invoice for invoice in invoices if filter_fn(invoice)]
         return invoices
 
     def sort_invoices_by_date(self, invoices: List[InvoiceModel]) -> List[InvoiceModel]:
+        if isinstance(invoices, QuerySet):
+            return invoices.order_by("date", "pk")
+
         return sorted(invoices, key=lambda invoice: invoice.date)
 
     def detect_duplicate_invoice_numbers(self, invoices: List[InvoiceModel]) -> List[str]:
@@ -0,0 +1,89 @@
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterator, List
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.app.utils.batching import batched
+from inmaticpart2.app.utils.fixed_point import from_cents
+from inmaticpart2.models import InvoiceModel
+
+VAT_RATE_PERCENT = 21
+
+
+class SyntheticLedgerFactory:
+    def __init__(
+        self,
+        invoices: int = 10_000,
+        suppliers: int = 100,
+        skew: float = 1.1,
+        start_date: date = date(2023, 1, 1),
+        days: int = 365,
+        gap_rate: float = 0.01,
+        duplicate_rate: float = 0.001,
+        seed: int = 42,
+        concept: str = "Synthetic ledger invoice"
+    ):
+        self.invoices = invoices
+        self.suppliers = [f"Supplier {index:05d}" for index in range(suppliers)]
+        self.supplier_weights = list(accumulate(1 / (rank ** skew) for rank in range(1, suppliers + 1)))
+        self.start_date = start_date
+        self.days = days
+        self.gap_rate = gap_rate
+        self.duplicate_rate = duplicate_rate
+        self.seed = seed
+        self.concept = concept
+
+    def iterate_rows(self) -> Iterator[tuple]:
+        randomizer = random.Random(self.seed)
+        dates = sorted(self.start_date + timedelta(days=randomizer.randrange(self.days)) for _ in range(self.invoices))
+        suppliers = randomizer.choices(self.suppliers, cum_weights=self.supplier_weights, k=self.invoices)
+        sequences = {}
+        issued_numbers = []
+
+        for invoice_date, supplier in zip(dates, suppliers):
+            series = f"F{invoice_date.year}/"
+            if issued_numbers and randomizer.random() < self.duplicate_rate:
+                number = randomizer.choice(issued_numbers)
+            else:
+                sequence = sequences.get(series, 0) + 1
+                while randomizer.random() < self.gap_rate:
+                    sequence += 1
+                sequences[series] = sequence
+                number = f"{series}{sequence:06d}"
+                issued_numbers.append(number)
+
+            base_cents = randomizer.randrange(100, 1_000_000)
+            vat_cents = base_cents * VAT_RATE_PERCENT // 100
+            yield number, supplier, invoice_date, from_cents(base_cents), from_cents(vat_cents), from_cents(base_cents + vat_cents)
+
+    def build_records(self) -> List[InvoiceRecord]:
+        return [
+            InvoiceRecord(number, supplier, invoice_date, base_value, total_value, vat=vat)
+            for number, supplier, invoice_date, base_value, vat, total_value in self.iterate_rows()
+        ]
+
+    def iterate_invoices(self) -> Iterator[InvoiceModel]:
+        for number, supplier, invoice_date, base_value, vat, total_value in self.iterate_rows():
+            yield InvoiceModel(
+                number=number,
+                supplier=supplier,
+                concept=self.concept,
+                base_value=base_value,
+                vat=vat,
+                total_value=total_value,
+                date=invoice_date,
+                due_date=invoice_date + timedelta(days=30),
+                state=InvoiceStates.PENDING,
+            )
+
+    def build_invoices(self) -> List[InvoiceModel]:
+        return list(self.iterate_invoices())
+
+    def create_invoices(self, batch_size: int = 10_000, using: str = "default") -> int:
+        created = 0
+        for batch in batched(self.iterate_invoices(), batch_size):
+            InvoiceModel.objects.using(using).bulk_create(batch)
+            created += len(batch)
+        return created
+
@@ -0,0 +1,50 @@
+import datetime
+from django.db import migrations, models
+import inmaticpart2.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0003_invoicemodel_number_alter_invoicemodel_concept_and_more'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='invoicemodel',
+            old_name='provider',
+            new_name='supplier',
+        ),
+        migrations.AddField(
+            model_name='invoicemodel',
+            name='due_date',
+            field=models.DateField(default=datetime.date.today),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='invoicemodel',
+            name='number_lock',
+            field=models.BooleanField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='invoicemodel',
+            name='number_lock',
+            field=models.BooleanField(default=inmaticpart2.models.invoice_number_lock, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['supplier', 'date'], name='invoice_supplier_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['date'], name='invoice_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['number'], name='invoice_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['state', 'due_date'], name='invoice_state_due_date_idx'),
+        ),
+    ]
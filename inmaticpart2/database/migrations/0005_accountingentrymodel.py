@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0004_invoicemodel_supplier_due_date_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountingEntryModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_number', models.CharField(max_length=50)),
+                ('account_code', models.CharField(choices=[('6000', 'Purchases (DEBIT)'), ('4720', 'VAT Supported (DEBIT)'), ('4000', 'Suppliers (CREDIT)')], max_length=4)),
+                ('debit_credit', models.CharField(choices=[('DEBIT', 'Debit'), ('CREDIT', 'Credit')], max_length=6)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['invoice_number'], name='entry_invoice_number_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0005_accountingentrymodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountingRunStateModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('state', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InvoiceChangeModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_id', models.BigIntegerField()),
+                ('tenant', models.CharField(default='default', max_length=50)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant'], name='invoice_change_tenant_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountingRunContributionModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_id', models.BigIntegerField()),
+                ('number', models.CharField(max_length=50)),
+                ('supplier', models.CharField(max_length=100)),
+                ('month', models.CharField(max_length=7)),
+                ('base_cents', models.BigIntegerField()),
+                ('total_cents', models.BigIntegerField()),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributions', to='inmaticpart2.accountingrunstatemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'number'], name='run_contribution_number_idx')],
+                'constraints': [models.UniqueConstraint(fields=('run', 'invoice_id'), name='run_contribution_invoice_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountingRunDuplicateModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=50)),
+                ('count', models.IntegerField()),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicates', to='inmaticpart2.accountingrunstatemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'number'], name='run_duplicate_number_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountingRunGapModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('series', models.CharField(max_length=50)),
+                ('first', models.BigIntegerField()),
+                ('last', models.BigIntegerField()),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gaps', to='inmaticpart2.accountingrunstatemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'series', 'first'], name='run_gap_series_first_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountingRunGroupModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('supplier', models.CharField(max_length=100)),
+                ('month', models.CharField(max_length=7)),
+                ('base_cents', models.BigIntegerField(default=0)),
+                ('total_cents', models.BigIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='groups', to='inmaticpart2.accountingrunstatemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'supplier', 'month'], name='run_group_supplier_month_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0006_accountingrunstatemodel_invoicechangemodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceFingerprintModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number_key', models.BigIntegerField()),
+                ('fuzzy_key', models.BigIntegerField()),
+                ('invoice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='inmaticpart2.invoicemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['number_key'], name='fingerprint_number_key_idx'), models.Index(fields=['fuzzy_key'], name='fingerprint_fuzzy_key_idx')],
+            },
+        ),
+    ]
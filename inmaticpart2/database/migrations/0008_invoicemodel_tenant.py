@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0007_invoicefingerprintmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoicemodel',
+            name='tenant',
+            field=models.CharField(default='default', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['tenant', 'date'], name='invoice_tenant_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoicemodel',
+            constraint=models.UniqueConstraint(fields=('tenant', 'number', 'number_lock'), name='invoice_tenant_number_unique'),
+        ),
+    ]
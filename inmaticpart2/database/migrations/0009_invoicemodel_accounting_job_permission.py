@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:24
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0008_invoicemodel_tenant'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='invoicemodel',
+            options={'permissions': [('run_accounting_jobs', 'Can run and follow accounting jobs')]},
+        ),
+    ]
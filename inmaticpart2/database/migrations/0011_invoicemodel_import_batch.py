@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inmaticpart2', '0010_tenantmembershipmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoicemodel',
+            name='import_batch',
+            field=models.CharField(editable=False, max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['import_batch'], name='invoice_import_batch_idx'),
+        ),
+    ]
@@ -0,0 +1,163 @@
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.service.parallel_accounting_service import ParallelAccountingInvoiceService
+from inmaticpart2.database.factories.synthetic_ledger_factory import SyntheticLedgerFactory
+from inmaticpart2.models import InvoiceModel
+
+BENCHMARK_CONCEPT = "Accounting benchmark seed"
+SOURCES = ("records", "models", "database")
+
+
+class Command(BaseCommand):
+    help = "Runs the accounting service over synthetic ledgers and records time, peak memory and query counts as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000")
+        parser.add_argument("--source", choices=SOURCES, default="records")
+        parser.add_argument("--suppliers", type=int, default=500)
+        parser.add_argument("--skew", type=float, default=1.1)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--gap-rate", type=float, default=0.01)
+        parser.add_argument("--duplicate-rate", type=float, default=0.001)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--workers", type=int, default=0, help="Also time the process-pool service with this many workers (database source only).")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Print the change against a previous JSON result file.")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size]
+        results = []
+
+        for size in sizes:
+            factory = SyntheticLedgerFactory(
+                invoices=size,
+                suppliers=options["suppliers"],
+                skew=options["skew"],
+                days=options["days"],
+                gap_rate=options["gap_rate"],
+                duplicate_rate=options["duplicate_rate"],
+                seed=options["seed"],
+                concept=BENCHMARK_CONCEPT,
+            )
+            self.stdout.write(f"Building {size} invoices from {options['source']}...")
+            invoices = self.build_invoices(factory, options["source"], options["database"])
+
+            try:
+                for case, run in self.build_cases(factory, options).items():
+                    measurement = self.measure(run, invoices, options["repeat"], options["database"])
+                    results.append({"case": case, "rows": size, "source": options["source"], **measurement})
+                    self.stdout.write(
+                        f"  {case:<52} {measurement['seconds'] * 1000:>10.1f} ms "
+                        f"{measurement['peak_memory_bytes'] / 1024 / 1024:>9.1f} MiB {measurement['queries']:>6} queries"
+                    )
+            finally:
+                if options["source"] == "database":
+                    InvoiceModel.objects.using(options["database"]).filter(concept=BENCHMARK_CONCEPT).delete()
+
+        report = {
+            "commit": self.current_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "parameters": {key: options[key] for key in ("source", "suppliers", "skew", "days", "gap_rate", "duplicate_rate", "seed", "repeat")},
+            "results": results,
+        }
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options["compare"]:
+            self.compare(options["compare"], results)
+
+    def build_invoices(self, factory: SyntheticLedgerFactory, source: str, database: str):
+        if source == "records":
+            return factory.build_records()
+        if source == "models":
+            return factory.build_invoices()
+
+        InvoiceModel.objects.using(database).filter(concept=BENCHMARK_CONCEPT).delete()
+        factory.create_invoices(using=database)
+        return InvoiceModel.objects.using(database).filter(concept=BENCHMARK_CONCEPT)
+
+    def build_cases(self, factory: SyntheticLedgerFactory, options: dict) -> dict:
+        service = AccountingInvoiceService()
+        lazy_service = AccountingInvoiceService(lazy_entries=True)
+        start_date = factory.start_date
+        end_date = date.fromordinal(start_date.toordinal() + factory.days - 1)
+
+        cases = {
+            "create_accounting_entries": lambda invoices: service.create_accounting_entries(invoices, as_records=True),
+            "create_accounting_entries (lazy entries)": lambda invoices: lazy_service.create_accounting_entries(invoices, as_records=True),
+            "group_invoices_by_supplier_and_month": lambda invoices: service.group_invoices_by_supplier_and_month(invoices),
+            "group_invoices_by_supplier_and_month (fixed point)": lambda invoices: service.group_invoices_by_supplier_and_month(
+                invoices, fixed_point=True
+            ),
+            "find_missing_invoice_numbers": lambda invoices: service.find_missing_invoice_numbers(
+                invoices, series=f"F{start_date.year}/", last=factory.invoices, width=6
+            ),
+            "find_missing_invoice_ranges": lambda invoices: service.find_missing_invoice_ranges(invoices),
+            "cashflow_projection": lambda invoices: service.cashflow_projection(start_date, end_date, invoices),
+            "cashflow_projection (fixed point)": lambda invoices: service.cashflow_projection(start_date, end_date, invoices, fixed_point=True),
+            "cashflow_projection (vectorized)": lambda invoices: service.cashflow_projection(start_date, end_date, invoices, vectorized=True),
+        }
+        if options["workers"] and options["source"] == "database":
+            parallel_service = ParallelAccountingInvoiceService(max_workers=options["workers"], min_parallel_invoices=0)
+            cases[f"create_accounting_entries (parallel, {options['workers']} workers)"] = (
+                lambda invoices: parallel_service.create_accounting_entries(invoices, as_records=True)
+            )
+        return cases
+
+    def measure(self, run, invoices, repeat: int, database: str) -> dict:
+        timings = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            run(self.fresh(invoices))
+            timings.append(time.perf_counter() - started_at)
+
+        with CaptureQueriesContext(connections[database]) as queries:
+            tracemalloc.start()
+            try:
+                run(self.fresh(invoices))
+                _, peak_memory = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        return {"seconds": min(timings), "peak_memory_bytes": peak_memory, "queries": len(queries.captured_queries)}
+
+    def fresh(self, invoices):
+        return invoices.all() if isinstance(invoices, QuerySet) else invoices
+
+    def compare(self, path: str, results: list) -> None:
+        with open(path, encoding="utf-8") as baseline_file:
+            baseline = {(result["case"], result["rows"], result["source"]): result for result in json.load(baseline_file)["results"]}
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared with {path}"))
+        for result in results:
+            previous = baseline.get((result["case"], result["rows"], result["source"]))
+            if previous is None or not previous["seconds"]:
+                continue
+
+            change = (result["seconds"] - previous["seconds"]) / previous["seconds"] * 100
+            memory_change = result["peak_memory_bytes"] - previous["peak_memory_bytes"]
+            self.stdout.write(
+                f"  {result['case']:<52} {result['rows']:>8} rows {change:>+8.1f}% time "
+                f"{memory_change / 1024 / 1024:>+9.1f} MiB {result['queries'] - previous['queries']:>+6} queries"
+            )
+
+    def current_commit(self) -> str:
+        try:
+            return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
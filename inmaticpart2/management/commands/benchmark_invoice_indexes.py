@@ -0,0 +1,141 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.models import InvoiceModel
+
+BENCHMARK_CONCEPT = "Index benchmark seed"
+BENCHMARK_DATABASE = "benchmark"
+
+
+class Command(BaseCommand):
+    help = "Seeds invoices and compares query plans and timings without and with the invoice indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--suppliers", type=int, default=500)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--database", default=BENCHMARK_DATABASE)
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded invoices after the run.")
+
+    def handle(self, *args, **options):
+        database = options["database"]
+        start_date = date(2023, 1, 1)
+        self.check_dedicated_database(database)
+
+        self.stdout.write(f"Seeding {options['rows']} invoices...")
+        self.seed_invoices(database, options["rows"], options["suppliers"], options["batch_size"], start_date)
+
+        queries = self.build_queries(database, start_date)
+
+        dropped_indexes = []
+        try:
+            self.drop_indexes(database, dropped_indexes)
+            before = self.measure(queries, options["repeat"])
+        finally:
+            self.create_indexes(database, dropped_indexes)
+        after = self.measure(queries, options["repeat"])
+
+        for label in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  without indexes: {before[label]['seconds'] * 1000:.2f} ms ({before[label]['rows']} rows)")
+            self.stdout.write(f"  {before[label]['plan']}")
+            self.stdout.write(f"  with indexes:    {after[label]['seconds'] * 1000:.2f} ms ({after[label]['rows']} rows)")
+            self.stdout.write(f"  {after[label]['plan']}")
+
+        if not options["keep"]:
+            InvoiceModel.objects.using(database).filter(concept=BENCHMARK_CONCEPT).delete()
+
+    def check_dedicated_database(self, database: str) -> None:
+        if database not in settings.DATABASES:
+            raise CommandError(f"Database {database} is not configured. Set DB_BENCHMARK_NAME to create the {BENCHMARK_DATABASE} database.")
+
+        tenant_databases = {*settings.ACCOUNTING_TENANT_SHARDS, *settings.ACCOUNTING_TENANT_DATABASES.values()}
+        if database in tenant_databases:
+            raise CommandError(f"Database {database} holds tenant invoices; run the benchmark against a dedicated database.")
+
+        if InvoiceModel.objects.using(database).exclude(concept=BENCHMARK_CONCEPT).exists():
+            raise CommandError(f"Database {database} already holds invoices that were not seeded by the benchmark.")
+
+    def seed_invoices(self, database: str, rows: int, suppliers: int, batch_size: int, start_date: date) -> None:
+        randomizer = random.Random(42)
+        states = [InvoiceStates.PENDING, InvoiceStates.ACCOUNTED, InvoiceStates.PAID, InvoiceStates.CANCELED]
+        batch = []
+
+        for sequence in range(1, rows + 1):
+            invoice_date = start_date + timedelta(days=randomizer.randrange(730))
+            base_value = Decimal(randomizer.randrange(100, 1_000_000)) / 100
+            vat = (base_value * Decimal("0.21")).quantize(Decimal("0.01"))
+
+            batch.append(InvoiceModel(
+                number=f"F{invoice_date.year}/{sequence:07d}",
+                supplier=f"Supplier {randomizer.randrange(suppliers):05d}",
+                concept=BENCHMARK_CONCEPT,
+                base_value=base_value,
+                vat=vat,
+                total_value=base_value + vat,
+                date=invoice_date,
+                due_date=invoice_date + timedelta(days=30),
+                state=randomizer.choice(states),
+            ))
+
+            if len(batch) == batch_size:
+                InvoiceModel.objects.using(database).bulk_create(batch)
+                batch = []
+
+        if batch:
+            InvoiceModel.objects.using(database).bulk_create(batch)
+
+    def build_queries(self, database: str, start_date: date) -> dict:
+        invoices = InvoiceModel.objects.using(database)
+        window_end = start_date + timedelta(days=30)
+        sample_number = invoices.filter(concept=BENCHMARK_CONCEPT).values_list("number", flat=True).first()
+
+        return {
+            "supplier + date range": invoices.filter(supplier="Supplier 00001", date__range=(start_date, window_end)),
+            "date range": invoices.filter(date__range=(start_date, start_date + timedelta(days=7))),
+            "number lookup": invoices.filter(number=sample_number),
+            "state + due_date": invoices.filter(state=InvoiceStates.PENDING, due_date__lte=window_end),
+        }
+
+    def measure(self, queries: dict, repeat: int) -> dict:
+        results = {}
+
+        for label, queryset in queries.items():
+            timings = []
+            rows = 0
+            for _ in range(repeat):
+                started_at = time.perf_counter()
+                rows = len(list(queryset.values_list("id", "total_value")))
+                timings.append(time.perf_counter() - started_at)
+
+            results[label] = {
+                "seconds": min(timings),
+                "rows": rows,
+                "plan": queryset.explain().replace("\n", "\n  "),
+            }
+
+        return results
+
+    def drop_indexes(self, database: str, dropped_indexes: List) -> None:
+        connection = connections[database]
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(cursor, InvoiceModel._meta.db_table)
+
+        for index in InvoiceModel._meta.indexes:
+            if index.name not in existing:
+                continue
+            with connection.schema_editor() as schema_editor:
+                schema_editor.remove_index(InvoiceModel, index)
+            dropped_indexes.append(index)
+
+    def create_indexes(self, database: str, dropped_indexes: List) -> None:
+        with connections[database].schema_editor() as schema_editor:
+            for index in dropped_indexes:
+                schema_editor.add_index(InvoiceModel, index)
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from inmaticpart2.app.service.duplicate_index_service import DEFAULT_LOOKUP_BATCH_SIZE, DuplicateIndexService
+from inmaticpart2.models import InvoiceModel
+
+
+class Command(BaseCommand):
+    help = "Backfills duplicate-detection fingerprints for invoices that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_LOOKUP_BATCH_SIZE * 5)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+        indexed = DuplicateIndexService(using=options["database"]).index_invoices(
+            InvoiceModel.objects.all(),
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} invoices in {time.perf_counter() - started_at:.2f}s."
+        ))
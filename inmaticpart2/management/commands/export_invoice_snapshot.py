@@ -0,0 +1,30 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from inmaticpart2.app.snapshots.invoice_snapshot import InvoiceSnapshot
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.models import InvoiceModel
+
+
+class Command(BaseCommand):
+    help = "Exports a period's invoices into a memory-mappable columnar snapshot directory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--start-date", type=date.fromisoformat, required=True)
+        parser.add_argument("--end-date", type=date.fromisoformat, required=True)
+        parser.add_argument("--supplier", default=None)
+        parser.add_argument("--tenant", default=DEFAULT_TENANT)
+
+    def handle(self, *args, **options):
+        invoices = InvoiceModel.objects.for_tenant(options["tenant"])
+        if options["supplier"]:
+            invoices = invoices.filter(supplier=options["supplier"])
+
+        try:
+            snapshot = InvoiceSnapshot.export(invoices, options["path"], options["start_date"], options["end_date"])
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error)) from error
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(snapshot)} invoices from {len(snapshot.suppliers)} suppliers to {options['path']}."
+        ))
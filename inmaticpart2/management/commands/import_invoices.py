@@ -0,0 +1,71 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from inmaticpart2.app.service.duplicate_index_service import DuplicateIndexService
+from inmaticpart2.app.service.invoice_import_service import DEFAULT_CHUNK_SIZE, INSERT_METHODS, InvoiceImportService
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.tenancy.tenant_router import TenantDatabaseRouter
+
+
+class Command(BaseCommand):
+    help = "Imports invoices from a CSV or JSONL file in validated, bulk-inserted chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", dest="file_format", choices=["csv", "jsonl"], default=None)
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--insert-method", choices=INSERT_METHODS, default="executemany")
+        parser.add_argument("--rejects", default=None, help="Write rejected rows as JSONL to this path.")
+        parser.add_argument("--check-duplicates", action="store_true", help="Reject invoices already in the duplicate index.")
+        parser.add_argument("--tenant", default=DEFAULT_TENANT)
+        parser.add_argument("--bloom-filter", action="store_true", help="Pre-check duplicate keys against an in-memory Bloom filter.")
+
+    def handle(self, *args, **options):
+        rejects = open(options["rejects"], "w", encoding="utf-8") if options["rejects"] else None
+        try:
+            report = InvoiceImportService(
+                chunk_size=options["chunk_size"],
+                insert_method=options["insert_method"],
+                duplicate_index=DuplicateIndexService(
+                    use_bloom_filter=options["bloom_filter"],
+                    using=TenantDatabaseRouter().db_for_tenant(options["tenant"])
+                ),
+                check_duplicates=options["check_duplicates"],
+                tenant=options["tenant"],
+                on_reject=(lambda rejected_row: self.write_reject(rejects, rejected_row)) if rejects else None
+            ).import_file(
+                options["path"], options["file_format"]
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error)) from error
+        finally:
+            if rejects:
+                rejects.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.rows_imported} of {report.rows_read} invoices "
+            f"in {report.elapsed_seconds:.2f}s ({report.rows_per_second:.0f} rows/sec)."
+        ))
+
+        if report.rows_flagged:
+            self.stdout.write(self.style.WARNING(f"Flagged {report.rows_flagged} possible duplicates."))
+            self.write_sample(report.possible_duplicates, report.rows_flagged)
+
+        if not report.rows_rejected:
+            return
+
+        self.stdout.write(self.style.WARNING(f"Rejected {report.rows_rejected} rows."))
+        if not rejects:
+            self.write_sample(report.rejected_rows, report.rows_rejected)
+
+    def write_reject(self, rejects, rejected_row) -> None:
+        rejects.write(json.dumps({
+            "row": rejected_row.row,
+            "number": rejected_row.invoice_number,
+            "errors": rejected_row.errors,
+        }, ensure_ascii=False) + "\n")
+
+    def write_sample(self, rows, total: int) -> None:
+        for row in rows:
+            self.stdout.write(f"  row {row.row} ({row.invoice_number}): {'; '.join(row.errors)}")
+        if total > len(rows):
+            self.stdout.write(f"  ... and {total - len(rows)} more.")
@@ -1,6 +1,20 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
 from django.core.exceptions import ValidationError
 from datetime import date
+from inmaticpart2.app.enums.accounting_codes import AccountingCodes
+from inmaticpart2.app.enums.payment_type import PaymentType
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.app.tenancy.tenant_router import TenantDatabaseRouter
+
+def invoice_number_lock():
+    return True if settings.INVOICE_UNIQUE_NUMBER_PER_SERIES else None
+
+
+class InvoiceQuerySet(models.QuerySet):
+    def for_tenant(self, tenant: str) -> "InvoiceQuerySet":
+        return self.using(TenantDatabaseRouter().db_for_tenant(tenant)).filter(tenant=tenant)
+
 
 class InvoiceModel(models.Model):
     number = models.CharField(max_length=50, default="UNKNOWN")  
@@ -12,6 +26,43 @@ class InvoiceModel(models.Model):
     date = models.DateField()         
     due_date = models.DateField()     
     state = models.CharField(max_length=50)
+    tenant = models.CharField(max_length=50, default=DEFAULT_TENANT)
+    number_lock = models.BooleanField(null=True, default=invoice_number_lock, editable=False)
+    import_batch = models.CharField(max_length=32, null=True, editable=False)
+
+    objects = InvoiceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tenant", "date"], name="invoice_tenant_date_idx"),
+            models.Index(fields=["supplier", "date"], name="invoice_supplier_date_idx"),
+            models.Index(fields=["date"], name="invoice_date_idx"),
+            models.Index(fields=["number"], name="invoice_number_idx"),
+            models.Index(fields=["state", "due_date"], name="invoice_state_due_date_idx"),
+            models.Index(fields=["import_batch"], name="invoice_import_batch_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["tenant", "number", "number_lock"], name="invoice_tenant_number_unique"),
+        ]
+        permissions = [
+            ("run_accounting_jobs", "Can run and follow accounting jobs"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded_values = instance.__dict__
+        if "supplier" in loaded_values and "date" in loaded_values:
+            instance.loaded_version_bucket = (loaded_values["supplier"], loaded_values["date"])
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+            return super().delete(*args, **kwargs)
 
     def clean(self):
         super().clean()
@@ -47,3 +98,136 @@ class InvoiceModel(models.Model):
 
     def __str__(self):
         return f"Invoice {self.pk or 'New'} - {self.supplier} ({self.state})"
+
+
+class AccountingEntryModel(models.Model):
+    invoice_number = models.CharField(max_length=50)
+    account_code = models.CharField(max_length=4, choices=AccountingCodes.choices)
+    debit_credit = models.CharField(max_length=6, choices=PaymentType.choices)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["invoice_number"], name="entry_invoice_number_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.debit_credit} {self.account_code}: {self.amount} - {self.description} ({self.invoice_number})"
+
+
+class InvoiceChangeModel(models.Model):
+    invoice_id = models.BigIntegerField()
+    tenant = models.CharField(max_length=50, default=DEFAULT_TENANT)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tenant"], name="invoice_change_tenant_idx"),
+        ]
+
+    @classmethod
+    def record(cls, invoice_ids, tenant: str, using: str) -> None:
+        cls.objects.using(using).bulk_create([cls(invoice_id=invoice_id, tenant=tenant) for invoice_id in invoice_ids])
+
+    def __str__(self):
+        return f"Change of invoice {self.invoice_id} in tenant {self.tenant}"
+
+
+class AccountingRunStateModel(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    state = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Accounting run {self.name}"
+
+
+class AccountingRunContributionModel(models.Model):
+    run = models.ForeignKey(AccountingRunStateModel, on_delete=models.CASCADE, related_name="contributions")
+    invoice_id = models.BigIntegerField()
+    number = models.CharField(max_length=50)
+    supplier = models.CharField(max_length=100)
+    month = models.CharField(max_length=7)
+    base_cents = models.BigIntegerField()
+    total_cents = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "invoice_id"], name="run_contribution_invoice_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["run", "number"], name="run_contribution_number_idx"),
+        ]
+
+    def __str__(self):
+        return f"Invoice {self.invoice_id} in run {self.run_id} ({self.supplier} {self.month})"
+
+
+class AccountingRunGroupModel(models.Model):
+    run = models.ForeignKey(AccountingRunStateModel, on_delete=models.CASCADE, related_name="groups")
+    supplier = models.CharField(max_length=100)
+    month = models.CharField(max_length=7)
+    base_cents = models.BigIntegerField(default=0)
+    total_cents = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run", "supplier", "month"], name="run_group_supplier_month_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier} {self.month} in run {self.run_id} ({self.count} invoices)"
+
+
+class AccountingRunDuplicateModel(models.Model):
+    run = models.ForeignKey(AccountingRunStateModel, on_delete=models.CASCADE, related_name="duplicates")
+    number = models.CharField(max_length=50)
+    count = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run", "number"], name="run_duplicate_number_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.number} x{self.count} in run {self.run_id}"
+
+
+class AccountingRunGapModel(models.Model):
+    run = models.ForeignKey(AccountingRunStateModel, on_delete=models.CASCADE, related_name="gaps")
+    series = models.CharField(max_length=50)
+    first = models.BigIntegerField()
+    last = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run", "series", "first"], name="run_gap_series_first_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.series}{self.first}-{self.last} missing in run {self.run_id}"
+
+
+class TenantMembershipModel(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tenant_membership")
+    tenant = models.CharField(max_length=50, default=DEFAULT_TENANT)
+
+    def __str__(self):
+        return f"{self.user_id} in tenant {self.tenant}"
+
+
+class InvoiceFingerprintModel(models.Model):
+    invoice = models.OneToOneField(InvoiceModel, on_delete=models.CASCADE, related_name="fingerprint")
+    number_key = models.BigIntegerField()
+    fuzzy_key = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["number_key"], name="fingerprint_number_key_idx"),
+            models.Index(fields=["fuzzy_key"], name="fingerprint_fuzzy_key_idx"),
+        ]
+
+    def __str__(self):
+        return f"Fingerprint of invoice {self.invoice_id} ({self.number_key}, {self.fuzzy_key})"
@@ -52,6 +52,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'inmaticpart2.wsgi.application'
+ASGI_APPLICATION = 'inmaticpart2.asgi.application'
 
 DATABASES = {
     'default': {
@@ -61,6 +62,29 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'root'),
         'HOST': os.getenv('DB_HOST', '127.0.0.1'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+DB_SHARDS = [alias for alias in os.getenv('DB_SHARDS', '').split(',') if alias]
+for alias in DB_SHARDS:
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': os.getenv(f'DB_{alias.upper()}_NAME', f"{DATABASES['default']['NAME']}_{alias}"),
+        'HOST': os.getenv(f'DB_{alias.upper()}_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv(f'DB_{alias.upper()}_PORT', DATABASES['default']['PORT']),
+    }
+
+if os.getenv('DB_BENCHMARK_NAME'):
+    DATABASES['benchmark'] = {**DATABASES['default'], 'NAME': os.getenv('DB_BENCHMARK_NAME')}
+
+DATABASE_ROUTERS = ['inmaticpart2.app.tenancy.tenant_router.TenantDatabaseRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
@@ -91,4 +115,25 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+MIGRATION_MODULES = {
+    'inmaticpart2': 'inmaticpart2.database.migrations',
+}
+
+INVOICE_UNIQUE_NUMBER_PER_SERIES = os.getenv('INVOICE_UNIQUE_NUMBER_PER_SERIES', 'False') == 'True'
+
+ACCOUNTING_METRICS_LOG = os.getenv('ACCOUNTING_METRICS_LOG', 'False') == 'True'
+ACCOUNTING_METRICS_FILE = os.getenv('ACCOUNTING_METRICS_FILE', '')
+ACCOUNTING_TRACE_ALLOCATIONS = os.getenv('ACCOUNTING_TRACE_ALLOCATIONS', 'False') == 'True'
+ACCOUNTING_PROFILE_DIR = os.getenv('ACCOUNTING_PROFILE_DIR', '')
+ACCOUNTING_PARALLEL_START_METHOD = os.getenv('ACCOUNTING_PARALLEL_START_METHOD', 'forkserver')
+ACCOUNTING_JOB_WORKERS = int(os.getenv('ACCOUNTING_JOB_WORKERS', '2'))
+ACCOUNTING_JOB_SUBMISSIONS_PER_MINUTE = int(os.getenv('ACCOUNTING_JOB_SUBMISSIONS_PER_MINUTE', '30'))
+ACCOUNTING_RESULT_CACHE = os.getenv('ACCOUNTING_RESULT_CACHE', 'local')
+ACCOUNTING_RESULT_CACHE_TTL = int(os.getenv('ACCOUNTING_RESULT_CACHE_TTL', '300'))
+ACCOUNTING_VERSION_CACHE = os.getenv('ACCOUNTING_VERSION_CACHE', 'default')
+ACCOUNTING_VERSION_TTL = int(os.getenv('ACCOUNTING_VERSION_TTL', '86400'))
+ACCOUNTING_TENANT_SHARDS = ['default', *DB_SHARDS]
+ACCOUNTING_TENANT_DATABASES = dict(item.split('=', 1) for item in os.getenv('ACCOUNTING_TENANT_DATABASES', '').split(',') if item)
+ACCOUNTING_TENANT_MAX_JOBS = int(os.getenv('ACCOUNTING_TENANT_MAX_JOBS', '0')) or None
+
 pymysql.install_as_MySQLdb()
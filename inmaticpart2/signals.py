@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from inmaticpart2.app.cache.invoice_data_versions import InvoiceDataVersions
+from inmaticpart2.app.service.duplicate_index_service import DuplicateIndexService
+from inmaticpart2.app.service.payables_aging_service import PayablesAgingService
+from inmaticpart2.models import InvoiceChangeModel, InvoiceModel
+
+
+@receiver(pre_save, sender=InvoiceModel, dispatch_uid="invoice_data_version_pre_save")
+def remember_previous_invoice_bucket(sender, instance, raw=False, using=None, **kwargs):
+    instance.previous_version_bucket = None
+    if raw or instance.pk is None:
+        return
+
+    previous_bucket = getattr(instance, "loaded_version_bucket", None)
+    if previous_bucket is None:
+        previous_bucket = sender.objects.using(using).filter(pk=instance.pk).values_list("supplier", "date").first()
+    instance.previous_version_bucket = previous_bucket
+
+
+@receiver(post_save, sender=InvoiceModel, dispatch_uid="invoice_data_version_post_save")
+def bump_saved_invoice_version(sender, instance, raw=False, using=None, **kwargs):
+    buckets = [(instance.supplier, instance.date)]
+    previous_bucket = getattr(instance, "previous_version_bucket", None)
+    if previous_bucket is not None and previous_bucket != buckets[0]:
+        buckets.append(previous_bucket)
+    instance.loaded_version_bucket = buckets[0]
+
+    tenant = instance.tenant
+    transaction.on_commit(lambda: InvoiceDataVersions(tenant=tenant).bump(buckets), using=using)
+
+
+@receiver(post_delete, sender=InvoiceModel, dispatch_uid="invoice_data_version_post_delete")
+def bump_deleted_invoice_version(sender, instance, using=None, **kwargs):
+    buckets = [(instance.supplier, instance.date)]
+    tenant = instance.tenant
+    transaction.on_commit(lambda: InvoiceDataVersions(tenant=tenant).bump(buckets), using=using)
+
+
+@receiver(post_save, sender=InvoiceModel, dispatch_uid="invoice_change_post_save")
+def record_saved_invoice_change(sender, instance, raw=False, using=None, **kwargs):
+    InvoiceChangeModel.record([instance.pk], instance.tenant, using)
+
+
+@receiver(post_delete, sender=InvoiceModel, dispatch_uid="invoice_change_post_delete")
+def record_deleted_invoice_change(sender, instance, using=None, **kwargs):
+    InvoiceChangeModel.record([instance.pk], instance.tenant, using)
+
+
+@receiver(post_save, sender=InvoiceModel, dispatch_uid="payables_index_post_save")
+def update_saved_invoice_payables(sender, instance, raw=False, using=None, **kwargs):
+    transaction.on_commit(lambda: PayablesAgingService.notify_saved(instance, using), using=using)
+
+
+@receiver(post_delete, sender=InvoiceModel, dispatch_uid="payables_index_post_delete")
+def update_deleted_invoice_payables(sender, instance, using=None, **kwargs):
+    invoice_key = instance.pk
+    transaction.on_commit(lambda: PayablesAgingService.notify_removed([invoice_key], using), using=using)
+
+
+@receiver(post_save, sender=InvoiceModel, dispatch_uid="duplicate_index_post_save")
+def index_saved_invoice_fingerprint(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+
+    DuplicateIndexService(using=using).index_invoice(instance)
@@ -0,0 +1,62 @@
+from datetime import date
+from django.db.models import QuerySet
+from django.test import TestCase
+from inmaticpart2.database.builder.invoice_builder import InvoiceBuilder
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class InvoiceBuilderTest(TestCase):
+
+    def setUp(self):
+        self.invoice1 = InvoiceModelFactory.create(number="F2023/01", date=date(2023, 2, 10), supplier="Telefónica")
+        self.invoice2 = InvoiceModelFactory.create(number="F2023/02", date=date(2023, 1, 15), supplier="Telefónica")
+        self.invoice3 = InvoiceModelFactory.create(number="F2023/03", date=date(2023, 1, 20), supplier="Vodafone")
+        self.invoice4 = InvoiceModelFactory.create(number="F2023/04", date=date(2023, 3, 5), supplier="Telefónica")
+
+    def test_pushes_filters_down_to_queryset(self):
+        # Arrange
+        invoice_builder = InvoiceBuilder()
+        invoice_builder.filter_by_date_range(date(2023, 1, 1), date(2023, 2, 28))
+        invoice_builder.filter_by_supplier("Telefónica")
+
+        # Act
+        queryset = invoice_builder.build_queryset()
+
+        # Assert
+        self.assertIsInstance(queryset, QuerySet)
+        self.assertListEqual(list(queryset), [self.invoice2, self.invoice1])
+
+    def test_applies_filters_to_queryset_without_loading_it(self):
+        # Arrange
+        invoice_builder = InvoiceBuilder()
+        invoice_builder.filter_by_supplier("Vodafone")
+
+        # Act
+        with self.assertNumQueries(0):
+            filtered_invoices = invoice_builder.apply_filters(InvoiceModel.objects.all())
+
+        # Assert
+        self.assertListEqual(list(filtered_invoices), [self.invoice3])
+
+    def test_filters_in_memory_lists_by_supplier(self):
+        # Arrange
+        invoice_builder = InvoiceBuilder()
+        invoice_builder.filter_by_supplier("Telefónica")
+
+        # Act
+        filtered_invoices = invoice_builder.apply_filters([self.invoice1, self.invoice3, self.invoice4])
+
+        # Assert
+        self.assertListEqual(filtered_invoices, [self.invoice1, self.invoice4])
+
+    def test_reset_clears_filters(self):
+        # Arrange
+        invoice_builder = InvoiceBuilder()
+        invoice_builder.filter_by_supplier("Vodafone")
+
+        # Act
+        invoice_builder.reset()
+
+        # Assert
+        self.assertEqual(invoice_builder.build_queryset().count(), 4)
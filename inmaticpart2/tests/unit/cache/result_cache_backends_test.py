@@ -0,0 +1,100 @@
+import time
+from datetime import date
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from inmaticpart2.app.cache.result_cache_backends import DjangoResultCacheBackend, DjangoVersionStore, LocalResultCacheBackend
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class ResultCacheBackendsTest(TestCase):
+
+    def test_local_backend_evicts_least_recently_used_entries(self):
+        # Arrange
+        backend = LocalResultCacheBackend(max_entries=2)
+        backend.set_many({"a": 1, "b": 2})
+        backend.get_many(["a"])
+
+        # Act
+        backend.set_many({"c": 3})
+
+        # Assert
+        self.assertEqual(backend.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    def test_local_backend_returns_copies_of_cached_values(self):
+        # Arrange
+        backend = LocalResultCacheBackend()
+        value = {"weekly_cashflow": {"2023-01-02": 1}}
+        backend.set_many({"a": value})
+
+        # Act
+        value["weekly_cashflow"]["2023-01-09"] = 2
+        backend.get_many(["a"])["a"]["weekly_cashflow"].clear()
+
+        # Assert
+        self.assertEqual(backend.get_many(["a"]), {"a": {"weekly_cashflow": {"2023-01-02": 1}}})
+
+    def test_local_backend_expires_entries_after_ttl(self):
+        # Arrange
+        backend = LocalResultCacheBackend(ttl=0.01)
+        backend.set_many({"a": 1})
+
+        # Act
+        time.sleep(0.02)
+
+        # Assert
+        self.assertEqual(backend.get_many(["a"]), {})
+
+    def test_backends_bump_versions(self):
+        for backend in (LocalResultCacheBackend(), DjangoResultCacheBackend()):
+            # Arrange
+            backend.clear()
+            initial = backend.get_versions(["version:2023-01", "version:2023-02"])
+
+            # Act
+            backend.bump_versions(["version:2023-01"])
+            bumped = backend.get_versions(["version:2023-01", "version:2023-02"])
+
+            # Assert
+            self.assertEqual(bumped["version:2023-01"], initial["version:2023-01"] + 1)
+            self.assertEqual(bumped["version:2023-02"], initial["version:2023-02"])
+
+    def test_local_backends_share_versions_through_the_django_cache(self):
+        # Arrange
+        web_backend = LocalResultCacheBackend()
+        import_backend = LocalResultCacheBackend()
+        initial = web_backend.get_versions(["version:2023-03"])
+
+        # Act
+        import_backend.bump_versions(["version:2023-03"])
+
+        # Assert
+        self.assertEqual(web_backend.get_versions(["version:2023-03"]), {"version:2023-03": initial["version:2023-03"] + 1})
+
+    def test_version_keys_expire(self):
+        # Arrange
+        version_store = DjangoVersionStore(ttl=0.01)
+        initial = version_store.get_versions(["version:2023-04"])
+
+        # Act
+        time.sleep(0.02)
+
+        # Assert
+        self.assertIsNone(cache.get("version:2023-04"))
+        self.assertNotEqual(version_store.get_versions(["version:2023-04"]), initial)
+
+    def test_saving_a_loaded_invoice_does_not_reload_its_bucket(self):
+        # Arrange
+        InvoiceModelFactory.create(number="F2023/01", supplier="Telefónica", date=date(2023, 1, 15))
+        invoice = InvoiceModel.objects.get(number="F2023/01")
+        invoice.date = date(2023, 2, 15)
+
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            invoice.save()
+
+        # Assert
+        self.assertEqual(invoice.previous_version_bucket, ("Telefónica", date(2023, 1, 15)))
+        self.assertFalse([query for query in queries.captured_queries if query["sql"].startswith("SELECT") and "inmaticpart2_invoicemodel" in query["sql"]])
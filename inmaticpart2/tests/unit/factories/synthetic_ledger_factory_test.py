@@ -0,0 +1,55 @@
+from collections import Counter
+from datetime import date
+from django.test import TestCase
+from inmaticpart2.database.factories.synthetic_ledger_factory import SyntheticLedgerFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class SyntheticLedgerFactoryTest(TestCase):
+
+    def test_builds_reproducible_ledger_sorted_by_date(self):
+        # Arrange
+        factory = SyntheticLedgerFactory(invoices=500, suppliers=10, days=90, seed=7)
+
+        # Act
+        records = factory.build_records()
+
+        # Assert
+        self.assertEqual(len(records), 500)
+        self.assertEqual(records, SyntheticLedgerFactory(invoices=500, suppliers=10, days=90, seed=7).build_records())
+        self.assertEqual([record.date for record in records], sorted(record.date for record in records))
+        self.assertTrue(all(date(2023, 1, 1) <= record.date <= date(2023, 3, 31) for record in records))
+        self.assertTrue(all(record.total_value > record.base_value for record in records))
+
+    def test_skews_suppliers_towards_the_first_ones(self):
+        # Arrange
+        factory = SyntheticLedgerFactory(invoices=2000, suppliers=20, skew=1.5)
+
+        # Act
+        supplier_counts = Counter(record.supplier for record in factory.build_records())
+
+        # Assert
+        self.assertGreater(supplier_counts["Supplier 00000"], supplier_counts["Supplier 00019"] * 5)
+
+    def test_injects_gaps_and_duplicates(self):
+        # Arrange
+        factory = SyntheticLedgerFactory(invoices=1000, gap_rate=0.1, duplicate_rate=0.05)
+
+        # Act
+        numbers = [record.number for record in factory.build_records()]
+        sequences = sorted({int(number.split("/")[1]) for number in numbers})
+
+        # Assert
+        self.assertLess(len(set(numbers)), len(numbers))
+        self.assertGreater(sequences[-1], len(sequences))
+
+    def test_creates_invoices_in_batches(self):
+        # Arrange
+        factory = SyntheticLedgerFactory(invoices=250, concept="Batch seed")
+
+        # Act
+        created = factory.create_invoices(batch_size=100)
+
+        # Assert
+        self.assertEqual(created, 250)
+        self.assertEqual(InvoiceModel.objects.filter(concept="Batch seed").count(), 250)
@@ -0,0 +1,34 @@
+from django.test import TestCase
+from inmaticpart2.app.indexes.bloom_filter import BloomFilter
+
+
+class BloomFilterTest(TestCase):
+
+    def test_never_misses_added_keys(self):
+        # Arrange
+        bloom_filter = BloomFilter(capacity=10_000, error_rate=0.01)
+        keys = list(range(-5_000, 5_000, 7))
+
+        # Act
+        bloom_filter.add_many(keys)
+
+        # Assert
+        self.assertTrue(bloom_filter.contains_many(keys).all())
+        self.assertIn(-5_000, bloom_filter)
+        self.assertEqual(len(bloom_filter), len(keys))
+
+    def test_keeps_false_positives_near_error_rate(self):
+        # Arrange
+        bloom_filter = BloomFilter(capacity=10_000, error_rate=0.01)
+        bloom_filter.add_many(range(10_000))
+
+        # Act
+        false_positives = bloom_filter.contains_many(range(10_000, 30_000)).mean()
+
+        # Assert
+        self.assertLess(false_positives, 0.03)
+
+    def test_rejects_invalid_parameters(self):
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Bloom filter capacity must be positive"):
+            BloomFilter(capacity=0)
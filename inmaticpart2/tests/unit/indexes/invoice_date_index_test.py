@@ -0,0 +1,104 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
+from inmaticpart2.app.indexes.invoice_date_index import InvoiceDateIndex
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.database.factories.synthetic_ledger_factory import SyntheticLedgerFactory
+
+
+class InvoiceDateIndexTest(TestCase):
+
+    def setUp(self):
+        self.invoices = [
+            InvoiceRecord("F2023/03", "Endesa", date(2023, 2, 20), Decimal("50.00"), Decimal("60.50")),
+            InvoiceRecord("F2023/01", "Telefónica", date(2023, 1, 30), Decimal("100.00"), Decimal("121.00")),
+            InvoiceRecord("F2023/02", "Telefónica", date(2023, 2, 1), Decimal("200.00"), Decimal("242.00")),
+            InvoiceRecord("F2023/04", "Endesa", date(2023, 3, 5), Decimal("10.00"), Decimal("12.10")),
+        ]
+        self.date_index = InvoiceDateIndex(self.invoices)
+
+    def test_slices_sorted_invoices_by_window(self):
+        # Act
+        invoices = self.date_index.between(date(2023, 2, 1), date(2023, 3, 31))
+        endesa_invoices = self.date_index.between(date(2023, 1, 1), date(2023, 2, 28), "Endesa")
+
+        # Assert
+        self.assertListEqual([invoice.number for invoice in invoices], ["F2023/02", "F2023/03", "F2023/04"])
+        self.assertListEqual([invoice.number for invoice in endesa_invoices], ["F2023/03"])
+        self.assertListEqual(self.date_index.between(date(2023, 1, 1), date(2023, 12, 31), "Iberdrola"), [])
+
+    def test_sums_windows_with_prefix_sums(self):
+        # Act
+        totals = self.date_index.totals(date(2023, 1, 30), date(2023, 2, 20))
+        supplier_totals = self.date_index.totals(supplier="Endesa")
+
+        # Assert
+        self.assertDictEqual(totals, {"total_base": Decimal("350.00"), "total_value": Decimal("423.50"), "count": 3})
+        self.assertDictEqual(supplier_totals, {"total_base": Decimal("60.00"), "total_value": Decimal("72.60"), "count": 2})
+
+    def test_empty_windows_match_the_serial_total_balance(self):
+        # Act
+        cashflow = self.date_index.cashflow(date(2023, 6, 1), date(2023, 6, 30))
+
+        # Assert
+        expected = AccountingInvoiceService().cashflow_projection(date(2023, 6, 1), date(2023, 6, 30), self.invoices)
+        self.assertEqual(cashflow["total_balance"], expected["total_balance"])
+        self.assertIs(type(cashflow["total_balance"]), type(expected["total_balance"]))
+
+    def test_matches_cashflow_projection_for_many_windows(self):
+        # Arrange
+        invoices = SyntheticLedgerFactory(invoices=1500, suppliers=8, days=365).build_records()
+        service = AccountingInvoiceService()
+        windows = [
+            (date(2023, 1, 1), date(2023, 3, 31), None),
+            (date(2023, 2, 15), date(2023, 2, 15), None),
+            (date(2023, 4, 3), date(2023, 9, 17), "Supplier 00003"),
+            (date(2023, 12, 1), date(2024, 2, 1), "Supplier 00007"),
+        ]
+
+        # Act
+        projections = service.cashflow_projection_for_windows(invoices, windows)
+
+        # Assert
+        for (start_date, end_date, supplier), projection in zip(windows, projections):
+            window_invoices = [invoice for invoice in invoices if not supplier or invoice.supplier == supplier]
+            self.assertEqual(projection, service.cashflow_projection(start_date, end_date, window_invoices))
+
+    def test_creates_accounting_entries_for_each_window(self):
+        # Arrange
+        service = AccountingInvoiceService()
+        windows = [(date(2023, 1, 1), date(2023, 1, 31), None), (date(2023, 2, 1), date(2023, 3, 31), "Endesa")]
+
+        # Act
+        results = service.create_accounting_entries_for_windows(self.invoices, windows)
+
+        # Assert
+        for (start_date, end_date, supplier), result in zip(windows, results):
+            expected = service.create_accounting_entries(self.invoices, start_date, end_date, supplier)
+            self.assertEqual(result["grouped_invoices"], expected["grouped_invoices"])
+            self.assertEqual(list(result["grouped_invoices"]), list(expected["grouped_invoices"]))
+            self.assertEqual(result["accounting_entries"], expected["accounting_entries"])
+            self.assertEqual(result["missing_invoice_numbers"], expected["missing_invoice_numbers"])
+            self.assertEqual(result["duplicate_invoice_numbers"], expected["duplicate_invoice_numbers"])
+
+    def test_validates_the_index_once_for_all_windows(self):
+        # Arrange
+        service = AccountingInvoiceService()
+        invoices = SyntheticLedgerFactory(invoices=600, suppliers=6, days=365).build_records()
+        date_index = InvoiceDateIndex.from_invoices(invoices, validator=service.validate_accounting_invoice)
+        windows = [(date(2023, month, 1), date(2023, month, 28), None) for month in range(1, 13)]
+
+        # Act
+        with patch.object(service, "validate_invoice_amount") as validate_invoice_amount:
+            results = service.create_accounting_entries_for_windows(date_index, windows)
+
+        # Assert
+        validate_invoice_amount.assert_not_called()
+        for (start_date, end_date, supplier), result in zip(windows, results):
+            expected = service.create_accounting_entries(invoices, start_date, end_date, supplier)
+            self.assertEqual(result["grouped_invoices"], expected["grouped_invoices"])
+            self.assertEqual(result["accounting_entries"], expected["accounting_entries"])
+        with self.assertRaises(ValueError):
+            service.create_accounting_entries_for_windows([InvoiceRecord("X2023/01", "Endesa", date(2023, 1, 1), Decimal("1.00"), Decimal("1.21"))], windows)
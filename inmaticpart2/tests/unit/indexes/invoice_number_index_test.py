@@ -0,0 +1,99 @@
+from django.test import TestCase
+from inmaticpart2.app.indexes.invoice_number_index import InvoiceNumberIndex
+
+
+class InvoiceNumberIndexTest(TestCase):
+
+    def test_parses_invoice_number_into_series_and_sequence(self):
+        # Act
+        parsed = InvoiceNumberIndex.parse_invoice_number("F2024/007")
+
+        # Assert
+        self.assertEqual(parsed, ("F2024/", 7, 3))
+        self.assertIsNone(InvoiceNumberIndex.parse_invoice_number("F2024/"))
+
+    def test_reports_missing_ranges_per_series(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex.from_numbers(
+            ["F2023/01", "F2023/02", "F2023/05", "F2023/09", "F2024/03"]
+        )
+
+        # Act
+        missing_ranges = invoice_number_index.missing_ranges_by_series()
+
+        # Assert
+        self.assertDictEqual(missing_ranges, {
+            "F2023/": [(3, 4), (6, 8)],
+            "F2024/": [(1, 2)],
+        })
+
+    def test_reports_missing_ranges_beyond_last_indexed_sequence(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex.from_numbers(["F2023/01", "F2023/02", "F2023/03"])
+
+        # Act
+        missing_ranges = invoice_number_index.missing_ranges("F2023/", 2, 40)
+
+        # Assert
+        self.assertListEqual(missing_ranges, [(4, 40)])
+
+    def test_formats_missing_numbers_with_series_width(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex.from_numbers(["F2025/001", "F2025/004"])
+
+        # Act
+        missing_numbers = invoice_number_index.missing_numbers("F2025/")
+
+        # Assert
+        self.assertListEqual(missing_numbers, ["F2025/002", "F2025/003"])
+
+    def test_ignores_numbers_without_sequence(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex()
+
+        # Act
+        added = invoice_number_index.add("UNKNOWN")
+
+        # Assert
+        self.assertFalse(added)
+        self.assertListEqual(invoice_number_index.series(), [])
+
+    def test_discard_reopens_gap_and_shrinks_series(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex.from_numbers(["F2023/01", "F2023/02", "F2023/03"])
+
+        # Act
+        invoice_number_index.discard("F2023/02")
+        invoice_number_index.discard("F2023/03")
+
+        # Assert
+        self.assertListEqual(invoice_number_index.missing_ranges("F2023/"), [])
+        self.assertFalse(invoice_number_index.contains("F2023/02"))
+        self.assertTrue(invoice_number_index.discard("F2023/01"))
+        self.assertListEqual(invoice_number_index.series(), [])
+
+    def test_indexes_date_stamped_sequences_without_skipping_them(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex.from_numbers(["INV20230915004", "INV20230915001", "INV20230915002"])
+
+        # Act
+        missing_ranges = invoice_number_index.missing_ranges("INV", 20230915001)
+
+        # Assert
+        self.assertListEqual(missing_ranges, [(20230915003, 20230915003)])
+        self.assertFalse(invoice_number_index.is_sparse("INV"))
+        self.assertListEqual(invoice_number_index.missing_ranges("INV", 20230914999), [(20230914999, 20230915000), (20230915003, 20230915003)])
+
+    def test_falls_back_to_sparse_sequences_for_wide_series(self):
+        # Arrange
+        invoice_number_index = InvoiceNumberIndex(dense_min_span=16, dense_span_per_number=4)
+
+        # Act
+        invoice_number_index.add_many(["A1", "A2", "A1000000", "A4"])
+
+        # Assert
+        self.assertTrue(invoice_number_index.is_sparse("A"))
+        self.assertTrue(invoice_number_index.contains("A1000000"))
+        self.assertListEqual(invoice_number_index.missing_ranges("A"), [(3, 3), (5, 999999)])
+        self.assertTrue(invoice_number_index.discard("A1000000"))
+        self.assertListEqual(invoice_number_index.missing_ranges("A"), [(3, 3)])
@@ -0,0 +1,65 @@
+from datetime import date
+from django.test import TestCase
+from inmaticpart2.app.indexes.fenwick_tree import FenwickTree
+from inmaticpart2.app.indexes.payables_index import PayablesIndex
+
+
+class PayablesIndexTest(TestCase):
+
+    def test_fenwick_tree_answers_range_sums(self):
+        # Arrange
+        fenwick_tree = FenwickTree.from_values([5, 0, 3, 7, 1])
+
+        # Act
+        fenwick_tree.add(1, 4)
+
+        # Assert
+        self.assertEqual(fenwick_tree.prefix_sum(2), 12)
+        self.assertEqual(fenwick_tree.range_sum(1, 3), 14)
+        self.assertEqual(fenwick_tree.range_sum(-3, 10), 20)
+        self.assertEqual(fenwick_tree.range_sum(4, 2), 0)
+
+    def test_sums_open_payables_between_due_dates(self):
+        # Arrange
+        payables_index = PayablesIndex()
+        payables_index.add(1, date(2023, 2, 1), 12100)
+        payables_index.add(2, date(2023, 2, 15), 5000)
+        payables_index.add(3, date(2023, 3, 1), 2500)
+
+        # Act
+        february = payables_index.due_between(date(2023, 2, 1), date(2023, 2, 28))
+        from_march = payables_index.due_after(date(2023, 3, 1))
+
+        # Assert
+        self.assertEqual(february, (17100, 2))
+        self.assertEqual(from_march, (2500, 1))
+
+    def test_removes_and_replaces_invoices(self):
+        # Arrange
+        payables_index = PayablesIndex()
+        payables_index.add(1, date(2023, 2, 1), 12100)
+        payables_index.add(2, date(2023, 2, 15), 5000)
+
+        # Act
+        payables_index.add(2, date(2023, 4, 1), 6000)
+        removed = payables_index.remove(1)
+
+        # Assert
+        self.assertTrue(removed)
+        self.assertFalse(payables_index.remove(1))
+        self.assertEqual(len(payables_index), 1)
+        self.assertEqual(payables_index.due_until(date(2023, 3, 31)), (0, 0))
+        self.assertEqual(payables_index.due_until(date(2023, 4, 1)), (6000, 1))
+
+    def test_grows_to_fit_distant_due_dates(self):
+        # Arrange
+        payables_index = PayablesIndex(capacity=16)
+        payables_index.add(1, date(2023, 1, 10), 100)
+
+        # Act
+        payables_index.add(2, date(2035, 6, 1), 200)
+        payables_index.add(3, date(2001, 6, 1), 300)
+
+        # Assert
+        self.assertEqual(payables_index.due_until(date(2023, 1, 10)), (400, 2))
+        self.assertEqual(payables_index.due_after(date(2023, 1, 11)), (200, 1))
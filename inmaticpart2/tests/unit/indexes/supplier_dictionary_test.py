@@ -0,0 +1,44 @@
+from django.test import TestCase
+from inmaticpart2.app.indexes.supplier_dictionary import SupplierDictionary
+
+
+class SupplierDictionaryTest(TestCase):
+
+    def test_encodes_names_to_dense_ids(self):
+        # Arrange
+        supplier_dictionary = SupplierDictionary()
+
+        # Act
+        supplier_ids = [supplier_dictionary.encode(name) for name in ["Telefónica", "Endesa", "Telefónica", "Telefonica"]]
+
+        # Assert
+        self.assertListEqual(supplier_ids, [0, 1, 0, 2])
+        self.assertEqual(supplier_dictionary.decode(1), "Endesa")
+        self.assertIsNone(supplier_dictionary.get("Iberdrola"))
+
+    def test_merges_normalized_names_into_first_spelling(self):
+        # Arrange
+        supplier_dictionary = SupplierDictionary(normalize=True)
+
+        # Act
+        supplier_ids = [supplier_dictionary.encode(name) for name in ["Telefónica", "TELEFONICA ", "telefonica", "Endesa"]]
+
+        # Assert
+        self.assertListEqual(supplier_ids, [0, 0, 0, 1])
+        self.assertListEqual(supplier_dictionary.names, ["Telefónica", "Endesa"])
+        self.assertIn("TeléFonica", supplier_dictionary)
+
+    def test_splits_group_keys_into_name_and_month(self):
+        # Arrange
+        supplier_dictionary = SupplierDictionary.from_names(["Endesa", "Vodafone"])
+
+        # Act
+        group_key = supplier_dictionary.group_key("Vodafone", 2023, 12)
+
+        # Assert
+        self.assertEqual(supplier_dictionary.split_group_key(group_key), ("Vodafone", "2023-12"))
+
+    def test_rejects_unknown_ids(self):
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Unknown supplier id: 3"):
+            SupplierDictionary().decode(3)
@@ -0,0 +1,122 @@
+import os
+import tempfile
+from threading import Barrier, Thread
+from django.test import TestCase
+from inmaticpart2.app.instrumentation.accounting_instrumentation import AccountingInstrumentation
+from inmaticpart2.app.instrumentation.metrics_collectors import InMemoryMetricsCollector, PrometheusTextfileCollector
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.database.factories.synthetic_ledger_factory import SyntheticLedgerFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class AccountingInstrumentationTest(TestCase):
+
+    def setUp(self):
+        self.collector = InMemoryMetricsCollector()
+        self.factory = SyntheticLedgerFactory(invoices=200, suppliers=5, days=60, duplicate_rate=0)
+
+    def test_records_rows_and_time_for_each_stage(self):
+        # Arrange
+        service = AccountingInvoiceService(AccountingInstrumentation(collectors=[self.collector]))
+
+        # Act
+        result = service.create_accounting_entries(self.factory.build_records())
+
+        # Assert
+        run = self.collector.last_run()
+        self.assertEqual(run.name, "create_accounting_entries")
+        self.assertEqual(
+            [stage.stage for stage in run.stages],
+            ["validate", "filter", "sort", "validate_format", "group", "entries", "gaps", "duplicates"]
+        )
+        self.assertEqual(run.stage("group").rows_in, 200)
+        self.assertEqual(run.stage("group").rows_out, sum(len(months) for months in result["grouped_invoices"].values()))
+        self.assertEqual(run.stage("entries").rows_out, 200)
+        self.assertTrue(all(stage.seconds >= 0 and stage.allocated_bytes is None for stage in run.stages))
+        self.assertGreaterEqual(run.seconds, sum(stage.seconds for stage in run.stages))
+
+    def test_counts_queries_and_allocations_per_stage(self):
+        # Arrange
+        self.factory.create_invoices()
+        instrumentation = AccountingInstrumentation(collectors=[self.collector], trace_allocations=True)
+        service = AccountingInvoiceService(instrumentation)
+
+        # Act
+        service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+        # Assert
+        run = self.collector.last_run()
+        self.assertEqual(run.stage("sort").queries, 1)
+        self.assertEqual(run.stage("sort").rows_out, 200)
+        self.assertEqual(run.stage("group").queries, 0)
+        self.assertGreater(run.stage("entries").allocated_bytes, 0)
+
+    def test_writes_prometheus_text_file(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as directory:
+            collector = PrometheusTextfileCollector(os.path.join(directory, "accounting.prom"))
+            service = AccountingInvoiceService(AccountingInstrumentation(collectors=[collector]))
+
+            # Act
+            service.create_accounting_entries(self.factory.build_records())
+            service.create_accounting_entries(self.factory.build_records())
+
+            # Assert
+            pid = os.getpid()
+            self.assertEqual(collector.path, os.path.join(directory, f"accounting.{pid}.prom"))
+            with open(collector.path, encoding="utf-8") as metrics_file:
+                metrics = metrics_file.read()
+            self.assertIn(f'inmaticpart2_accounting_runs_total{{run="create_accounting_entries",pid="{pid}"}} 2', metrics)
+            self.assertIn(f'inmaticpart2_accounting_stage_rows_out_total{{run="create_accounting_entries",stage="entries",pid="{pid}"}} 400', metrics)
+            self.assertIn("# TYPE inmaticpart2_accounting_stage_seconds_total counter", metrics)
+
+    def test_dumps_profiles_in_capture_mode(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as directory:
+            service = AccountingInvoiceService(AccountingInstrumentation(collectors=[self.collector], profile_dir=directory))
+
+            # Act
+            service.create_accounting_entries(self.factory.build_records())
+
+            # Assert
+            run = self.collector.last_run()
+            self.assertTrue(os.path.exists(run.profile_path))
+            self.assertTrue(os.path.exists(run.allocations_path))
+
+    def test_records_nothing_when_disabled(self):
+        # Arrange
+        instrumentation = AccountingInstrumentation()
+
+        # Act
+        with instrumentation.run("create_accounting_entries") as run:
+            with instrumentation.stage("group", rows_in=3) as stage:
+                stage.rows_out = 1
+
+        # Assert
+        self.assertIsNone(run)
+        self.assertFalse(instrumentation.enabled)
+
+    def test_keeps_concurrent_runs_apart(self):
+        # Arrange
+        instrumentation = AccountingInstrumentation(collectors=[self.collector])
+        barrier = Barrier(2)
+
+        def run(name):
+            with instrumentation.run(name):
+                barrier.wait()
+                with instrumentation.stage(name):
+                    barrier.wait()
+
+        threads = [Thread(target=run, args=(name,)) for name in ("first", "second")]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(
+            sorted((run.name, [stage.stage for stage in run.stages]) for run in self.collector.runs),
+            [("first", ["first"]), ("second", ["second"])]
+        )
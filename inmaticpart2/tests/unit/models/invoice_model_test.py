@@ -0,0 +1,26 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+
+
+class InvoiceModelTest(TestCase):
+
+    def test_allows_repeated_numbers_by_default(self):
+        # Arrange
+        InvoiceModelFactory.create(number="F2023/01")
+
+        # Act
+        repeated = InvoiceModelFactory.create(number="F2023/01")
+
+        # Assert
+        self.assertIsNone(repeated.number_lock)
+
+    @override_settings(INVOICE_UNIQUE_NUMBER_PER_SERIES=True)
+    def test_enforces_unique_numbers_per_tenant_when_enabled(self):
+        # Arrange
+        InvoiceModelFactory.create(number="F2023/01")
+        InvoiceModelFactory.create(number="F2023/01", tenant="acme")
+
+        # Act & Assert
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            InvoiceModelFactory.create(number="F2023/01")
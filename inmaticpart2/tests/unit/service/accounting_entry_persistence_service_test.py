@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.app.service.accounting_entry_persistence_service import AccountingEntryPersistenceService
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import AccountingEntryModel, InvoiceModel
+
+
+class AccountingEntryPersistenceServiceTest(TestCase):
+
+    def setUp(self):
+        self.invoice1 = InvoiceModelFactory.create(number="F2023/01", date=date(2023, 1, 15), supplier="Telefónica")
+        self.invoice2 = InvoiceModelFactory.create(number="F2023/02", date=date(2023, 1, 20), supplier="Telefónica")
+        self.invoice3 = InvoiceModelFactory.create(
+            number="F2023/03", date=date(2023, 2, 10), supplier="Vodafone", total_value=Decimal("50.00")
+        )
+        self.paid_invoice = InvoiceModelFactory.create(
+            number="F2023/04", date=date(2023, 2, 11), supplier="Vodafone", state=InvoiceStates.PAID
+        )
+
+    def test_persists_accounting_entries_and_accounts_pending_invoices(self):
+        # Arrange
+        accounting_result = AccountingInvoiceService().create_accounting_entries(list(InvoiceModel.objects.all()))
+        persistence_service = AccountingEntryPersistenceService(batch_size=3)
+
+        # Act
+        with self.assertNumQueries(6):
+            summary = persistence_service.persist_accounting_result(accounting_result)
+
+        # Assert
+        self.assertDictEqual(summary, {"persisted_entries": 4, "accounted_invoices": 3})
+        self.assertListEqual(
+            list(AccountingEntryModel.objects.order_by("id").values_list("invoice_number", "amount")),
+            [("F2023/01", Decimal("121.00")), ("F2023/02", Decimal("121.00")),
+             ("F2023/03", Decimal("50.00")), ("F2023/04", Decimal("121.00"))]
+        )
+        self.assertEqual(InvoiceModel.objects.filter(state=InvoiceStates.ACCOUNTED).count(), 3)
+        self.paid_invoice.refresh_from_db()
+        self.assertEqual(self.paid_invoice.state, InvoiceStates.PAID)
+
+    def test_accounts_invoices_loaded_as_records(self):
+        # Arrange
+        accounting_result = AccountingInvoiceService().create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+        # Act
+        summary = AccountingEntryPersistenceService().persist_accounting_result(accounting_result)
+
+        # Assert
+        self.assertDictEqual(summary, {"persisted_entries": 4, "accounted_invoices": 3})
+
+    def test_raises_value_error_for_invoices_without_primary_key(self):
+        # Arrange
+        accounting_result = AccountingInvoiceService().create_accounting_entries([InvoiceModelFactory.build_invoice(number="F2023/09", date=date(2023, 3, 1))])
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            AccountingEntryPersistenceService().persist_accounting_result(accounting_result)
+        self.assertEqual(AccountingEntryModel.objects.count(), 0)
+
+    def test_accounts_only_the_tenant_invoices(self):
+        # Arrange
+        acme_invoice = InvoiceModelFactory.create(number="F2023/05", tenant="acme", date=date(2023, 2, 12))
+
+        # Act
+        summary = AccountingEntryPersistenceService(tenant="acme").persist([], [self.invoice1.pk, acme_invoice.pk])
+
+        # Assert
+        self.assertDictEqual(summary, {"persisted_entries": 0, "accounted_invoices": 1})
+        self.invoice1.refresh_from_db()
+        self.assertEqual(self.invoice1.state, InvoiceStates.PENDING)
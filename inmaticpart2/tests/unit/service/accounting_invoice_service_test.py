@@ -3,10 +3,13 @@ from datetime import datetime
 from unittest.mock import patch
 from django.test import TestCase
 from inmaticpart2.app.dtos.accounting_entry import AccountingEntry
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
 from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
 from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.database.factories.synthetic_ledger_factory import SyntheticLedgerFactory
 from inmaticpart2.app.enums.accounting_codes import AccountingCodes
 from inmaticpart2.app.enums.payment_type import PaymentType
+from inmaticpart2.models import InvoiceModel
 
 
 class AccountingInvoiceServiceTest(TestCase):
@@ -204,3 +207,278 @@ class AccountingInvoiceServiceTest(TestCase):
 
         self.assertIsInstance(result["weekly_cashflow"], dict)
         self.assertIsInstance(result["monthly_cashflow"], dict)
+
+    def test_finds_missing_invoice_ranges_for_any_series(self):
+        # Arrange
+        invoice5 = InvoiceModelFactory.build_invoice(number="F2024/04", date=datetime(2024, 3, 1).date())
+        invoices = [self.invoice1, self.invoice3, invoice5]
+        invoice_processor = AccountingInvoiceService()
+
+        # Act
+        missing_ranges = invoice_processor.find_missing_invoice_ranges(invoices)
+
+        # Assert
+        self.assertDictEqual(missing_ranges, {"F2023/": [(2, 2)], "F2024/": [(1, 3)]})
+
+    def test_streams_accounting_entries_by_supplier_month_groups(self):
+        # Arrange
+        invoices = iter([self.invoice1, self.invoice2, self.invoice3, self.invoice4])
+        invoice_processor = AccountingInvoiceService()
+
+        # Act
+        accounting_entries = list(invoice_processor.stream_accounting_entries(invoices))
+
+        # Assert
+        self.assertListEqual(
+            [entry.invoice_number for entry in accounting_entries],
+            [self.invoice1.number, self.invoice2.number, self.invoice3.number, self.invoice4.number]
+        )
+        self.assertEqual(accounting_entries[2].description, f"Invoice {self.invoice3.number} for 2023-02 from Telefónica")
+        self.assertEqual(accounting_entries[3].description, f"Invoice {self.invoice4.number} for 2023-01 from Vodafone")
+
+    def test_stream_holds_only_the_open_group(self):
+        # Arrange
+        invoices = [
+            InvoiceModelFactory.build_invoice(number=f"F2023/{index:02d}", supplier=f"Supplier {index % 5}", date=datetime(2023, 1, 1 + index % 3).date())
+            for index in range(1, 31)
+        ]
+        invoices.sort(key=lambda invoice: (invoice.supplier, invoice.date))
+        pulled = []
+        invoice_processor = AccountingInvoiceService()
+
+        def pull():
+            for invoice in invoices:
+                pulled.append(invoice)
+                yield invoice
+
+        # Act
+        held = []
+        for emitted, _ in enumerate(invoice_processor.stream_accounting_entries(pull()), start=1):
+            held.append(len(pulled) - emitted)
+
+        # Assert
+        self.assertEqual(emitted, 30)
+        self.assertEqual(max(held), 6)
+
+    def test_stream_sorts_lists_and_queryset_by_supplier_and_date(self):
+        # Arrange
+        for invoice in [self.invoice4, self.invoice3, self.invoice2, self.invoice1]:
+            invoice.save()
+        invoice_processor = AccountingInvoiceService()
+        expected = [self.invoice1.number, self.invoice2.number, self.invoice3.number, self.invoice4.number]
+
+        # Act
+        from_list = list(invoice_processor.stream_accounting_entries([self.invoice4, self.invoice3, self.invoice2, self.invoice1]))
+        from_queryset = list(invoice_processor.stream_accounting_entries(InvoiceModel.objects.all(), as_records=True))
+
+        # Assert
+        self.assertListEqual([entry.invoice_number for entry in from_list], expected)
+        self.assertListEqual([entry.invoice_number for entry in from_queryset], expected)
+
+    def test_stream_raises_value_error_for_unordered_invoices(self):
+        # Arrange
+        invoices = iter([self.invoice4, self.invoice1])
+        invoice_processor = AccountingInvoiceService()
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            list(invoice_processor.stream_accounting_entries(invoices))
+
+    def test_creates_accounting_entries_from_queryset(self):
+        # Arrange
+        for invoice in [self.invoice1, self.invoice2, self.invoice3, self.invoice4]:
+            invoice.save()
+        invoice_processor = AccountingInvoiceService()
+
+        # Act
+        result = invoice_processor.create_accounting_entries(
+            InvoiceModel.objects.all(),
+            datetime(2023, 1, 1).date(),
+            datetime(2023, 1, 31).date(),
+            supplier_id="Telefónica"
+        )
+
+        # Assert
+        self.assertListEqual(
+            [entry.invoice_number for entry in result["accounting_entries"]],
+            [self.invoice1.number, self.invoice2.number]
+        )
+
+    def test_aggregates_invoices_by_supplier_and_month_in_database(self):
+        # Arrange
+        for invoice in [self.invoice1, self.invoice2, self.invoice3, self.invoice4]:
+            invoice.save()
+        invoice_processor = AccountingInvoiceService()
+
+        # Act
+        with self.assertNumQueries(1):
+            grouped_invoices = invoice_processor.group_invoices_by_supplier_and_month(
+                InvoiceModel.objects.all(), aggregate_only=True, with_invoices=True
+            )
+
+        # Assert
+        january = grouped_invoices["Telefónica"]["2023-01"]
+        self.assertEqual(january["total_base"], Decimal("240.00"))
+        self.assertEqual(january["total_value"], Decimal("300.00"))
+        self.assertEqual(january["count"], 2)
+        self.assertListEqual(list(january["invoices"]), [self.invoice1, self.invoice2])
+        self.assertListEqual(list(grouped_invoices["Telefónica"]), ["2023-01", "2023-02"])
+        self.assertNotIn("invoices", invoice_processor.group_invoices_by_supplier_and_month(
+            InvoiceModel.objects.all(), aggregate_only=True
+        )["Vodafone"]["2023-01"])
+
+    def test_vectorized_cashflow_projection_matches_python_projection(self):
+        # Arrange
+        invoice5 = InvoiceModelFactory.build_invoice(
+            number="F2023/05",
+            date=datetime(2023, 1, 30).date(),
+            supplier="Vodafone",
+            total_value=Decimal("0.05"),
+            base_value=Decimal("0.04")
+        )
+        invoices = [self.invoice3, self.invoice1, invoice5, self.invoice2, self.invoice4]
+        invoice_processor = AccountingInvoiceService()
+        start_date = datetime(2023, 1, 16).date()
+        end_date = datetime(2023, 2, 28).date()
+
+        # Act
+        expected_result = invoice_processor.cashflow_projection(start_date, end_date, invoices)
+        actual_result = invoice_processor.cashflow_projection(start_date, end_date, invoices, vectorized=True)
+
+        # Assert
+        self.assertDictEqual(actual_result, expected_result)
+        self.assertListEqual(list(actual_result["weekly_cashflow"]), list(expected_result["weekly_cashflow"]))
+        self.assertEqual(str(actual_result["monthly_cashflow"]["2023-01"]), "200.05")
+
+    def test_vectorized_cashflow_projection_keeps_python_types_for_empty_input(self):
+        # Arrange
+        invoice_processor = AccountingInvoiceService()
+        start_date = datetime(2024, 1, 1).date()
+        end_date = datetime(2024, 1, 31).date()
+
+        # Act
+        expected_result = invoice_processor.cashflow_projection(start_date, end_date, [self.invoice1])
+        actual_result = invoice_processor.cashflow_projection(start_date, end_date, [self.invoice1], vectorized=True)
+
+        # Assert
+        self.assertEqual(actual_result, {"total_balance": 0, "weekly_cashflow": {}, "monthly_cashflow": {}})
+        self.assertEqual(actual_result, expected_result)
+        self.assertIs(type(AccountingInvoiceService(fixed_point=True).cashflow_projection(start_date, end_date, [self.invoice1])["total_balance"]), int)
+        self.assertIs(type(actual_result["total_balance"]), type(expected_result["total_balance"]))
+
+    def test_vectorized_cashflow_projection_rejects_sub_cent_amounts(self):
+        # Arrange
+        self.invoice1.total_value = Decimal("100.005")
+        invoice_processor = AccountingInvoiceService()
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            invoice_processor.cashflow_projection(datetime(2023, 1, 1).date(), datetime(2023, 1, 31).date(), [self.invoice1], vectorized=True)
+
+    def test_accepts_invoice_records_interchangeably_with_models(self):
+        # Arrange
+        invoices = [self.invoice1, self.invoice2, self.invoice3, self.invoice4]
+        invoice_records = [InvoiceRecord.from_model(invoice) for invoice in invoices]
+        invoice_processor = AccountingInvoiceService()
+
+        # Act
+        expected_result = invoice_processor.create_accounting_entries(invoices)
+        actual_result = invoice_processor.create_accounting_entries(invoice_records)
+
+        # Assert
+        self.assertListEqual(actual_result["accounting_entries"], expected_result["accounting_entries"])
+        self.assertListEqual(actual_result["missing_invoice_numbers"], expected_result["missing_invoice_numbers"])
+        self.assertEqual(
+            invoice_processor.cashflow_projection(datetime(2023, 1, 1).date(), datetime(2023, 2, 28).date(), invoice_records),
+            invoice_processor.cashflow_projection(datetime(2023, 1, 1).date(), datetime(2023, 2, 28).date(), invoices)
+        )
+
+    def test_loads_invoice_records_from_queryset(self):
+        # Arrange
+        for invoice in [self.invoice1, self.invoice2]:
+            invoice.save()
+
+        # Act
+        with self.assertNumQueries(1):
+            invoice_records = InvoiceRecord.load_queryset(InvoiceModel.objects.order_by("date"))
+
+        # Assert
+        self.assertListEqual(invoice_records, [InvoiceRecord.from_model(self.invoice1), InvoiceRecord.from_model(self.invoice2)])
+
+    def test_fixed_point_mode_returns_identical_results(self):
+        for seed in range(5):
+            # Arrange
+            invoices = SyntheticLedgerFactory(invoices=2000, suppliers=25, days=400, seed=seed).build_records()
+            invoice_processor = AccountingInvoiceService()
+            fixed_point_processor = AccountingInvoiceService(fixed_point=True)
+            start_date, end_date = datetime(2023, 2, 1).date(), datetime(2023, 11, 30).date()
+
+            # Act
+            results = [
+                (
+                    processor.group_invoices_by_supplier_and_month(invoices),
+                    processor.group_invoices_by_supplier_and_month(invoices, aggregate_only=True, with_invoices=True),
+                    processor.cashflow_projection(start_date, end_date, invoices),
+                )
+                for processor in (invoice_processor, fixed_point_processor)
+            ]
+
+            # Assert
+            self.assertEqual(repr(plain_dict(results[1])), repr(plain_dict(results[0])))
+
+    def test_fixed_point_mode_rejects_sub_cent_amounts(self):
+        # Arrange
+        invoice = InvoiceRecord("F2023/01", "Telefónica", datetime(2023, 1, 15).date(), Decimal("10.005"), Decimal("12.105"))
+
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Amount 10.005 has more than 2 decimal places."):
+            AccountingInvoiceService(fixed_point=True).group_invoices_by_supplier_and_month([invoice])
+
+
+    def test_groups_normalized_supplier_names_together(self):
+        # Arrange
+        self.invoice4.supplier = "TELEFONICA"
+        invoices = [self.invoice1, self.invoice3, self.invoice4]
+
+        # Act
+        grouped_invoices = AccountingInvoiceService(normalize_suppliers=True).group_invoices_by_supplier_and_month(invoices)
+
+        # Assert
+        self.assertListEqual(list(grouped_invoices), ["Telefónica"])
+        self.assertListEqual(list(grouped_invoices["Telefónica"]), ["2023-01", "2023-02"])
+        self.assertEqual(grouped_invoices["Telefónica"]["2023-01"]["total_value"], Decimal("150.00"))
+        self.assertEqual(len(grouped_invoices["Telefónica"]["2023-01"]["invoices"]), 2)
+
+def plain_dict(value):
+    if isinstance(value, dict):
+        return {key: plain_dict(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain_dict(item) for item in value]
+    return value
+
+
+class LazyAccountingEntriesTest(TestCase):
+
+    def setUp(self):
+        self.invoices = SyntheticLedgerFactory(invoices=300, suppliers=10, days=90, duplicate_rate=0).build_records()
+
+    def test_lazy_entries_match_eager_entries(self):
+        # Act
+        eager_entries = AccountingInvoiceService().create_accounting_entries(self.invoices)["accounting_entries"]
+        lazy_entries = AccountingInvoiceService(lazy_entries=True).create_accounting_entries(self.invoices)["accounting_entries"]
+
+        # Assert
+        self.assertEqual(len(lazy_entries), len(eager_entries))
+        self.assertEqual(lazy_entries, eager_entries)
+        self.assertEqual(lazy_entries[-1], eager_entries[-1])
+        self.assertEqual([str(entry) for entry in lazy_entries], [str(entry) for entry in eager_entries])
+        self.assertEqual(lazy_entries.to_accounting_entries(), eager_entries)
+        self.assertEqual(lazy_entries.amounts(), [entry.amount for entry in eager_entries])
+
+    def test_validates_lazy_batch_once(self):
+        # Arrange
+        grouped_invoices = AccountingInvoiceService().group_invoices_by_supplier_and_month(self.invoices)
+
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Invalid account code: 7000"):
+            AccountingInvoiceService().process_grouped_invoices(grouped_invoices, "7000", PaymentType.DEBIT, lazy=True)
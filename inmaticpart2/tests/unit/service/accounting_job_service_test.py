@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from django.test import TransactionTestCase
+from inmaticpart2.app.service.accounting_job_service import AccountingJobService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+
+
+class DeferredExecutor:
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, function, *args):
+        self.calls.append((function, args))
+
+    def run_all(self):
+        for function, args in self.calls:
+            function(*args)
+        self.calls = []
+
+
+class AccountingJobServiceTest(TransactionTestCase):
+
+    def setUp(self):
+        InvoiceModelFactory.create(number="F2023/01", supplier="Telefónica", date=date(2023, 1, 15), total_value=Decimal("121.00"))
+        InvoiceModelFactory.create(number="F2023/02", supplier="Telefónica", date=date(2023, 2, 10), total_value=Decimal("242.00"))
+        InvoiceModelFactory.create(number="F2023/03", supplier="Endesa", date=date(2023, 2, 20), total_value=Decimal("60.50"))
+
+    def test_joins_identical_active_requests(self):
+        # Arrange
+        executor = DeferredExecutor()
+        job_service = AccountingJobService(executor=executor)
+        parameters = {"start_date": "2023-01-01", "end_date": "2023-12-31"}
+
+        # Act
+        first_job = job_service.submit("accounting", parameters)
+        second_job = job_service.submit("accounting", {**parameters, "supplier": ""})
+        other_job = job_service.submit("cashflow", parameters)
+        executor.run_all()
+        third_job = job_service.submit("accounting", parameters)
+
+        # Assert
+        self.assertIs(first_job, second_job)
+        self.assertEqual(first_job.joined_requests, 1)
+        self.assertIsNot(first_job, other_job)
+        self.assertIsNot(first_job, third_job)
+        self.assertEqual(len(executor.calls), 1)
+
+    def test_runs_accounting_job_in_worker_pool(self):
+        # Arrange
+        job_service = AccountingJobService(executor=ThreadPoolExecutor(max_workers=1))
+
+        # Act
+        job = job_service.submit("accounting", {"start_date": "2023-01-01", "end_date": "2023-12-31", "supplier": "Telefónica"})
+        job_service.executor.shutdown(wait=True)
+
+        # Assert
+        self.assertEqual(job.status, "succeeded", job.error)
+        self.assertEqual(job.result["accounting_entry_count"], 2)
+        self.assertEqual(job.result["grouped_invoices"]["Telefónica"]["2023-02"]["total_value"], Decimal("242.00"))
+        self.assertIn("group", [stage["stage"] for stage in job.stages])
+        self.assertIs(job_service.get(job.id), job)
+
+    def test_runs_cashflow_job(self):
+        # Arrange
+        executor = DeferredExecutor()
+        job_service = AccountingJobService(executor=executor)
+
+        # Act
+        job = job_service.submit("cashflow", {"start_date": "2023-02-01", "end_date": "2023-02-28"})
+        executor.run_all()
+
+        # Assert
+        self.assertEqual(job.status, "succeeded", job.error)
+        self.assertEqual(job.result["total_balance"], Decimal("302.50"))
+
+    def test_scopes_jobs_to_their_tenant(self):
+        # Arrange
+        InvoiceModelFactory.create(number="F2023/01", supplier="Endesa", tenant="acme", date=date(2023, 2, 1), total_value=Decimal("1000.00"))
+        executor = DeferredExecutor()
+        job_service = AccountingJobService(executor=executor)
+        parameters = {"start_date": "2023-02-01", "end_date": "2023-02-28"}
+
+        # Act
+        default_job = job_service.submit("cashflow", parameters)
+        tenant_job = job_service.submit("cashflow", parameters, tenant="acme")
+        payload_tenant_job = job_service.submit("cashflow", {**parameters, "tenant": "acme"})
+        executor.run_all()
+
+        # Assert
+        self.assertIsNot(default_job, tenant_job)
+        self.assertIs(payload_tenant_job, default_job)
+        self.assertEqual(default_job.result["total_balance"], Decimal("302.50"))
+        self.assertEqual(tenant_job.result["total_balance"], Decimal("1000.00"))
+
+    def test_rejects_invalid_requests(self):
+        # Arrange
+        job_service = AccountingJobService(executor=DeferredExecutor())
+
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Invalid job kind: payroll"):
+            job_service.submit("payroll", {"start_date": "2023-01-01", "end_date": "2023-01-31"})
+        with self.assertRaisesMessage(ValueError, "end_date is required.") as missing_date:
+            job_service.submit("accounting", {"start_date": "2023-01-01"})
+        self.assertIsInstance(missing_date.exception.__cause__, KeyError)
+        with self.assertRaisesMessage(ValueError, "end_date cannot be before start_date."):
+            job_service.submit("accounting", {"start_date": "2023-02-01", "end_date": "2023-01-01"})
@@ -0,0 +1,116 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from inmaticpart2.app.cache import result_cache_backends
+from inmaticpart2.app.cache.result_cache_backends import DjangoResultCacheBackend, get_result_cache_backend
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.service.cached_accounting_service import CachedAccountingService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class CachedAccountingServiceTest(TestCase):
+
+    def setUp(self):
+        self.backend = get_result_cache_backend()
+        self.backend.clear()
+        self.service = CachedAccountingService(backend=self.backend)
+        self.create_invoice("F2023/01", "Telefónica", date(2023, 1, 30), "121.00")
+        self.create_invoice("F2023/02", "Telefónica", date(2023, 2, 1), "242.00")
+        self.create_invoice("F2023/03", "Endesa", date(2023, 2, 20), "60.50")
+        self.create_invoice("F2023/04", "Endesa", date(2023, 3, 5), "10.00")
+
+    def create_invoice(self, number, supplier, invoice_date, total_value):
+        with self.captureOnCommitCallbacks(execute=True):
+            return InvoiceModelFactory.create(number=number, supplier=supplier, date=invoice_date, total_value=Decimal(total_value))
+
+    def test_matches_uncached_cashflow_projection(self):
+        # Arrange
+        expected = AccountingInvoiceService().cashflow_projection(date(2023, 1, 15), date(2023, 3, 1), InvoiceModel.objects.all())
+
+        # Act
+        first = self.service.cashflow_projection(date(2023, 1, 15), date(2023, 3, 1))
+        with self.assertNumQueries(0):
+            second = self.service.cashflow_projection(date(2023, 1, 15), date(2023, 3, 1))
+
+        # Assert
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual((self.service.misses, self.service.hits), (3, 3))
+
+    def test_empty_periods_match_the_uncached_total_balance(self):
+        # Act
+        cashflow = self.service.cashflow_projection(date(2024, 1, 1), date(2024, 2, 29))
+
+        # Assert
+        expected = AccountingInvoiceService().cashflow_projection(date(2024, 1, 1), date(2024, 2, 29), InvoiceModel.objects.all())
+        self.assertEqual(cashflow, expected)
+        self.assertIs(type(cashflow["total_balance"]), type(expected["total_balance"]))
+
+    def test_recomputes_only_the_touched_month_after_an_edit(self):
+        # Arrange
+        self.service.cashflow_projection(date(2023, 1, 1), date(2023, 3, 31))
+        invoice = InvoiceModel.objects.get(number="F2023/03")
+        invoice.total_value = Decimal("100.00")
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.save()
+        cashflow = self.service.cashflow_projection(date(2023, 1, 1), date(2023, 3, 31))
+
+        # Assert
+        self.assertEqual(cashflow["monthly_cashflow"]["2023-02"], Decimal("342.00"))
+        self.assertEqual(cashflow["total_balance"], Decimal("473.00"))
+        self.assertEqual((self.service.misses, self.service.hits), (4, 2))
+
+    def test_invalidates_previous_month_when_an_invoice_moves(self):
+        # Arrange
+        self.service.group_invoices_by_supplier_and_month(date(2023, 1, 1), date(2023, 3, 31), supplier="Endesa")
+        invoice = InvoiceModel.objects.get(number="F2023/04")
+        invoice.date = date(2023, 2, 25)
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.save()
+        grouped_invoices = self.service.group_invoices_by_supplier_and_month(date(2023, 1, 1), date(2023, 3, 31), supplier="Endesa")
+
+        # Assert
+        self.assertEqual(grouped_invoices, {
+            "Endesa": {"2023-02": {"total_base": Decimal("200.00"), "total_value": Decimal("70.50"), "count": 2}},
+        })
+        self.assertEqual((self.service.misses, self.service.hits), (5, 1))
+
+    def test_invalidates_deleted_invoices_through_django_cache(self):
+        # Arrange
+        result_cache_backends.result_cache_backend = DjangoResultCacheBackend()
+        self.addCleanup(setattr, result_cache_backends, "result_cache_backend", self.backend)
+        service = CachedAccountingService()
+        service.backend.clear()
+        service.group_invoices_by_supplier_and_month(date(2023, 1, 1), date(2023, 2, 28))
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            InvoiceModel.objects.get(number="F2023/01").delete()
+        grouped_invoices = service.group_invoices_by_supplier_and_month(date(2023, 1, 1), date(2023, 2, 28))
+
+        # Assert
+        self.assertEqual(list(grouped_invoices["Telefónica"]), ["2023-02"])
+        self.assertEqual((service.misses, service.hits), (3, 1))
+
+    def test_scopes_results_and_versions_by_tenant(self):
+        # Arrange
+        acme_service = CachedAccountingService(backend=self.backend, tenant="acme")
+        self.service.cashflow_projection(date(2023, 1, 1), date(2023, 3, 31))
+        acme_service.cashflow_projection(date(2023, 1, 1), date(2023, 3, 31))
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            InvoiceModelFactory.create(number="F2023/01", tenant="acme", supplier="Telefónica", date=date(2023, 1, 10), total_value=Decimal("5.00"))
+        cashflow = self.service.cashflow_projection(date(2023, 1, 1), date(2023, 3, 31))
+        acme_cashflow = acme_service.cashflow_projection(date(2023, 1, 1), date(2023, 3, 31))
+
+        # Assert
+        self.assertEqual(cashflow["total_balance"], Decimal("433.50"))
+        self.assertEqual(acme_cashflow["total_balance"], Decimal("5.00"))
+        self.assertEqual((self.service.misses, self.service.hits), (3, 3))
+        self.assertEqual((acme_service.misses, acme_service.hits), (4, 2))
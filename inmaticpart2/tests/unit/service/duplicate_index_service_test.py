@@ -0,0 +1,82 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from inmaticpart2.app.dtos.duplicate_match import FUZZY_MATCH, NUMBER_MATCH
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
+from inmaticpart2.app.service.duplicate_index_service import DuplicateIndexService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceFingerprintModel, InvoiceModel
+
+
+class DuplicateIndexServiceTest(TestCase):
+
+    def setUp(self):
+        self.invoice = InvoiceModelFactory.create(number="F2023/007", supplier="Telefónica", date=date(2023, 1, 15), total_value=Decimal("121.00"))
+        self.service = DuplicateIndexService()
+
+    def test_indexes_saved_invoices(self):
+        # Arrange
+        self.invoice.number = "F2023/008"
+
+        # Act
+        self.invoice.save()
+
+        # Assert
+        fingerprint = InvoiceFingerprintModel.objects.get(invoice=self.invoice)
+        self.assertEqual(fingerprint.number_key, self.service.number_key("Telefónica", "F2023/008"))
+        self.assertEqual(InvoiceFingerprintModel.objects.count(), 1)
+
+    def test_matches_normalized_supplier_and_number(self):
+        # Arrange
+        invoices = [
+            InvoiceRecord("F2023/7", "TELEFONICA ", date(2023, 3, 1), Decimal("10.00"), Decimal("12.10")),
+            InvoiceRecord("F2023/008", "Telefónica", date(2023, 3, 1), Decimal("10.00"), Decimal("12.10")),
+        ]
+
+        # Act
+        duplicate_matches = self.service.find_duplicates(invoices)
+
+        # Assert
+        self.assertEqual(len(duplicate_matches), 2)
+        self.assertEqual((duplicate_matches[0].row, duplicate_matches[0].kind, duplicate_matches[0].invoice_id), (0, NUMBER_MATCH, self.invoice.pk))
+        self.assertEqual((duplicate_matches[1].row, duplicate_matches[1].kind, duplicate_matches[1].duplicate_of_row), (1, FUZZY_MATCH, 0))
+
+    def test_matches_same_supplier_total_and_date(self):
+        # Arrange
+        invoices = [InvoiceRecord("F2023/900", "Telefonica", date(2023, 1, 15), Decimal("100.00"), Decimal("121.00"))]
+
+        # Act
+        duplicate_matches = self.service.find_duplicates(invoices)
+
+        # Assert
+        self.assertEqual(len(duplicate_matches), 1)
+        self.assertEqual(duplicate_matches[0].kind, FUZZY_MATCH)
+        self.assertEqual(duplicate_matches[0].message, f"Possible duplicate of invoice {self.invoice.pk}: same supplier, total value and date.")
+
+    def test_bloom_filter_skips_lookups_for_new_keys(self):
+        # Arrange
+        service = DuplicateIndexService(use_bloom_filter=True)
+        invoices = [InvoiceRecord(f"F2024/{sequence:03d}", "Endesa", date(2024, 1, 1), Decimal("1.00"), Decimal(sequence)) for sequence in range(1, 50)]
+
+        # Act
+        with self.assertNumQueries(0):
+            duplicate_matches = service.find_duplicates(invoices)
+        InvoiceModelFactory.create(number="F2024/001", supplier="Endesa")
+        later_matches = service.find_duplicates(invoices[:1])
+
+        # Assert
+        self.assertListEqual(duplicate_matches, [])
+        self.assertEqual(later_matches[0].kind, NUMBER_MATCH)
+
+    def test_backfills_unindexed_invoices_in_batches(self):
+        # Arrange
+        InvoiceModelFactory.create_batch(5)
+        InvoiceFingerprintModel.objects.all().delete()
+
+        # Act
+        indexed = self.service.index_invoices(InvoiceModel.objects.all(), batch_size=2)
+        indexed_again = self.service.index_invoices(InvoiceModel.objects.all(), batch_size=2)
+
+        # Assert
+        self.assertEqual((indexed, indexed_again), (6, 0))
+        self.assertEqual(InvoiceFingerprintModel.objects.count(), 6)
@@ -0,0 +1,157 @@
+import random
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from inmaticpart2.app.indexes.invoice_number_index import InvoiceNumberIndex
+from inmaticpart2.app.service.incremental_accounting_service import IncrementalAccountingService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import AccountingRunContributionModel, AccountingRunGroupModel, InvoiceChangeModel, InvoiceModel
+
+
+class IncrementalAccountingServiceTest(TestCase):
+
+    def setUp(self):
+        self.invoice1 = InvoiceModelFactory.create(
+            number="F2023/01", date=date(2023, 1, 15), supplier="Telefónica",
+            base_value=Decimal("80.00"), total_value=Decimal("100.00")
+        )
+        self.invoice2 = InvoiceModelFactory.create(
+            number="F2023/03", date=date(2023, 1, 20), supplier="Telefónica",
+            base_value=Decimal("160.00"), total_value=Decimal("200.00")
+        )
+
+    def test_first_run_processes_the_whole_ledger(self):
+        # Arrange
+        incremental_service = IncrementalAccountingService()
+
+        # Act
+        result = incremental_service.run()
+
+        # Assert
+        self.assertEqual(result["processed_invoices"], 2)
+        self.assertEqual(len(result["accounting_entries"]), 2)
+        self.assertDictEqual(result["grouped_invoices"], {
+            "Telefónica": {"2023-01": {"total_base": Decimal("240.00"), "total_value": Decimal("300.00"), "count": 2}},
+        })
+        self.assertDictEqual(result["missing_invoice_ranges"], {"F2023/": [(2, 2)]})
+
+    def test_rerun_folds_in_only_changed_invoices(self):
+        # Arrange
+        IncrementalAccountingService().run()
+        self.invoice2.total_value = Decimal("250.00")
+        self.invoice2.save()
+        InvoiceModelFactory.create(
+            number="F2023/01", date=date(2023, 2, 1), supplier="Vodafone",
+            base_value=Decimal("40.00"), total_value=Decimal("50.00")
+        )
+        incremental_service = IncrementalAccountingService()
+
+        # Act
+        result = incremental_service.run()
+        rerun_result = incremental_service.run()
+
+        # Assert
+        self.assertEqual(result["processed_invoices"], 2)
+        self.assertEqual(result["grouped_invoices"]["Telefónica"]["2023-01"]["total_value"], Decimal("350.00"))
+        self.assertEqual(result["grouped_invoices"]["Vodafone"]["2023-02"]["count"], 1)
+        self.assertListEqual(result["duplicate_invoice_numbers"], ["F2023/01"])
+        self.assertEqual(rerun_result["processed_invoices"], 0)
+        self.assertListEqual(rerun_result["accounting_entries"], [])
+
+    def test_deleted_invoices_are_removed_from_groups_and_gaps(self):
+        # Arrange
+        IncrementalAccountingService().run()
+        self.invoice2.delete()
+
+        # Act
+        result = IncrementalAccountingService().run()
+
+        # Assert
+        self.assertEqual(result["removed_invoices"], 1)
+        self.assertEqual(result["grouped_invoices"]["Telefónica"]["2023-01"]["count"], 1)
+        self.assertDictEqual(result["missing_invoice_ranges"], {"F2023/": []})
+        self.assertEqual(AccountingRunContributionModel.objects.count(), 1)
+
+    def test_run_consumes_the_change_log_regardless_of_commit_order(self):
+        # Arrange
+        consumed_change_id = InvoiceChangeModel.objects.order_by("pk").values_list("pk", flat=True).first()
+        IncrementalAccountingService().run()
+        InvoiceModel.objects.filter(pk=self.invoice1.pk).update(total_value=Decimal("120.00"))
+        InvoiceChangeModel.objects.create(invoice_id=self.invoice1.pk)
+        InvoiceChangeModel.objects.create(pk=consumed_change_id, invoice_id=self.invoice2.pk)
+
+        # Act
+        result = IncrementalAccountingService().run()
+
+        # Assert
+        self.assertEqual(result["processed_invoices"], 2)
+        self.assertEqual(result["grouped_invoices"]["Telefónica"]["2023-01"]["total_value"], Decimal("320.00"))
+        self.assertFalse(InvoiceChangeModel.objects.exists())
+
+    def test_runs_and_consumes_changes_per_tenant(self):
+        # Arrange
+        InvoiceModelFactory.create(
+            number="F2023/07", tenant="acme", date=date(2023, 3, 1), supplier="Endesa",
+            base_value=Decimal("8.00"), total_value=Decimal("10.00")
+        )
+        IncrementalAccountingService().run()
+
+        # Act
+        acme_result = IncrementalAccountingService(tenant="acme").run()
+
+        # Assert
+        self.assertEqual(acme_result["processed_invoices"], 1)
+        self.assertDictEqual(acme_result["grouped_invoices"], {
+            "Endesa": {"2023-03": {"total_base": Decimal("8.00"), "total_value": Decimal("10.00"), "count": 1}},
+        })
+        self.assertEqual(AccountingRunContributionModel.objects.filter(run__name="default").count(), 2)
+        self.assertFalse(InvoiceChangeModel.objects.exists())
+
+    def test_rerun_touches_only_changed_rows(self):
+        # Arrange
+        for sequence in range(4, 60):
+            InvoiceModelFactory.create(number=f"F2023/{sequence:02d}", date=date(2023, 1 + sequence % 12, 1), supplier=f"Supplier {sequence % 7}")
+        incremental_service = IncrementalAccountingService()
+        incremental_service.run()
+
+        def rerun_queries():
+            self.invoice2.total_value += 1
+            self.invoice2.save()
+            with CaptureQueriesContext(connection) as queries:
+                incremental_service.run()
+            return len(queries)
+
+        # Act
+        small_ledger_queries = rerun_queries()
+        for sequence in range(60, 260):
+            InvoiceModelFactory.create(number=f"F2023/{sequence:03d}", date=date(2023, 1 + sequence % 12, 1), supplier=f"Supplier {sequence % 7}")
+        incremental_service.run()
+        large_ledger_queries = rerun_queries()
+
+        # Assert
+        self.assertEqual(large_ledger_queries, small_ledger_queries)
+        self.assertEqual(AccountingRunContributionModel.objects.count(), 258)
+        self.assertEqual(AccountingRunGroupModel.objects.filter(supplier="Telefónica").get().total_cents, 30200)
+
+    def test_missing_ranges_follow_random_changes(self):
+        # Arrange
+        randomizer = random.Random(7)
+        incremental_service = IncrementalAccountingService()
+        present = set()
+        gaps, last = [], 0
+
+        for _ in range(200):
+            added = set(randomizer.sample(range(1, 120), 5)) - present
+            removed = set(randomizer.sample(sorted(present), min(3, len(present)))) if present else set()
+            removed -= added
+
+            # Act
+            gaps, last = incremental_service.missing_after_changes(gaps, last, list(added), list(removed))
+            present = (present | added) - removed
+
+            # Assert
+            expected = InvoiceNumberIndex.from_numbers(f"F{sequence}" for sequence in present)
+            self.assertListEqual(gaps, expected.missing_ranges("F"))
+            self.assertEqual(last, max(present, default=0))
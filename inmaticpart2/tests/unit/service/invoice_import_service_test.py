@@ -0,0 +1,171 @@
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from inmaticpart2.app.service.invoice_import_service import InvoiceImportService
+from inmaticpart2.app.service.payables_aging_service import PayablesAgingService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceFingerprintModel, InvoiceModel
+
+CSV_CONTENT = """number,supplier,concept,base_value,vat,total_value,date,due_date
+F2023/01,Telefónica,Fibre,100.00,21.00,121.00,2023-01-15,2023-02-14
+F2023/02,Vodafone,Mobile,50.00,10.50,60.50,2023-01-20,2023-02-19
+F2023/03,Vodafone,Mobile,50.00,10.50,99.00,2023-01-21,2023-02-20
+F2023/04,Orange,,abc,10.50,60.50,2023-01-22,2023-02-21
+F2023/01,Telefónica,Fibre,100.00,21.00,121.00,2023-01-25,2023-02-24
+"""
+
+JSONL_CONTENT = """{"number": "F2023/10", "supplier": "Endesa", "base_value": "10.00", "vat": "2.10", "total_value": "12.10", "date": "2023-03-01", "due_date": "2023-03-31"}
+
+{"number": "F2023/11", "supplier": "Endesa", "base_value": 20, "vat": 0, "total_value": 20, "date": "2023-03-02"}
+"""
+
+MALFORMED_JSONL_CONTENT = """{"number": "F2023/20", "supplier": "Endesa", "base_value": "10.00", "vat": "2.10", "total_value": "12.10", "date": "2023-03-01", "due_date": "2023-03-31"}
+{"number": "F2023/21", "supplier": "Endesa",
+["F2023/22", "Endesa"]
+{"number": "F2023/23", "supplier": "Endesa", "base_value": "NaN", "vat": "2.10", "total_value": "12.10", "date": "2023-03-01", "due_date": "2023-03-31"}
+{"number": "F2023/24", "supplier": "%s", "base_value": "10.00", "vat": "2.10", "total_value": "12.10", "date": "2023-03-01", "due_date": "2023-03-31"}
+{"number": "F2023/25", "supplier": "Endesa", "base_value": "100.001", "vat": "2.10", "total_value": "102.101", "date": "2023-03-01", "due_date": "2023-03-31"}
+{"number": "F2023/26", "supplier": "Endesa", "base_value": "20.00", "vat": "4.20", "total_value": "24.20", "date": "2023-03-02", "due_date": "2023-04-01"}
+""" % ("E" * 300)
+
+
+class InvoiceImportServiceTest(TestCase):
+
+    def write_file(self, suffix: str, content: str) -> str:
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_imports_valid_csv_rows_in_chunks_and_reports_rejected_rows(self):
+        # Arrange
+        path = self.write_file(".csv", CSV_CONTENT)
+
+        # Act
+        report = InvoiceImportService(chunk_size=2).import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_read, 5)
+        self.assertEqual(report.rows_imported, 2)
+        self.assertListEqual([rejected_row.row for rejected_row in report.rejected_rows], [3, 4, 5])
+        self.assertListEqual(report.rejected_rows[0].errors, ["Total value must be 60.50."])
+        self.assertListEqual(report.rejected_rows[2].errors, ["Duplicate invoice number: F2023/01"])
+        self.assertListEqual(
+            list(InvoiceModel.objects.order_by("number").values_list("number", "total_value", "state")),
+            [("F2023/01", Decimal("121.00"), "PENDING"), ("F2023/02", Decimal("60.50"), "PENDING")]
+        )
+
+    def test_imports_jsonl_rows_with_bulk_create(self):
+        # Arrange
+        path = self.write_file(".jsonl", JSONL_CONTENT)
+
+        # Act
+        report = InvoiceImportService(insert_method="bulk_create").import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_imported, 1)
+        self.assertListEqual(report.rejected_rows[0].errors, ["due_date is required."])
+        self.assertTrue(InvoiceModel.objects.filter(number="F2023/10", supplier="Endesa").exists())
+
+    def test_rejects_malformed_jsonl_rows_and_keeps_importing(self):
+        # Arrange
+        path = self.write_file(".jsonl", MALFORMED_JSONL_CONTENT)
+
+        # Act
+        report = InvoiceImportService().import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_read, 7)
+        self.assertEqual(report.rows_imported, 2)
+        self.assertListEqual([rejected_row.row for rejected_row in report.rejected_rows], [2, 3, 4, 5, 6])
+        self.assertTrue(report.rejected_rows[0].errors[0].startswith("Invalid JSON: "))
+        self.assertListEqual(report.rejected_rows[1].errors, ["Row must be a JSON object."])
+        self.assertListEqual(report.rejected_rows[2].errors, ["base_value must be a finite number."])
+        self.assertListEqual(report.rejected_rows[3].errors, ["supplier must be at most 100 characters."])
+        self.assertListEqual(report.rejected_rows[4].errors, [
+            "base_value must have at most 2 decimal places.",
+            "total_value must have at most 2 decimal places.",
+        ])
+        self.assertListEqual(list(InvoiceModel.objects.order_by("number").values_list("number", flat=True)), ["F2023/20", "F2023/26"])
+        self.assertFalse(InvoiceFingerprintModel.objects.exists())
+
+    def test_adds_imported_invoices_to_live_payables_indexes(self):
+        # Arrange
+        path = self.write_file(".csv", CSV_CONTENT)
+        payables_service = PayablesAgingService()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            InvoiceImportService().import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(
+            payables_service.open_payables(date(2023, 2, 1), date(2023, 2, 28)),
+            {"total_value": Decimal("181.50"), "count": 2}
+        )
+
+    def test_rejects_invoices_already_in_the_duplicate_index(self):
+        # Arrange
+        path = self.write_file(".csv", CSV_CONTENT)
+        existing = InvoiceModelFactory.create(number="F2023/1", supplier="TELEFONICA")
+        InvoiceModelFactory.create(number="F2022/99", supplier="Vodafone", date=date(2023, 1, 20), total_value=Decimal("60.50"))
+
+        # Act
+        report = InvoiceImportService(check_duplicates=True).import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_imported, 1)
+        self.assertEqual(report.rejected_rows[0].row, 1)
+        self.assertListEqual(report.rejected_rows[0].errors, [f"Duplicate of invoice {existing.pk}: same supplier and invoice number."])
+        self.assertListEqual([flagged_row.row for flagged_row in report.possible_duplicates], [2])
+        self.assertEqual(InvoiceFingerprintModel.objects.count(), 3)
+
+    def test_keeps_a_bounded_sample_and_streams_every_rejection(self):
+        # Arrange
+        path = self.write_file(".csv", CSV_CONTENT)
+        streamed_rows = []
+
+        # Act
+        report = InvoiceImportService(chunk_size=2, on_reject=streamed_rows.append, max_rejected_samples=1).import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_rejected, 3)
+        self.assertEqual(len(report.rejected_rows), 1)
+        self.assertListEqual(sorted(rejected_row.row for rejected_row in streamed_rows), [3, 4, 5])
+
+    def test_rejects_numbers_already_in_the_tenant_ledger(self):
+        # Arrange
+        path = self.write_file(".csv", CSV_CONTENT)
+        existing = InvoiceModelFactory.create(number="F2023/02", supplier="Vodafone")
+        InvoiceModelFactory.create(number="F2023/01", supplier="Telefónica", tenant="acme")
+        payables_service = PayablesAgingService()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            report = InvoiceImportService(check_duplicates=True).import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_imported, 1)
+        self.assertIn((2, ["Duplicate invoice number: F2023/02"]), [(rejected_row.row, rejected_row.errors) for rejected_row in report.rejected_rows])
+        self.assertNotIn(existing.pk, payables_service.index.open_invoices)
+        self.assertEqual(InvoiceFingerprintModel.objects.filter(invoice__number="F2023/01", invoice__tenant="default").count(), 1)
+
+    @override_settings(INVOICE_UNIQUE_NUMBER_PER_SERIES=True)
+    def test_retries_a_chunk_row_by_row_after_a_constraint_violation(self):
+        # Arrange
+        path = self.write_file(".csv", CSV_CONTENT)
+        InvoiceModelFactory.create(number="F2023/02", supplier="Vodafone")
+
+        # Act
+        with patch.object(InvoiceImportService, "reject_existing_numbers", lambda service, invoices, row_numbers, valid_rows, report: valid_rows):
+            report = InvoiceImportService().import_file(path, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertEqual(report.rows_imported, 1)
+        self.assertEqual(report.rejected_rows[0].row, 2)
+        self.assertTrue(report.rejected_rows[0].errors[0].startswith("Invoice F2023/02 violates a database constraint: "))
+        self.assertEqual(InvoiceModel.objects.filter(number="F2023/01").count(), 1)
@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.service.invoice_validation_service import InvoiceValidationService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+
+
+class InvoiceValidationServiceTest(TestCase):
+
+    def setUp(self):
+        self.valid_invoice = InvoiceModelFactory.build_invoice(
+            number="F2023/01", date=date(2023, 1, 15), supplier="Telefónica",
+            base_value=Decimal("100.00"), vat=Decimal("21.00"), total_value=Decimal("121.00")
+        )
+        self.invalid_invoice = InvoiceModelFactory.build_invoice(
+            number="2023-02", date=date(2023, 1, 20), due_date=date(2023, 1, 10), supplier="",
+            base_value=Decimal("100.00"), vat=Decimal("-1.00"), total_value=Decimal("-5.00")
+        )
+        self.duplicate_invoice = InvoiceModelFactory.build_invoice(
+            number="F2023/01", date=date(2023, 1, 16), supplier="Vodafone",
+            base_value=Decimal("100.00"), vat=Decimal("21.00"), total_value=Decimal("121.00")
+        )
+
+    def test_collects_every_issue_in_one_pass(self):
+        # Arrange
+        invoices = [self.valid_invoice, self.invalid_invoice, self.duplicate_invoice]
+
+        # Act
+        report = InvoiceValidationService().validate(invoices, today=date(2023, 12, 31))
+
+        # Assert
+        self.assertFalse(report.is_valid)
+        self.assertEqual(report.rows, 3)
+        self.assertListEqual(
+            [(issue.row, issue.field, issue.code) for issue in report.issues],
+            [
+                (1, "number", "format"),
+                (1, "total_value", "negative"),
+                (1, "supplier", "required"),
+                (1, "vat", "negative"),
+                (1, "total_value", "total_mismatch"),
+                (1, "due_date", "due_before_date"),
+                (2, "number", "duplicate"),
+            ]
+        )
+
+    def test_reports_future_dates(self):
+        # Act
+        report = InvoiceValidationService().validate([self.valid_invoice], today=date(2023, 1, 1))
+
+        # Assert
+        self.assertListEqual([issue.code for issue in report.issues], ["future_date"])
+
+    def test_create_accounting_entries_skips_rejected_rows_when_collecting_errors(self):
+        # Arrange
+        invoices = [self.valid_invoice, self.invalid_invoice, self.duplicate_invoice]
+
+        # Act
+        result = AccountingInvoiceService().create_accounting_entries(invoices, collect_errors=True)
+
+        # Assert
+        self.assertListEqual(
+            [entry.invoice_number for entry in result["accounting_entries"]],
+            ["F2023/01", "F2023/01"]
+        )
+        self.assertListEqual(result["duplicate_invoice_numbers"], ["F2023/01"])
+        self.assertSetEqual(result["validation_report"].rejected_rows(ignored_codes={"duplicate"}), {1})
@@ -0,0 +1,121 @@
+from datetime import date
+from decimal import Decimal
+import numpy as np
+from django.test import TestCase
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
+from inmaticpart2.app.enums.accounting_codes import AccountingCodes
+from inmaticpart2.app.enums.payment_type import PaymentType
+from inmaticpart2.app.service.accounting_entry_persistence_service import AccountingEntryPersistenceService
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.service.journal_engine import JournalEngine
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import AccountingEntryModel, InvoiceModel
+
+
+class JournalEngineTest(TestCase):
+
+    def setUp(self):
+        self.invoices = [
+            InvoiceRecord("F2023/01", "Telefónica", date(2023, 1, 15), Decimal("100.00"), Decimal("121.00"), vat=Decimal("21.00")),
+            InvoiceRecord("F2023/02", "Telefónica", date(2023, 1, 20), Decimal("50.00"), Decimal("50.00"), vat=Decimal("0.00")),
+            InvoiceRecord("F2023/03", "Endesa", date(2023, 2, 10), Decimal("200.00"), Decimal("242.00"), vat=Decimal("42.00")),
+        ]
+
+    def test_builds_balanced_lines_per_invoice(self):
+        # Act
+        journal_batch = JournalEngine().build(self.invoices)
+
+        # Assert
+        self.assertEqual(journal_batch.entry_count, 3)
+        self.assertListEqual(journal_batch.to_accounting_entries()[:3], [
+            entry for entry in journal_batch.to_accounting_entries() if entry.invoice_number == "F2023/01"
+        ])
+        self.assertListEqual(
+            [(line[0], line[1], line[2], line[3]) for line in journal_batch.iterate_lines()],
+            [
+                ("F2023/01", AccountingCodes.PURCHASES, PaymentType.DEBIT, Decimal("100.00")),
+                ("F2023/01", AccountingCodes.VAT_SUPPORTED, PaymentType.DEBIT, Decimal("21.00")),
+                ("F2023/01", AccountingCodes.SUPPLIERS, PaymentType.CREDIT, Decimal("121.00")),
+                ("F2023/02", AccountingCodes.PURCHASES, PaymentType.DEBIT, Decimal("50.00")),
+                ("F2023/02", AccountingCodes.SUPPLIERS, PaymentType.CREDIT, Decimal("50.00")),
+                ("F2023/03", AccountingCodes.PURCHASES, PaymentType.DEBIT, Decimal("200.00")),
+                ("F2023/03", AccountingCodes.VAT_SUPPORTED, PaymentType.DEBIT, Decimal("42.00")),
+                ("F2023/03", AccountingCodes.SUPPLIERS, PaymentType.CREDIT, Decimal("242.00")),
+            ]
+        )
+        self.assertDictEqual(journal_batch.totals_by_account(), {
+            "6000": {"debit": Decimal("350.00"), "credit": Decimal("0.00")},
+            "4720": {"debit": Decimal("63.00"), "credit": Decimal("0.00")},
+            "4000": {"debit": Decimal("0.00"), "credit": Decimal("413.00")},
+        })
+
+    def test_aggregates_lines_per_supplier_and_month(self):
+        # Act
+        journal_batch = JournalEngine().build(self.invoices, aggregate=True)
+
+        # Assert
+        lines = list(journal_batch.iterate_lines())
+        self.assertEqual(journal_batch.entry_count, 2)
+        self.assertEqual(lines[0], (
+            "2023-01/Telefónica", AccountingCodes.PURCHASES, PaymentType.DEBIT, Decimal("150.00"), "Invoices for 2023-01 from Telefónica"
+        ))
+        self.assertEqual([line[3] for line in lines[:3]], [Decimal("150.00"), Decimal("21.00"), Decimal("171.00")])
+
+    def test_reports_unbalanced_entries(self):
+        # Arrange
+        journal_batch = JournalEngine().build(self.invoices, verify=False)
+        journal_batch.amount_cents[np.flatnonzero(journal_batch.entry_ids == 2)[-1]] += 1
+
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Journal has 1 unbalanced entries: F2023/03"):
+            journal_batch.verify_balanced()
+
+    def test_rejects_invoices_whose_vat_does_not_balance(self):
+        # Arrange
+        invoices = self.invoices + [
+            InvoiceRecord("F2023/04", "Endesa", date(2023, 2, 12), Decimal("100.00"), Decimal("121.00"), vat=Decimal("12.10")),
+        ]
+
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Journal has 1 unbalanced entries: F2023/04"):
+            JournalEngine().build(invoices)
+
+    def test_aggregated_references_stay_distinct_for_long_supplier_names(self):
+        # Arrange
+        prefix = "Compañía Española de Distribución y Suministros Eléctricos"
+        invoices = [
+            InvoiceRecord("F2023/01", f"{prefix} Norte", date(2023, 1, 15), Decimal("100.00"), Decimal("121.00"), vat=Decimal("21.00")),
+            InvoiceRecord("F2023/02", f"{prefix} Sur", date(2023, 1, 20), Decimal("50.00"), Decimal("60.50"), vat=Decimal("10.50")),
+        ]
+
+        # Act
+        journal_batch = JournalEngine().build(invoices, aggregate=True)
+
+        # Assert
+        self.assertEqual(len(set(journal_batch.references)), 2)
+        self.assertTrue(all(len(reference) <= 50 for reference in journal_batch.references))
+        self.assertEqual(journal_batch.suppliers, [f"{prefix} Norte", f"{prefix} Sur"])
+
+    def test_validates_queryset_amounts_before_building_the_journal(self):
+        # Arrange
+        InvoiceModelFactory.create(number="F2023/01", total_value=Decimal("-121.00"))
+
+        # Act & Assert
+        with self.assertRaisesMessage(ValueError, "Invoice F2023/01 with amount -121.00 is not valid."):
+            AccountingInvoiceService().create_journal(InvoiceModel.objects.all())
+
+    def test_creates_and_persists_filtered_journal(self):
+        # Arrange
+        service = AccountingInvoiceService()
+
+        # Act
+        journal_batch = service.create_journal(self.invoices, supplier_id="Telefónica")
+        persisted = AccountingEntryPersistenceService().persist_journal(journal_batch)
+
+        # Assert
+        self.assertEqual(persisted["persisted_entries"], 5)
+        self.assertEqual(AccountingEntryModel.objects.filter(account_code=AccountingCodes.SUPPLIERS).count(), 2)
+        self.assertEqual(
+            AccountingEntryModel.objects.get(invoice_number="F2023/01", account_code=AccountingCodes.VAT_SUPPORTED).description,
+            "Invoice F2023/01 for 2023-01 from Telefónica"
+        )
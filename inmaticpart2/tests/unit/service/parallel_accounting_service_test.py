@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.test import TransactionTestCase
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.service.parallel_accounting_service import ParallelAccountingInvoiceService
+from inmaticpart2.app.service.parallel_accounting_workers import shard_months
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class ParallelAccountingInvoiceServiceTest(TransactionTestCase):
+
+    def setUp(self):
+        suppliers = ["Telefónica", "Vodafone", "Orange", "Iberdrola", "Endesa"]
+        InvoiceModel.objects.bulk_create([
+            InvoiceModelFactory.build_invoice(
+                number=f"F2023/{index + 1:02d}",
+                date=date(2023, 1, 1) + timedelta(days=index * 3),
+                supplier=suppliers[index % len(suppliers)],
+                base_value=Decimal(index + 1),
+                total_value=Decimal(index + 1) * Decimal("1.21")
+            )
+            for index in range(30)
+        ])
+
+    def tearDown(self):
+        ParallelAccountingInvoiceService.shutdown_executors()
+
+    def test_parallel_path_matches_serial_output(self):
+        # Arrange
+        serial_service = AccountingInvoiceService()
+        parallel_service = ParallelAccountingInvoiceService(max_workers=2, min_parallel_invoices=0, start_method="fork")
+
+        # Act
+        expected_result = serial_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+        actual_result = parallel_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+        # Assert
+        self.assertListEqual(actual_result["accounting_entries"], expected_result["accounting_entries"])
+        self.assertDictEqual(ParallelAccountingInvoiceService.executors, {})
+        self.assertListEqual(actual_result["missing_invoice_numbers"], expected_result["missing_invoice_numbers"])
+        self.assertListEqual(list(actual_result["grouped_invoices"]), list(expected_result["grouped_invoices"]))
+        for supplier, months in expected_result["grouped_invoices"].items():
+            self.assertListEqual(list(actual_result["grouped_invoices"][supplier]), list(months))
+            for month, details in months.items():
+                self.assertDictEqual(actual_result["grouped_invoices"][supplier][month], details)
+
+    def test_workers_apply_the_queryset_filters(self):
+        # Arrange
+        parallel_service = ParallelAccountingInvoiceService(max_workers=2, min_parallel_invoices=0, start_method="fork")
+
+        # Act
+        result = parallel_service.create_accounting_entries(
+            InvoiceModel.objects.filter(supplier="Vodafone"),
+            start_date=date(2023, 1, 1),
+            end_date=date(2023, 2, 28),
+            as_records=True
+        )
+
+        # Assert
+        self.assertListEqual(list(result["grouped_invoices"]), ["Vodafone"])
+        self.assertListEqual([entry.invoice_number for entry in result["accounting_entries"]], ["F2023/02", "F2023/07", "F2023/12", "F2023/17"])
+
+    def test_worker_validation_errors_reach_the_caller(self):
+        # Arrange
+        InvoiceModel.objects.filter(number="F2023/25").update(total_value=Decimal("-1.00"))
+        parallel_service = ParallelAccountingInvoiceService(max_workers=2, min_parallel_invoices=0, start_method="fork")
+
+        # Act / Assert
+        with self.assertRaisesMessage(ValueError, "Invoice F2023/25 with amount -1.00 is not valid."):
+            parallel_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+    def test_small_batches_fall_back_to_serial_path(self):
+        # Arrange
+        parallel_service = ParallelAccountingInvoiceService(max_workers=2)
+
+        # Act
+        result = parallel_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+        # Assert
+        self.assertEqual(len(result["grouped_invoices"]["Vodafone"]["2023-01"]["invoices"]), 2)
+        self.assertDictEqual(ParallelAccountingInvoiceService.executors, {})
+
+    def test_serial_and_parallel_paths_share_the_date_and_pk_order(self):
+        # Arrange
+        InvoiceModel.objects.bulk_create([
+            InvoiceModelFactory.build_invoice(number=f"F2023/{index:02d}", date=date(2023, 1, 1), supplier="Vodafone")
+            for index in range(40, 31, -1)
+        ])
+        serial_service = AccountingInvoiceService()
+        parallel_service = ParallelAccountingInvoiceService(max_workers=2, min_parallel_invoices=0, start_method="fork")
+
+        # Act
+        expected_result = serial_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+        actual_result = parallel_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+        # Assert
+        expected_pks = [invoice.pk for invoice in expected_result["grouped_invoices"]["Vodafone"]["2023-01"]["invoices"]]
+        actual_pks = [invoice.pk for invoice in actual_result["grouped_invoices"]["Vodafone"]["2023-01"]["invoices"]]
+        self.assertListEqual(actual_pks, expected_pks)
+        self.assertListEqual(expected_pks[:9], sorted(expected_pks[:9]))
+
+    def test_in_memory_databases_only_run_in_parallel_through_fork(self):
+        # Arrange
+        parallel_service = ParallelAccountingInvoiceService(max_workers=2, min_parallel_invoices=0, start_method="forkserver")
+
+        # Act
+        result = parallel_service.create_accounting_entries(InvoiceModel.objects.all(), as_records=True)
+
+        # Assert
+        self.assertEqual(len(result["accounting_entries"]), 30)
+        self.assertDictEqual(ParallelAccountingInvoiceService.executors, {})
+
+    def test_shard_months_splits_contiguous_month_ranges_by_count(self):
+        # Arrange
+        month_counts = [(date(2023, 1, 1), 10), (date(2023, 2, 1), 10), (date(2023, 3, 1), 5), (date(2023, 12, 1), 5)]
+
+        # Act
+        month_ranges = shard_months(month_counts, 3)
+
+        # Assert
+        self.assertListEqual(month_ranges, [
+            (date(2023, 1, 1), date(2023, 2, 1)),
+            (date(2023, 2, 1), date(2023, 3, 1)),
+            (date(2023, 3, 1), date(2024, 1, 1)),
+        ])
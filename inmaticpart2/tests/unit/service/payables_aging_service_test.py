@@ -0,0 +1,148 @@
+from datetime import date
+from decimal import Decimal
+from threading import Thread
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from inmaticpart2.app.cache.invoice_data_versions import InvoiceDataVersions
+from inmaticpart2.app.enums.invoice_states import InvoiceStates
+from inmaticpart2.app.service.payables_aging_service import PayablesAgingService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceChangeModel, InvoiceModel
+
+
+class PayablesAgingServiceTest(TestCase):
+
+    def setUp(self):
+        self.create_invoice("F2023/01", date(2023, 1, 2), "100.00")
+        self.create_invoice("F2023/02", date(2023, 2, 10), "200.00")
+        self.create_invoice("F2023/03", date(2023, 3, 20), "300.00")
+        self.create_invoice("F2023/04", date(2023, 4, 12), "400.00")
+        self.create_invoice("F2023/05", date(2023, 4, 14), "500.00", InvoiceStates.PAID)
+        self.create_invoice("F2023/06", date(2023, 4, 20), "600.00", InvoiceStates.CANCELED)
+        self.service = PayablesAgingService.from_invoices()
+
+    def create_invoice(self, number, due_date, total_value, state=InvoiceStates.PENDING, supplier="Telefónica"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return InvoiceModelFactory.create(
+                number=number,
+                supplier=supplier,
+                date=date(2023, 1, 1),
+                due_date=due_date,
+                total_value=Decimal(total_value),
+                state=state
+            )
+
+    def test_sums_only_open_payables(self):
+        # Act
+        with self.assertNumQueries(0):
+            open_payables = self.service.open_payables()
+
+        # Assert
+        self.assertEqual(open_payables, {"total_value": Decimal("1000.00"), "count": 4})
+
+    def test_groups_open_payables_by_due_week(self):
+        # Act
+        weekly_payables = self.service.open_payables_by_week(date(2023, 4, 1), date(2023, 4, 23))
+
+        # Assert
+        self.assertListEqual(list(weekly_payables), ["2023-03-27", "2023-04-03", "2023-04-10", "2023-04-17"])
+        self.assertEqual(weekly_payables["2023-04-10"], {"total_value": Decimal("400.00"), "count": 1})
+        self.assertEqual(weekly_payables["2023-04-17"]["count"], 0)
+
+    def test_ages_open_payables_into_buckets(self):
+        # Act
+        aging = self.service.aging_buckets(date(2023, 4, 10))
+
+        # Assert
+        self.assertDictEqual(aging, {
+            "current": {"total_value": Decimal("400.00"), "count": 1},
+            "1-30": {"total_value": Decimal("300.00"), "count": 1},
+            "31-60": {"total_value": Decimal("200.00"), "count": 1},
+            "61-90": {"total_value": Decimal("0.00"), "count": 0},
+            "90+": {"total_value": Decimal("100.00"), "count": 1},
+        })
+
+    def test_projects_cumulative_payables_forward(self):
+        # Act
+        projection = self.service.forward_projection(date(2023, 3, 1), horizon_days=45, step_days=30)
+
+        # Assert
+        self.assertEqual(projection["overdue"], {"total_value": Decimal("300.00"), "count": 2})
+        self.assertEqual([period["end_date"] for period in projection["periods"]], [date(2023, 3, 30), date(2023, 4, 14)])
+        self.assertEqual([period["cumulative_value"] for period in projection["periods"]], [Decimal("600.00"), Decimal("1000.00")])
+
+    def test_updates_the_index_when_invoices_are_paid(self):
+        # Arrange
+        paid_ids = list(InvoiceModel.objects.filter(number__in=["F2023/01", "F2023/02", "F2023/05"]).values_list("pk", flat=True))
+        version_before = InvoiceDataVersions().versions(["2023-01"], "Telefónica")
+        InvoiceChangeModel.objects.all().delete()
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            paid_invoices = self.service.mark_paid(paid_ids)
+
+        # Assert
+        self.assertEqual(paid_invoices, 2)
+        self.assertEqual(len([query for query in queries if query["sql"].startswith("UPDATE")]), 1)
+        self.assertEqual(InvoiceChangeModel.objects.count(), 2)
+        self.assertEqual(self.service.open_payables(), {"total_value": Decimal("700.00"), "count": 2})
+        self.assertNotEqual(InvoiceDataVersions().versions(["2023-01"], "Telefónica"), version_before)
+
+    def test_follows_saved_and_deleted_invoices(self):
+        # Arrange
+        invoice = InvoiceModel.objects.get(number="F2023/03")
+        invoice.state = InvoiceStates.PAID
+
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.save()
+            InvoiceModel.objects.get(number="F2023/04").delete()
+        self.create_invoice("F2023/07", date(2023, 5, 2), "50.00")
+
+        # Assert
+        self.assertEqual(self.service.open_payables(date(2023, 3, 1), date(2023, 12, 31)), {"total_value": Decimal("50.00"), "count": 1})
+
+    def test_ignores_saved_invoices_outside_the_service_filter(self):
+        # Arrange
+        supplier_service = PayablesAgingService.from_invoices(supplier="Telefónica")
+        snapshot_service = PayablesAgingService.from_invoices(list(InvoiceModel.objects.all()))
+
+        # Act
+        vodafone_invoice = self.create_invoice("F2023/07", date(2023, 5, 2), "50.00", supplier="Vodafone")
+        moved_invoice = InvoiceModel.objects.get(number="F2023/04")
+        moved_invoice.supplier = "Vodafone"
+        with self.captureOnCommitCallbacks(execute=True):
+            moved_invoice.save()
+
+        # Assert
+        self.assertEqual(supplier_service.open_payables(), {"total_value": Decimal("600.00"), "count": 3})
+        self.assertEqual(snapshot_service.open_payables(), {"total_value": Decimal("1000.00"), "count": 4})
+        self.assertEqual(self.service.open_payables(), {"total_value": Decimal("1050.00"), "count": 5})
+        self.assertNotIn(vodafone_invoice.pk, snapshot_service.index.open_invoices)
+        with self.assertRaises(ValueError):
+            PayablesAgingService.from_invoices(InvoiceModel.objects.all(), track_changes=True)
+
+    def test_keeps_the_index_consistent_under_concurrent_updates(self):
+        # Arrange
+        invoices = [InvoiceModelFactory.build(pk=1000 + offset, due_date=date(2023, 6, 1 + offset % 28), total_value=Decimal("1.00")) for offset in range(200)]
+
+        def apply_invoices():
+            for _ in range(20):
+                for invoice in invoices:
+                    self.service.apply(invoice)
+                    self.service.open_payables()
+                for invoice in invoices:
+                    self.service.discard(invoice.pk)
+
+        threads = [Thread(target=apply_invoices) for _ in range(4)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(self.service.open_payables(), {"total_value": Decimal("1000.00"), "count": 4})
+        self.assertEqual(self.service.index.due_until(date.max), (100000, 4))
@@ -0,0 +1,121 @@
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+import numpy as np
+from django.test import TestCase
+from inmaticpart2.app.dtos.invoice_record import InvoiceRecord
+from inmaticpart2.app.service.accounting_invoice_service import AccountingInvoiceService
+from inmaticpart2.app.snapshots.invoice_snapshot import InvoiceSnapshot
+from inmaticpart2.database.factories.synthetic_ledger_factory import SyntheticLedgerFactory
+from inmaticpart2.models import InvoiceModel
+
+
+class InvoiceSnapshotTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.invoices = SyntheticLedgerFactory(invoices=1500, suppliers=20, days=365, gap_rate=0.05, duplicate_rate=0.01).build_records()
+        self.service = AccountingInvoiceService()
+
+    def test_loads_columns_as_memory_maps(self):
+        # Arrange
+        InvoiceSnapshot.export(self.invoices, self.directory.name)
+
+        # Act
+        snapshot = InvoiceSnapshot.load(self.directory.name)
+        february = snapshot.between(date(2023, 2, 1), date(2023, 2, 28))
+
+        # Assert
+        self.assertEqual(len(snapshot), 1500)
+        self.assertIsInstance(snapshot.total_cents, np.memmap)
+        self.assertTrue(np.shares_memory(february.total_cents, snapshot.total_cents))
+        self.assertEqual(len(february), sum(1 for invoice in self.invoices if invoice.date.month == 2))
+
+    def test_reexport_leaves_loaded_snapshots_intact(self):
+        # Arrange
+        InvoiceSnapshot.export(self.invoices, self.directory.name)
+        snapshot = InvoiceSnapshot.load(self.directory.name)
+        expected_total = int(snapshot.total_cents.sum())
+
+        # Act
+        InvoiceSnapshot.export(self.invoices[:100], self.directory.name)
+        reloaded = InvoiceSnapshot.load(self.directory.name)
+
+        # Assert
+        self.assertEqual(int(snapshot.total_cents.sum()), expected_total)
+        self.assertEqual(len(reloaded), 100)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted(["manifest.json", os.path.basename(os.path.dirname(reloaded.total_cents.filename))]))
+
+    def test_runs_service_over_snapshot_with_identical_results(self):
+        # Arrange
+        InvoiceSnapshot.export(self.invoices, self.directory.name)
+        snapshot = InvoiceSnapshot.load(self.directory.name)
+        start_date, end_date = date(2023, 3, 10), date(2023, 9, 20)
+
+        # Act & Assert
+        snapshot_groups = self.service.group_invoices_by_supplier_and_month(snapshot, aggregate_only=True)
+        list_groups = self.service.group_invoices_by_supplier_and_month(self.invoices, aggregate_only=True)
+        self.assertEqual(snapshot_groups, list_groups)
+        self.assertEqual(list(snapshot_groups), list(list_groups))
+        self.assertEqual(
+            [list(months) for months in snapshot_groups.values()],
+            [list(months) for months in list_groups.values()]
+        )
+        self.assertEqual(
+            self.service.cashflow_projection(start_date, end_date, snapshot),
+            self.service.cashflow_projection(start_date, end_date, self.invoices)
+        )
+        self.assertEqual(
+            self.service.find_missing_invoice_ranges(snapshot),
+            self.service.find_missing_invoice_ranges(self.invoices)
+        )
+        self.assertEqual(
+            self.service.find_missing_invoice_numbers(snapshot, "F2023/", 1, 200, 6),
+            self.service.find_missing_invoice_numbers(self.invoices, "F2023/", 1, 200, 6)
+        )
+        self.assertEqual(
+            snapshot.duplicate_invoice_numbers(),
+            self.service.invoice_builder.detect_duplicate_invoice_numbers(self.invoices)
+        )
+
+    def test_exports_period_from_queryset(self):
+        # Arrange
+        SyntheticLedgerFactory(invoices=300, suppliers=5, days=120).create_invoices()
+
+        # Act
+        snapshot = InvoiceSnapshot.export(InvoiceModel.objects.all(), self.directory.name, date(2023, 2, 1), date(2023, 2, 28))
+
+        # Assert
+        loaded = InvoiceSnapshot.load(self.directory.name)
+        self.assertEqual(len(loaded), InvoiceModel.objects.filter(date__month=2).count())
+        self.assertEqual((loaded.start_date, loaded.end_date), (date(2023, 2, 1), date(2023, 2, 28)))
+        self.assertEqual(loaded.suppliers.names, snapshot.suppliers.names)
+        with self.assertNumQueries(0):
+            self.service.group_invoices_by_supplier_and_month(loaded, aggregate_only=True)
+
+    def test_matches_list_path_for_number_spellings_and_supplier_variants(self):
+        # Arrange
+        invoices = [
+            InvoiceRecord("F2023/01", "zeta sl", date(2023, 1, 3), Decimal("10.00"), Decimal("12.10"), vat=Decimal("2.10")),
+            InvoiceRecord("F2023/1", "Acme SL", date(2023, 1, 5), Decimal("20.00"), Decimal("24.20"), vat=Decimal("4.20")),
+            InvoiceRecord("MANUAL", "ZETA SL", date(2023, 2, 1), Decimal("30.00"), Decimal("36.30"), vat=Decimal("6.30")),
+            InvoiceRecord("F2023/01", "Acme SL", date(2023, 2, 7), Decimal("40.00"), Decimal("48.40"), vat=Decimal("8.40")),
+            InvoiceRecord("MANUAL", "Zeta SL", date(2023, 3, 2), Decimal("50.00"), Decimal("60.50"), vat=Decimal("10.50")),
+        ]
+        service = AccountingInvoiceService(normalize_suppliers=True)
+        snapshot = InvoiceSnapshot.export(invoices, self.directory.name)
+
+        # Act
+        snapshot_groups = service.group_invoices_by_supplier_and_month(InvoiceSnapshot.load(self.directory.name), aggregate_only=True)
+        list_groups = service.group_invoices_by_supplier_and_month(invoices, aggregate_only=True)
+
+        # Assert
+        self.assertEqual(snapshot.duplicate_invoice_numbers(), ["F2023/01", "MANUAL"])
+        self.assertEqual(snapshot.duplicate_invoice_numbers(), service.invoice_builder.detect_duplicate_invoice_numbers(invoices))
+        self.assertEqual(snapshot_groups, list_groups)
+        self.assertEqual(list(snapshot_groups), ["zeta sl", "Acme SL"])
+        self.assertEqual(list(snapshot_groups["zeta sl"]), ["2023-01", "2023-02", "2023-03"])
+        with self.assertRaises(ValueError):
+            service.group_invoices_by_supplier_and_month(snapshot)
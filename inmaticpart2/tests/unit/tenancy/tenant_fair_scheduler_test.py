@@ -0,0 +1,57 @@
+import threading
+from django.test import TestCase
+from inmaticpart2.app.tenancy.tenant_context import get_current_tenant
+from inmaticpart2.app.tenancy.tenant_fair_scheduler import TenantFairScheduler
+from inmaticpart2.tests.unit.service.accounting_job_service_test import DeferredExecutor
+
+
+class TenantFairSchedulerTest(TestCase):
+
+    def test_alternates_tenants_instead_of_draining_the_largest_queue(self):
+        # Arrange
+        executor = DeferredExecutor()
+        scheduler = TenantFairScheduler(max_workers=1, executor=executor)
+        started = []
+        for month in range(1, 5):
+            scheduler.submit("acme", started.append, f"acme-{month}")
+        scheduler.submit("globex", started.append, "globex-1")
+        scheduler.submit("initech", started.append, "initech-1")
+
+        # Act
+        executor.run_all()
+
+        # Assert
+        self.assertListEqual(started, ["acme-1", "globex-1", "initech-1", "acme-2", "acme-3", "acme-4"])
+        self.assertEqual(scheduler.pending(), 0)
+
+    def test_limits_concurrent_tasks_per_tenant(self):
+        # Arrange
+        executor = DeferredExecutor()
+        scheduler = TenantFairScheduler(max_workers=3, max_per_tenant=1, executor=executor)
+
+        # Act
+        for month in range(1, 4):
+            scheduler.submit("acme", str, month)
+        scheduler.submit("globex", str, 1)
+
+        # Assert
+        self.assertEqual(len(executor.calls), 2)
+        self.assertEqual(scheduler.pending("acme"), 2)
+
+    def test_runs_tasks_inside_the_tenant_context(self):
+        # Arrange
+        scheduler = TenantFairScheduler(max_workers=2)
+        release = threading.Event()
+
+        # Act
+        blocked = scheduler.submit("acme", release.wait, 5)
+        tenant = scheduler.submit("globex", get_current_tenant)
+        failing = scheduler.submit("globex", int, "not a number")
+        release.set()
+        scheduler.shutdown()
+
+        # Assert
+        self.assertTrue(blocked.result())
+        self.assertEqual(tenant.result(), "globex")
+        self.assertIsInstance(failing.exception(), ValueError)
+        self.assertIsNone(get_current_tenant())
@@ -0,0 +1,66 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from inmaticpart2.app.service.tenant_accounting_service import TenantAccountingService
+from inmaticpart2.app.tenancy.tenant_context import use_tenant
+from inmaticpart2.app.tenancy.tenant_fair_scheduler import TenantFairScheduler
+from inmaticpart2.app.tenancy.tenant_router import TenantDatabaseRouter
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import InvoiceModel
+from inmaticpart2.tests.unit.service.accounting_job_service_test import DeferredExecutor
+
+
+class TenantDatabaseRouterTest(TestCase):
+
+    @override_settings(ACCOUNTING_TENANT_SHARDS=["default", "shard1", "shard2"], ACCOUNTING_TENANT_DATABASES={"acme": "shard2"})
+    def test_routes_tenants_to_mapped_or_hashed_shards(self):
+        # Arrange
+        router = TenantDatabaseRouter()
+
+        # Act
+        with use_tenant("acme"):
+            acme_database = router.db_for_read(InvoiceModel)
+        hashed_databases = {tenant: router.db_for_tenant(tenant) for tenant in ["globex", "initech", "umbrella"]}
+
+        # Assert
+        self.assertEqual(acme_database, "shard2")
+        self.assertIsNone(router.db_for_write(InvoiceModel))
+        self.assertEqual(hashed_databases, {tenant: router.db_for_tenant(tenant) for tenant in hashed_databases})
+        self.assertTrue(set(hashed_databases.values()) <= {"default", "shard1", "shard2"})
+
+    @override_settings(ACCOUNTING_TENANT_SHARDS=["shard_a", "shard_b"], ACCOUNTING_TENANT_DATABASES={"acme": "shard_a", "globex": "shard_b"})
+    def test_routes_writes_by_the_instance_tenant(self):
+        # Arrange
+        router = TenantDatabaseRouter()
+        acme_invoice = InvoiceModelFactory.build(tenant="acme")
+        globex_invoice = InvoiceModelFactory.build(tenant="globex")
+
+        # Act
+        write_databases = [router.db_for_write(InvoiceModel, instance=invoice) for invoice in (acme_invoice, globex_invoice)]
+        with use_tenant("acme"):
+            globex_write_database = router.db_for_write(InvoiceModel, instance=globex_invoice)
+            unhinted_write_database = router.db_for_write(InvoiceModel)
+
+        # Assert
+        self.assertEqual(write_databases, ["shard_a", "shard_b"])
+        self.assertEqual(globex_write_database, "shard_b")
+        self.assertEqual(unhinted_write_database, "shard_a")
+        self.assertEqual(router.db_for_write(InvoiceModel, instance=InvoiceModelFactory.build()), "default")
+
+    def test_runs_accounting_per_tenant(self):
+        # Arrange
+        InvoiceModelFactory.create(number="F2023/01", tenant="acme", date=date(2023, 1, 15), total_value=Decimal("121.00"))
+        InvoiceModelFactory.create(number="F2023/02", tenant="acme", date=date(2023, 1, 20), total_value=Decimal("60.50"))
+        InvoiceModelFactory.create(number="F2023/01", tenant="globex", date=date(2023, 1, 15), total_value=Decimal("10.00"))
+        executor = DeferredExecutor()
+        service = TenantAccountingService(TenantFairScheduler(max_workers=2, executor=executor))
+
+        # Act
+        futures = {tenant: service.submit(tenant, date(2023, 1, 1), date(2023, 1, 31)) for tenant in ["acme", "globex", "initech"]}
+        executor.run_all()
+
+        # Assert
+        results = {tenant: future.result() for tenant, future in futures.items()}
+        self.assertEqual(len(results["acme"]["accounting_entries"]), 2)
+        self.assertEqual(results["globex"]["grouped_invoices"]["Telefónica"]["2023-01"]["total_value"], Decimal("10.00"))
+        self.assertEqual(results["initech"]["accounting_entries"], [])
@@ -0,0 +1,141 @@
+import json
+from datetime import date
+from asgiref.sync import sync_to_async
+from decimal import Decimal
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from inmaticpart2 import views
+from inmaticpart2.app.service.accounting_job_service import AccountingJobService
+from inmaticpart2.database.factories.invoice_factory import InvoiceModelFactory
+from inmaticpart2.models import TenantMembershipModel
+from inmaticpart2.tests.unit.service.accounting_job_service_test import DeferredExecutor
+
+
+class AccountingJobViewsTest(TransactionTestCase):
+
+    def setUp(self):
+        self.executor = DeferredExecutor()
+        views.job_service = AccountingJobService(executor=self.executor)
+        self.user = User.objects.create_user("accountant")
+        self.user.user_permissions.add(Permission.objects.get(codename="run_accounting_jobs"))
+        self.client = AsyncClient()
+        self.client.force_login(self.user)
+        cache.clear()
+        InvoiceModelFactory.create(number="F2023/01", supplier="Telefónica", date=date(2023, 1, 15), total_value=Decimal("121.00"))
+
+    def tearDown(self):
+        views.job_service = None
+
+    async def test_creates_job_and_reports_result(self):
+        # Arrange
+        payload = json.dumps({"kind": "accounting", "start_date": "2023-01-01", "end_date": "2023-01-31"})
+
+        # Act
+        created = await self.client.post("/api/accounting/jobs/", payload, content_type="application/json")
+        job_id = created.json()["id"]
+        queued = await self.client.get(f"/api/accounting/jobs/{job_id}/")
+        await self.run_jobs()
+        finished = await self.client.get(f"/api/accounting/jobs/{job_id}/")
+
+        # Assert
+        self.assertEqual(created.status_code, 202)
+        self.assertEqual(created["Location"], f"/api/accounting/jobs/{job_id}/")
+        self.assertEqual(queued.json()["status"], "queued")
+        self.assertEqual(finished.json()["status"], "succeeded")
+        self.assertEqual(finished.json()["result"]["accounting_entry_count"], 1)
+
+    async def test_streams_progress_until_result(self):
+        # Arrange
+        payload = json.dumps({"kind": "cashflow", "start_date": "2023-01-01", "end_date": "2023-01-31"})
+        created = await self.client.post("/api/accounting/jobs/", payload, content_type="application/json")
+        await self.run_jobs()
+
+        # Act
+        response = await self.client.get(f"/api/accounting/jobs/{created.json()['id']}/events/")
+        events = b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+        # Assert
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn("event: result", events)
+        self.assertIn('"total_balance": "121.00"', events)
+
+    async def test_rejects_invalid_requests(self):
+        # Act
+        invalid_body = await self.client.post("/api/accounting/jobs/", "[", content_type="application/json")
+        invalid_kind = await self.client.post("/api/accounting/jobs/", json.dumps({"kind": "payroll"}), content_type="application/json")
+        missing_job = await self.client.get("/api/accounting/jobs/unknown/")
+
+        # Assert
+        self.assertEqual(invalid_body.status_code, 400)
+        self.assertEqual(invalid_kind.json(), {"error": "Invalid job kind: payroll"})
+        self.assertEqual(missing_job.status_code, 404)
+
+    async def test_requires_an_authenticated_user_with_permission(self):
+        # Arrange
+        anonymous_client = AsyncClient()
+        unprivileged_client = AsyncClient()
+        await unprivileged_client.aforce_login(await User.objects.acreate(username="viewer"))
+        payload = json.dumps({"kind": "accounting", "start_date": "2023-01-01", "end_date": "2023-01-31"})
+
+        # Act
+        anonymous = await anonymous_client.post("/api/accounting/jobs/", payload, content_type="application/json")
+        unprivileged = await unprivileged_client.post("/api/accounting/jobs/", payload, content_type="application/json")
+        anonymous_detail = await anonymous_client.get("/api/accounting/jobs/unknown/")
+
+        # Assert
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertEqual(unprivileged.status_code, 403)
+        self.assertEqual(anonymous_detail.status_code, 401)
+        self.assertListEqual(self.executor.calls, [])
+
+    async def test_enforces_csrf_on_session_submissions(self):
+        # Arrange
+        client = AsyncClient(enforce_csrf_checks=True)
+        await client.aforce_login(self.user)
+        payload = json.dumps({"kind": "accounting", "start_date": "2023-01-01", "end_date": "2023-01-31"})
+
+        # Act
+        response = await client.post("/api/accounting/jobs/", payload, content_type="application/json")
+
+        # Assert
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(ACCOUNTING_JOB_SUBMISSIONS_PER_MINUTE=2)
+    async def test_rate_limits_submissions_per_user(self):
+        # Arrange
+        payload = json.dumps({"kind": "accounting", "start_date": "2023-01-01", "end_date": "2023-01-31"})
+
+        # Act
+        responses = [await self.client.post("/api/accounting/jobs/", payload, content_type="application/json") for _ in range(3)]
+
+        # Assert
+        self.assertListEqual([response.status_code for response in responses], [202, 202, 429])
+        self.assertEqual(responses[2]["Retry-After"], "60")
+
+    async def test_runs_jobs_for_the_requester_tenant_and_hides_them_from_others(self):
+        # Arrange
+        await sync_to_async(InvoiceModelFactory.create)(number="F2023/01", tenant="acme", date=date(2023, 1, 20), total_value=Decimal("605.00"))
+        await TenantMembershipModel.objects.acreate(user=self.user, tenant="acme")
+        colleague = await User.objects.acreate(username="colleague")
+        await sync_to_async(colleague.user_permissions.add)(await Permission.objects.aget(codename="run_accounting_jobs"))
+        colleague_client = AsyncClient()
+        await colleague_client.aforce_login(colleague)
+        payload = json.dumps({"kind": "cashflow", "start_date": "2023-01-01", "end_date": "2023-01-31", "tenant": "default"})
+
+        # Act
+        created = await self.client.post("/api/accounting/jobs/", payload, content_type="application/json")
+        job_id = created.json()["id"]
+        await self.run_jobs()
+        owner_detail = await self.client.get(f"/api/accounting/jobs/{job_id}/")
+        colleague_detail = await colleague_client.get(f"/api/accounting/jobs/{job_id}/")
+        colleague_events = await colleague_client.get(f"/api/accounting/jobs/{job_id}/events/")
+
+        # Assert
+        self.assertEqual(owner_detail.json()["parameters"]["tenant"], "acme")
+        self.assertEqual(owner_detail.json()["result"]["total_balance"], "605.00")
+        self.assertEqual(colleague_detail.status_code, 404)
+        self.assertEqual(colleague_events.status_code, 404)
+
+    async def run_jobs(self):
+        await sync_to_async(self.executor.run_all)()
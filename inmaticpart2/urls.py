@@ -16,7 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
+from inmaticpart2 import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/accounting/jobs/', views.create_accounting_job, name='accounting-job-create'),
+    path('api/accounting/jobs/<str:job_id>/', views.accounting_job_detail, name='accounting-job-detail'),
+    path('api/accounting/jobs/<str:job_id>/events/', views.accounting_job_events, name='accounting-job-events'),
 ]
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET, require_POST
+from inmaticpart2.app.service.accounting_job_service import AccountingJobService
+from inmaticpart2.app.tenancy.tenant_context import DEFAULT_TENANT
+from inmaticpart2.models import TenantMembershipModel
+
+EVENT_POLL_SECONDS = 0.5
+ACCOUNTING_JOB_PERMISSION = "inmaticpart2.run_accounting_jobs"
+SUBMISSION_WINDOW_SECONDS = 60
+
+job_service = None
+
+
+def get_job_service() -> AccountingJobService:
+    global job_service
+    if job_service is None:
+        job_service = AccountingJobService.from_settings()
+    return job_service
+
+
+def accounting_job_permission_required(view):
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({"error": "Authentication required."}, status=401)
+        if not await sync_to_async(user.has_perm)(ACCOUNTING_JOB_PERMISSION):
+            return JsonResponse({"error": "Permission denied."}, status=403)
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def submission_allowed(request: HttpRequest) -> bool:
+    limit = getattr(settings, "ACCOUNTING_JOB_SUBMISSIONS_PER_MINUTE", 0)
+    if not limit:
+        return True
+
+    user = await request.auser()
+    key = f"accounting-job-submissions:{user.pk}:{int(time.time() // SUBMISSION_WINDOW_SECONDS)}"
+    await cache.aadd(key, 0, timeout=2 * SUBMISSION_WINDOW_SECONDS)
+    return await cache.aincr(key) <= limit
+
+
+async def requester_tenant(request: HttpRequest) -> str:
+    user = await request.auser()
+    tenant = await TenantMembershipModel.objects.filter(user_id=user.pk).values_list("tenant", flat=True).afirst()
+    return tenant or DEFAULT_TENANT
+
+
+async def requested_job(request: HttpRequest, job_id: str):
+    user = await request.auser()
+    return get_job_service().get_for_requester(job_id, user.pk, await requester_tenant(request))
+
+
+@require_POST
+@accounting_job_permission_required
+async def create_accounting_job(request: HttpRequest) -> JsonResponse:
+    if not await submission_allowed(request):
+        response = JsonResponse({"error": "Too many accounting jobs submitted, try again later."}, status=429)
+        response["Retry-After"] = str(SUBMISSION_WINDOW_SECONDS)
+        return response
+
+    try:
+        payload = json.loads(request.body or b"{}")
+        user = await request.auser()
+        job = get_job_service().submit(payload.get("kind", "accounting"), payload, await requester_tenant(request), user.pk)
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"error": "Request body must be a JSON object."}, status=400)
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    response = JsonResponse(job.to_dict(include_result=False), status=202)
+    response["Location"] = f"/api/accounting/jobs/{job.id}/"
+    return response
+
+
+@require_GET
+@accounting_job_permission_required
+async def accounting_job_detail(request: HttpRequest, job_id: str) -> JsonResponse:
+    job = await requested_job(request, job_id)
+    if job is None:
+        return JsonResponse({"error": f"Job {job_id} not found."}, status=404)
+
+    return JsonResponse(job.to_dict())
+
+
+@require_GET
+@accounting_job_permission_required
+async def accounting_job_events(request: HttpRequest, job_id: str):
+    job = await requested_job(request, job_id)
+    if job is None:
+        return JsonResponse({"error": f"Job {job_id} not found."}, status=404)
+
+    response = StreamingHttpResponse(stream_job_events(job), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def stream_job_events(job, poll_seconds: float = EVENT_POLL_SECONDS):
+    sent_version = -1
+    while True:
+        version = job.version
+        finished = job.is_finished
+        if version != sent_version:
+            sent_version = version
+            event = "result" if finished else "progress"
+            data = json.dumps(job.to_dict(include_result=finished), cls=DjangoJSONEncoder)
+            yield f"id: {version}\nevent: {event}\ndata: {data}\n\n"
+
+        if finished:
+            return
+        await asyncio.sleep(poll_seconds)